@@ -0,0 +1,126 @@
+"""Compare /api/detect throughput with the legacy BaseHTTPMiddleware and the
+pure ASGI request middleware, using a detector that returns instantly.
+
+    uv run python benchmarks/api_overhead.py --requests 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from unittest.mock import Mock
+
+import cv2
+import httpx
+import numpy as np
+import structlog
+import torch
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from ultralytics.engine.results import Results
+
+from sentinel.api.admission import AdmissionController
+from sentinel.api.middleware import RequestLoggingMiddleware
+from sentinel.api.routes import router
+from sentinel.detection.registry import ModelRegistry
+from sentinel.logging import get_logger
+
+log = get_logger(__name__)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next) -> Response:
+        request_id = str(uuid.uuid4())
+
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+
+        start_time = time.time()
+        response = await call_next(request)
+        duration_ms = (time.time() - start_time) * 1000
+
+        log.info(
+            "request_complete",
+            method=request.method,
+            path=request.url.path,
+            status_code=response.status_code,
+            duration_ms=round(duration_ms, 2),
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def build_app(middleware: type, **options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware, **options)
+    app.include_router(router)
+
+    image = np.zeros((64, 64, 3), dtype=np.uint8)
+    results = Results(image, path="", names={0: "person"}, boxes=torch.zeros((0, 6)))
+
+    service = Mock()
+    service.process.return_value = results
+    service.detector.model_name = "dummy.pt"
+    service.detector.device = "cpu"
+    service.conf_threshold = 0.5
+    service.iou_threshold = 0.45
+
+    app.state.device = "cpu"
+    app.state.detection_service = service
+    app.state.result_cache = None
+    app.state.admission = AdmissionController(
+        max_concurrency=64, max_queue=1024, timeout=60.0
+    )
+    app.state.model_registry = ModelRegistry(device="cpu", memory_budget_bytes=0)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> float:
+    image = cv2.imencode(".jpg", np.zeros((64, 64, 3), dtype=np.uint8))[1].tobytes()
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                response = await client.post(
+                    "/api/detect", files={"file": ("image.jpg", image, "image/jpeg")}
+                )
+                response.raise_for_status()
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start_time)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        structlog.configure(logger_factory=structlog.PrintLoggerFactory(file=devnull))
+
+        variants = {
+            "BaseHTTPMiddleware": build_app(LegacyRequestLoggingMiddleware),
+            "ASGI middleware": build_app(RequestLoggingMiddleware),
+            f"ASGI middleware (sample {args.sample_rate})": build_app(
+                RequestLoggingMiddleware, sample_rate=args.sample_rate
+            ),
+        }
+
+        for name, app in variants.items():
+            asyncio.run(measure(app, args.requests // 10, args.concurrency))
+            throughput = asyncio.run(measure(app, args.requests, args.concurrency))
+            print(f"{name:<40} {throughput:8.1f} req/s", file=sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,13 @@ class DwellTimeTracker:
         self.objects: dict[int, ObjectState] = {}
         self.zone_dwell_history: dict[str, list[float]] = defaultdict(list)
 
-    def update(self, zone_id: str, track_ids_in_zone: set[int]) -> dict[str, float]:
-        current_time = time.time()
+    def update(
+        self,
+        zone_id: str,
+        track_ids_in_zone: set[int],
+        timestamp: float | None = None,
+    ) -> dict[str, float]:
+        current_time = time.time() if timestamp is None else timestamp
         metrics = {}
 
         if zone_id not in self.zone_dwell_history:
@@ -61,3 +66,14 @@ class DwellTimeTracker:
             metrics["max_dwell_time"] = 0.0
 
         return metrics
+
+    def remove_zone(self, zone_id: str) -> None:
+        self.zone_dwell_history.pop(zone_id, None)
+        for track_id, obj in list(self.objects.items()):
+            if zone_id not in obj.current_zones:
+                continue
+            obj.current_zones.discard(zone_id)
+            obj.entry_times.pop(zone_id, None)
+            obj.dwell_times.pop(zone_id, None)
+            if not obj.current_zones:
+                del self.objects[track_id]
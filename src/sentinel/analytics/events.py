@@ -0,0 +1,223 @@
+import abc
+import asyncio
+import json
+import threading
+import urllib.request
+from collections.abc import Callable
+from pathlib import Path
+
+from sentinel.analytics.models import ZoneEvent
+from sentinel.config import settings
+from sentinel.logging import get_logger
+from sentinel.metrics import ZONE_EVENTS, ZONE_EVENTS_DROPPED
+
+log = get_logger(__name__)
+
+
+class EventBus:
+    """Bounded ring buffer of zone events with a cursor per subscriber.
+
+    Publishing never waits on subscribers: each reads at its own pace, and one
+    that falls more than ``capacity`` events behind skips ahead to the oldest
+    event still buffered and counts the ones it missed.
+    """
+
+    def __init__(self, capacity: int | None = None):
+        self.capacity = capacity or settings.event_buffer_size
+        self._buffer: list[ZoneEvent | None] = [None] * self.capacity
+        self._next = 0
+        self._condition = threading.Condition()
+        self._subscriptions: list[Subscription] = []
+
+    @property
+    def published(self) -> int:
+        return self._next
+
+    def publish(self, events: list[ZoneEvent]) -> None:
+        if not events:
+            return
+
+        with self._condition:
+            for event in events:
+                event.sequence = self._next
+                self._buffer[self._next % self.capacity] = event
+                self._next += 1
+            self._condition.notify_all()
+            subscriptions = list(self._subscriptions)
+
+        for event in events:
+            ZONE_EVENTS.labels(event.type.value).inc()
+        for subscription in subscriptions:
+            subscription._wake()
+
+    def subscribe(self, name: str, from_start: bool = False) -> "Subscription":
+        """Follow events published from now on, or from the oldest one still
+        buffered with ``from_start``."""
+        with self._condition:
+            cursor = max(0, self._next - self.capacity) if from_start else self._next
+            subscription = Subscription(self, name, cursor)
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: "Subscription") -> None:
+        with self._condition:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            self._condition.notify_all()
+
+    def _read(self, cursor: int, limit: int | None) -> tuple[list[ZoneEvent], int, int]:
+        oldest = max(0, self._next - self.capacity)
+        dropped = max(0, oldest - cursor)
+        cursor = max(cursor, oldest)
+        end = self._next if limit is None else min(self._next, cursor + limit)
+        events = [self._buffer[i % self.capacity] for i in range(cursor, end)]
+        return events, end, dropped
+
+
+class Subscription:
+    def __init__(self, bus: EventBus, name: str, cursor: int):
+        self.bus = bus
+        self.name = name
+        self.cursor = cursor
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self._waker: Callable[[], None] | None = None
+
+    @property
+    def lag(self) -> int:
+        return self.bus.published - self.cursor
+
+    def poll(self, limit: int | None = None) -> list[ZoneEvent]:
+        with self.bus._condition:
+            return self._take(limit)
+
+    def wait(
+        self, timeout: float | None = None, limit: int | None = None
+    ) -> list[ZoneEvent]:
+        """Block until events arrive, the timeout passes or the subscription
+        closes. Buffered events are still returned after closing."""
+        with self.bus._condition:
+            self.bus._condition.wait_for(
+                lambda: self.closed or self.cursor < self.bus.published, timeout
+            )
+            return self._take(limit)
+
+    async def next_batch(self, limit: int | None = None) -> list[ZoneEvent]:
+        """Like ``wait`` without blocking the event loop; returns an empty
+        list once the subscription is closed and drained."""
+        loop = asyncio.get_running_loop()
+        while True:
+            ready = asyncio.Event()
+            self._waker = lambda: loop.call_soon_threadsafe(ready.set)
+            try:
+                events = self.poll(limit)
+                if events or self.closed:
+                    return events
+                await ready.wait()
+            finally:
+                self._waker = None
+
+    def close(self) -> None:
+        self.closed = True
+        self.bus._unsubscribe(self)
+        self._wake()
+
+    def _take(self, limit: int | None) -> list[ZoneEvent]:
+        events, self.cursor, dropped = self.bus._read(self.cursor, limit)
+        if dropped:
+            self.dropped += dropped
+            ZONE_EVENTS_DROPPED.labels(self.name).inc(dropped)
+            log.warning("zone_events_dropped", subscriber=self.name, dropped=dropped)
+        self.delivered += len(events)
+        return events
+
+    def _wake(self) -> None:
+        waker = self._waker
+        if waker is not None:
+            waker()
+
+
+class EventSink(abc.ABC):
+    """Drains a subscription on its own thread so slow I/O never reaches the
+    frame loop; a sink that falls too far behind drops events instead."""
+
+    name = "sink"
+
+    def __init__(self, bus: EventBus, batch_size: int = 256):
+        self.batch_size = batch_size
+        self.subscription = bus.subscribe(self.name)
+        self._thread = threading.Thread(
+            target=self._run, name=f"sentinel-{self.name}-sink", daemon=True
+        )
+
+    def start(self) -> "EventSink":
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.subscription.close()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            events = self.subscription.wait(timeout=1.0, limit=self.batch_size)
+            if not events:
+                if self.subscription.closed:
+                    break
+                continue
+            try:
+                self.handle(events)
+            except Exception as e:
+                log.warning(
+                    "event_sink_failed",
+                    sink=self.name,
+                    events=len(events),
+                    error=str(e),
+                )
+
+    @abc.abstractmethod
+    def handle(self, events: list[ZoneEvent]) -> None:
+        """Deliver one batch of events, oldest first."""
+
+
+class FileSink(EventSink):
+    """Appends events to a JSON Lines file."""
+
+    name = "file"
+
+    def __init__(self, bus: EventBus, path: Path, batch_size: int = 256):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._file = path.open("a", encoding="utf-8")
+        super().__init__(bus, batch_size)
+
+    def handle(self, events: list[ZoneEvent]) -> None:
+        self._file.writelines(json.dumps(event.to_dict()) + "\n" for event in events)
+        self._file.flush()
+
+    def close(self, timeout: float = 5.0) -> None:
+        super().close(timeout)
+        self._file.close()
+
+
+class WebhookSink(EventSink):
+    """POSTs each batch as ``{"events": [...]}``; failed batches are logged
+    and dropped rather than retried, so a dead endpoint cannot back up."""
+
+    name = "webhook"
+
+    def __init__(
+        self, bus: EventBus, url: str, timeout: float = 5.0, batch_size: int = 256
+    ):
+        self.url = url
+        self.timeout = timeout
+        super().__init__(bus, batch_size)
+
+    def handle(self, events: list[ZoneEvent]) -> None:
+        body = json.dumps({"events": [event.to_dict() for event in events]}).encode()
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
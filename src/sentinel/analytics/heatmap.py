@@ -0,0 +1,248 @@
+import math
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from sentinel.config import settings
+
+HEATMAP_KINDS = ("occupancy", "trajectory")
+
+# Stored values carry a growing exp(t / window) weight so old samples never
+# need touching; once it reaches this bound the grids are rescaled in place.
+MAX_WEIGHT = 1e6
+
+# Longest gap, in seconds, credited to one frame's detections, so a stalled
+# stream does not paint one huge blob when it resumes.
+MAX_FRAME_GAP = 1.0
+
+
+class OccupancyHeatmap:
+    """Per-class occupancy and trajectory grids at a fixed, downscaled size.
+
+    Occupancy adds the seconds each detection's ground point spends in a cell;
+    trajectory adds one for every cell a track's path crosses. Each configured
+    window keeps its own exponentially decayed copy. Decay is applied lazily
+    through a shared weight, so an update only touches the cells that
+    detections land in and memory depends on the frame size, never on runtime.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        cell_size: int | None = None,
+        windows: list[float] | None = None,
+    ):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size or settings.heatmap_cell_size
+        self.windows = np.sort(
+            np.array(windows or settings.heatmap_windows, dtype=np.float64)
+        )
+        if (self.windows <= 0).any():
+            raise ValueError("Heatmap windows must be positive")
+
+        self.shape = (
+            math.ceil(height / self.cell_size),
+            math.ceil(width / self.cell_size),
+        )
+        self.names: dict[int, str] = {}
+        self.background: np.ndarray | None = None
+        self._grids: dict[str, dict[int, np.ndarray]] = {
+            kind: {} for kind in HEATMAP_KINDS
+        }
+        self._origin: float | None = None
+        self._last_time: float | None = None
+        self._track_ids = np.empty(0, dtype=int)
+        self._track_points = np.empty((0, 2))
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(
+            grid.nbytes for grids in self._grids.values() for grid in grids.values()
+        )
+
+    def update(
+        self,
+        xyxy: np.ndarray,
+        class_ids: np.ndarray,
+        tracker_ids: np.ndarray | None = None,
+        timestamp: float | None = None,
+    ) -> None:
+        # Wall-clock like every other analytics timestamp, so callers may mix
+        # explicit frame times and the default.
+        now = time.time() if timestamp is None else timestamp
+        if self._origin is None:
+            self._origin = now
+        elapsed = 0.0 if self._last_time is None else now - self._last_time
+        self._last_time = now
+
+        weights = np.exp((now - self._origin) / self.windows)
+        if weights.max() > MAX_WEIGHT:
+            self._rebase(now)
+            weights = np.ones_like(self.windows)
+
+        # Detections are anchored at the bottom-centre of the box: the point
+        # where a person stands, in cell coordinates.
+        points = (
+            np.column_stack([(xyxy[:, 0] + xyxy[:, 2]) / 2, xyxy[:, 3]])
+            / self.cell_size
+        )
+        class_ids = class_ids.astype(int)
+
+        dwell = min(max(elapsed, 0.0), MAX_FRAME_GAP)
+        if dwell > 0 and len(points):
+            self._scatter("occupancy", points, class_ids, weights * dwell)
+
+        if tracker_ids is not None:
+            self._update_trajectories(points, class_ids, tracker_ids, weights)
+
+    def _update_trajectories(
+        self,
+        points: np.ndarray,
+        class_ids: np.ndarray,
+        tracker_ids: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        tracker_ids = tracker_ids.astype(int)
+        _, current, previous = np.intersect1d(
+            tracker_ids, self._track_ids, assume_unique=True, return_indices=True
+        )
+        start = self._track_points[previous]
+        self._track_ids = tracker_ids
+        self._track_points = points
+
+        if not len(current):
+            return
+
+        # Sample each segment once per cell along its longer axis, excluding
+        # the start point that the previous segment already counted.
+        delta = points[current] - start
+        steps = np.maximum(np.ceil(np.abs(delta).max(axis=1)), 1).astype(int)
+        segment = np.repeat(np.arange(len(steps)), steps)
+        offsets = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+        fraction = (offsets + 1) / steps[segment]
+        samples = start[segment] + delta[segment] * fraction[:, None]
+
+        self._scatter("trajectory", samples, class_ids[current][segment], weights)
+
+    def _scatter(
+        self,
+        kind: str,
+        points: np.ndarray,
+        class_ids: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        rows = np.clip(points[:, 1].astype(int), 0, self.shape[0] - 1)
+        cols = np.clip(points[:, 0].astype(int), 0, self.shape[1] - 1)
+        grids = self._grids[kind]
+        for class_id in np.unique(class_ids).tolist():
+            grid = grids.get(class_id)
+            if grid is None:
+                grid = grids[class_id] = np.zeros(
+                    (*self.shape, len(self.windows)), dtype=np.float32
+                )
+            mask = class_ids == class_id
+            np.add.at(grid, (rows[mask], cols[mask]), weights.astype(np.float32))
+
+    def _rebase(self, now: float) -> None:
+        decay = np.exp(-(now - self._origin) / self.windows).astype(np.float32)
+        for grids in self._grids.values():
+            for grid in grids.values():
+                grid *= decay
+        self._origin = now
+
+    def snapshot(
+        self,
+        kind: str = "occupancy",
+        window: float | None = None,
+        class_ids: list[int] | None = None,
+    ) -> np.ndarray:
+        """Decayed grid for one window (the longest by default), summed over
+        ``class_ids`` or every class."""
+        if kind not in HEATMAP_KINDS:
+            raise ValueError(f"Unknown heatmap kind: {kind}")
+
+        index = len(self.windows) - 1 if window is None else self._window_index(window)
+        result = np.zeros(self.shape, dtype=np.float32)
+        if self._origin is None:
+            return result
+
+        for class_id, grid in self._grids[kind].items():
+            if class_ids is None or class_id in class_ids:
+                result += grid[..., index]
+        result *= math.exp(-(self._last_time - self._origin) / self.windows[index])
+        return result
+
+    def _window_index(self, window: float) -> int:
+        matches = np.flatnonzero(np.isclose(self.windows, window))
+        if not len(matches):
+            windows = ", ".join(f"{value:g}" for value in self.windows)
+            raise ValueError(f"Unknown heatmap window: {window:g} (have {windows})")
+        return int(matches[0])
+
+    def render(
+        self,
+        kind: str = "occupancy",
+        window: float | None = None,
+        class_ids: list[int] | None = None,
+        alpha: float = 0.6,
+    ) -> np.ndarray:
+        grid = self.snapshot(kind, window, class_ids)
+        peak = grid.max()
+        if peak > 0:
+            grid = np.sqrt(grid / peak)
+
+        heat = cv2.resize(
+            (grid * 255).astype(np.uint8),
+            (self.width, self.height),
+            interpolation=cv2.INTER_LINEAR,
+        )
+        colored = cv2.applyColorMap(heat, cv2.COLORMAP_JET)
+
+        background = self.background
+        if background is None or background.shape[:2] != (self.height, self.width):
+            background = np.zeros_like(colored)
+
+        blended = cv2.addWeighted(background, 1 - alpha, colored, alpha, 0)
+        hot = heat > 0
+        frame = background.copy()
+        frame[hot] = blended[hot]
+        return frame
+
+    def to_png(
+        self,
+        kind: str = "occupancy",
+        window: float | None = None,
+        class_ids: list[int] | None = None,
+    ) -> bytes:
+        ok, buffer = cv2.imencode(".png", self.render(kind, window, class_ids))
+        if not ok:
+            raise ValueError("Failed to encode heatmap")
+        return buffer.tobytes()
+
+    def export(
+        self,
+        path: Path,
+        kind: str = "occupancy",
+        window: float | None = None,
+        class_ids: list[int] | None = None,
+    ) -> None:
+        """Write a rendered PNG/JPEG, or every raw decayed grid to ``.npz``."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".npz":
+            arrays = {
+                f"{kind}_{self.names.get(class_id, class_id)}_{value:g}s": (
+                    self.snapshot(kind, value, [class_id])
+                )
+                for kind, grids in self._grids.items()
+                for class_id in grids
+                for value in self.windows
+            }
+            np.savez_compressed(path, **arrays)
+            return
+
+        if not cv2.imwrite(str(path), self.render(kind, window, class_ids)):
+            raise ValueError(f"Failed to write heatmap: {path}")
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 
 import numpy as np
@@ -17,6 +17,7 @@ class ZoneConfig:
     type: ZoneType
     polygon: list[list[int]] | None = None
     line: tuple[list[int], list[int]] | None = None
+    classes: list[str | int] | None = None
 
     def to_supervision_zone(self) -> sv.PolygonZone | sv.LineZone:
         if self.type == ZoneType.POLYGON:
@@ -44,6 +45,62 @@ class ZoneMetrics:
     active_track_ids: set[int] = field(default_factory=set)
 
 
+@dataclass
+class ZoneMetricsSeries:
+    """Zone metrics rolled up into ``step``-second buckets; averages are NaN
+    for buckets with no data."""
+
+    zone_id: str
+    step: int
+    timestamps: np.ndarray
+    samples: np.ndarray
+    avg_count: np.ndarray
+    max_count: np.ndarray
+    entries: np.ndarray
+    exits: np.ndarray
+    avg_dwell_time: np.ndarray
+    max_dwell_time: np.ndarray
+
+    def to_dicts(self) -> list[dict]:
+        columns = {
+            "timestamp": self.timestamps.tolist(),
+            "samples": self.samples.astype(int).tolist(),
+            "avg_count": _nan_to_none(self.avg_count),
+            "max_count": self.max_count.astype(int).tolist(),
+            "entries": self.entries.astype(int).tolist(),
+            "exits": self.exits.astype(int).tolist(),
+            "avg_dwell_time": _nan_to_none(self.avg_dwell_time),
+            "max_dwell_time": _nan_to_none(self.max_dwell_time),
+        }
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def _nan_to_none(values: np.ndarray) -> list[float | None]:
+    return [None if value != value else value for value in values.tolist()]
+
+
+class ZoneEventType(str, Enum):
+    ENTER = "enter"
+    EXIT = "exit"
+    LINE_IN = "line_in"
+    LINE_OUT = "line_out"
+
+
+@dataclass
+class ZoneEvent:
+    type: ZoneEventType
+    zone_id: str
+    track_id: int
+    timestamp: float
+    class_id: int | None = None
+    dwell_time: float | None = None
+    source: str | None = None
+    sequence: int = -1
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "type": self.type.value}
+
+
 @dataclass
 class ObjectState:
     track_id: int
@@ -1,41 +1,199 @@
+import threading
+import time
+
+import numpy as np
 import supervision as sv
 from ultralytics.engine.results import Results
 
 from sentinel.analytics.dwell import DwellTimeTracker
-from sentinel.analytics.models import ZoneConfig, ZoneMetrics, ZoneType
+from sentinel.analytics.events import EventBus
+from sentinel.analytics.heatmap import OccupancyHeatmap
+from sentinel.analytics.models import (
+    ZoneConfig,
+    ZoneEvent,
+    ZoneEventType,
+    ZoneMetrics,
+    ZoneType,
+)
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.analytics.utils import same_geometry
+from sentinel.config import settings
+from sentinel.detection.utils import resolve_classes
 
 
 class AnalyticsService:
-    def __init__(self, zone_configs: list[ZoneConfig]):
-        self.zone_configs = zone_configs
+    def __init__(
+        self,
+        zone_configs: list[ZoneConfig],
+        enable_heatmap: bool | None = None,
+        event_bus: EventBus | None = None,
+        source: str | None = None,
+        metrics_store: ZoneMetricsStore | None = None,
+    ):
+        self.zone_configs: list[ZoneConfig] = []
+        self.events = EventBus() if event_bus is None else event_bus
+        self.source = source
+        self.metrics_store = metrics_store
         self.zones: dict[str, sv.PolygonZone | sv.LineZone] = {}
         self.dwell_tracker = DwellTimeTracker()
         self.metrics: dict[str, ZoneMetrics] = {}
+        self.enable_heatmap = (
+            settings.heatmap_enabled if enable_heatmap is None else enable_heatmap
+        )
+        self.heatmap: OccupancyHeatmap | None = None
+        self._zone_classes: dict[str, np.ndarray] | None = None
+        self._track_classes: dict[int, int] = {}
+        self._pending_events: list[ZoneEvent] = []
+        self.last_events: list[ZoneEvent] = []
+        self._now = 0.0
+        self._pending_zones: list[ZoneConfig] | None = None
+        self._names: dict[int, str] | None = None
+        self._lock = threading.Lock()
+
+        self._apply_zones(zone_configs)
+
+    def reload(self, zone_configs: list[ZoneConfig]) -> None:
+        """Swap in a new zone set at the start of the next update.
+
+        Zones whose ID survives keep their metrics and dwell state, and line
+        zones with unchanged geometry keep their crossing counts.
+        """
+        for config in zone_configs:
+            config.to_supervision_zone()
+            if self._names is not None:
+                resolve_classes(config.classes, self._names)
+        with self._lock:
+            self._pending_zones = zone_configs
+
+    def _apply_zones(self, zone_configs: list[ZoneConfig]) -> None:
+        previous = {config.id: config for config in self.zone_configs}
+        zones: dict[str, sv.PolygonZone | sv.LineZone] = {}
+        metrics: dict[str, ZoneMetrics] = {}
 
         for config in zone_configs:
-            zone = config.to_supervision_zone()
-            self.zones[config.id] = zone
-            self.metrics[config.id] = ZoneMetrics(
+            old = previous.get(config.id)
+            if old is not None and same_geometry(old, config):
+                zones[config.id] = self.zones[config.id]
+            else:
+                zones[config.id] = config.to_supervision_zone()
+
+            metric = None
+            if old is not None and old.type == config.type:
+                metric = self.metrics[config.id]
+                metric.zone_name = config.name
+            metrics[config.id] = metric or ZoneMetrics(
                 zone_id=config.id,
                 zone_name=config.name,
             )
 
-    def update(self, results: Results) -> dict[str, ZoneMetrics]:
+        for zone_id in previous.keys() - zones.keys():
+            self.dwell_tracker.remove_zone(zone_id)
+
+        self.zone_configs = zone_configs
+        self.zones = zones
+        self.metrics = metrics
+        self._zone_classes = None
+
+    def update(
+        self, results: Results, timestamp: float | None = None
+    ) -> dict[str, ZoneMetrics]:
+        self.last_events = []
+        if self._pending_zones is not None:
+            with self._lock:
+                zone_configs, self._pending_zones = self._pending_zones, None
+            self._apply_zones(zone_configs)
+
         detections = sv.Detections.from_ultralytics(results)
+        now = time.time() if timestamp is None else timestamp
+
+        if self.enable_heatmap:
+            self._update_heatmap(results, detections, now)
 
-        if detections.tracker_id is None or len(detections) == 0:
+        if len(detections) == 0:
+            # An empty frame still has to close out the tracks that were in
+            # each zone, so it is processed as a frame with no tracks.
+            detections.tracker_id = np.empty(0, dtype=int)
+        elif detections.tracker_id is None:
             return self.metrics
 
+        self._now = now
+        self._track_classes = dict(
+            zip(detections.tracker_id.tolist(), detections.class_id.tolist())
+        )
+
+        if self._zone_classes is None:
+            self._names = results.names
+            self._zone_classes = {
+                config.id: np.array(resolve_classes(config.classes, results.names))
+                for config in self.zone_configs
+                if config.classes
+            }
+
         for zone_id, zone in self.zones.items():
             config = next(c for c in self.zone_configs if c.id == zone_id)
 
+            zone_detections = detections
+            if zone_id in self._zone_classes:
+                zone_detections = detections[
+                    np.isin(detections.class_id, self._zone_classes[zone_id])
+                ]
+
             if config.type == ZoneType.POLYGON:
-                self._update_polygon_zone(zone_id, zone, detections)
+                self._update_polygon_zone(zone_id, zone, zone_detections)
             elif config.type == ZoneType.LINE:
-                self._update_line_zone(zone_id, zone, detections)
+                self._update_line_zone(zone_id, zone, zone_detections)
 
+        self.events.publish(self._pending_events)
+        self.last_events, self._pending_events = self._pending_events, []
+        if self.metrics_store:
+            self.metrics_store.record(
+                self._now, self.metrics, self.last_events, source=self.source
+            )
         return self.metrics
 
+    def _emit(
+        self,
+        event_type: ZoneEventType,
+        zone_id: str,
+        track_ids: list[int],
+        dwell_times: dict[int, float] | None = None,
+    ) -> None:
+        for track_id in track_ids:
+            self._pending_events.append(
+                ZoneEvent(
+                    type=event_type,
+                    zone_id=zone_id,
+                    track_id=track_id,
+                    timestamp=self._now,
+                    class_id=self._track_classes.get(track_id),
+                    dwell_time=dwell_times.get(track_id) if dwell_times else None,
+                    source=self.source,
+                )
+            )
+
+    def _update_heatmap(
+        self,
+        results: Results,
+        detections: sv.Detections,
+        timestamp: float,
+    ) -> None:
+        if self.heatmap is None:
+            height, width = results.orig_shape
+            self.heatmap = OccupancyHeatmap(width, height)
+            self.heatmap.names = results.names
+
+        # Copied: in batched pipelines orig_img is a slot of a reused buffer
+        # that later frames overwrite.
+        frame = results.orig_img
+        background = self.heatmap.background
+        if background is None or background.shape != frame.shape:
+            self.heatmap.background = frame.copy()
+        else:
+            np.copyto(background, frame)
+        self.heatmap.update(
+            detections.xyxy, detections.class_id, detections.tracker_id, timestamp
+        )
+
     def _update_polygon_zone(
         self,
         zone_id: str,
@@ -50,9 +208,22 @@ class AnalyticsService:
                 int(detections.tracker_id[i]) for i in range(len(detections)) if mask[i]
             }
 
-        dwell_metrics = self.dwell_tracker.update(zone_id, tracks_in_zone)
-
         metric = self.metrics[zone_id]
+        exited = sorted(metric.active_track_ids - tracks_in_zone)
+        dwell_times = {
+            track_id: self.dwell_tracker.objects[track_id].dwell_times.get(zone_id)
+            for track_id in exited
+            if track_id in self.dwell_tracker.objects
+        }
+        self._emit(
+            ZoneEventType.ENTER,
+            zone_id,
+            sorted(tracks_in_zone - metric.active_track_ids),
+        )
+        self._emit(ZoneEventType.EXIT, zone_id, exited, dwell_times)
+
+        dwell_metrics = self.dwell_tracker.update(zone_id, tracks_in_zone, self._now)
+
         metric.current_count = len(tracks_in_zone)
         metric.active_track_ids = tracks_in_zone
         metric.avg_dwell_time = dwell_metrics["avg_dwell_time"]
@@ -64,7 +235,11 @@ class AnalyticsService:
         zone: sv.LineZone,
         detections: sv.Detections,
     ) -> None:
-        zone.trigger(detections)
+        crossed_in, crossed_out = zone.trigger(detections)
+        if crossed_in.any() or crossed_out.any():
+            track_ids = detections.tracker_id
+            self._emit(ZoneEventType.LINE_IN, zone_id, track_ids[crossed_in].tolist())
+            self._emit(ZoneEventType.LINE_OUT, zone_id, track_ids[crossed_out].tolist())
 
         metric = self.metrics[zone_id]
         metric.total_entries = zone.in_count
@@ -0,0 +1,382 @@
+import fcntl
+import math
+import mmap
+import queue
+import threading
+import urllib.parse
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from sentinel.analytics.models import (
+    ZoneEvent,
+    ZoneEventType,
+    ZoneMetrics,
+    ZoneMetricsSeries,
+)
+from sentinel.config import settings
+from sentinel.logging import get_logger
+from sentinel.metrics import METRICS_STORE_DROPPED
+
+log = get_logger(__name__)
+
+# One float64 row per bucket. Maxima merge with max, everything else adds.
+FIELDS = (
+    "samples",
+    "count_sum",
+    "count_max",
+    "entries",
+    "exits",
+    "dwell_sum",
+    "dwell_count",
+    "dwell_max",
+)
+(SAMPLES, COUNT_SUM, COUNT_MAX, ENTRIES, EXITS, DWELL_SUM, DWELL_COUNT, DWELL_MAX) = (
+    range(len(FIELDS))
+)
+MAX_FIELDS = [COUNT_MAX, DWELL_MAX]
+ROW_BYTES = len(FIELDS) * 8
+
+# Buckets per segment file: a day at one-minute resolution, 60 days hourly.
+SEGMENT_ROWS = 1440
+MAX_POINTS = 10_000
+# Buckets one query may read before rollup: 64 MB of rows.
+MAX_ROWS = 1_000_000
+
+ENTRY_EVENTS = (ZoneEventType.ENTER, ZoneEventType.LINE_IN)
+
+
+class ZoneMetricsStore:
+    """Memory-mapped history of zone metrics.
+
+    Every configured resolution keeps its own rollup in fixed-size float64
+    segment files of ``SEGMENT_ROWS`` buckets per zone; a bucket's row sits at
+    an offset computed from its time, so samples add into it in place and
+    files never grow. A query reads one contiguous slice per segment at the
+    coarsest resolution that divides its step: a month of hourly points is a
+    single read. Frames are recorded through a bounded queue drained by a
+    writer thread; when the writer falls behind, samples are dropped and
+    counted instead of stalling the frame loop.
+
+    Series are kept per source (camera, stream or job) and zone, so zones
+    that share an ID on different sources stay apart. At most
+    ``max_open_segments`` segments stay mapped, least recently written first
+    out, and ``release`` unmaps a finished source's. Each process writes
+    under its own ``writer`` directory, guarded by a lock file, and queries
+    merge all writers.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        resolutions: list[int] | None = None,
+        writer: str = "default",
+        queue_size: int = 8192,
+        max_open_segments: int = 256,
+    ):
+        self.directory = directory
+        self.resolutions = sorted(
+            set(resolutions or settings.metrics_store_resolutions)
+        )
+        base = self.resolutions[0]
+        if base <= 0 or any(r % base for r in self.resolutions):
+            raise ValueError(
+                "Metrics store resolutions must be positive multiples of the finest"
+            )
+
+        self.writer = writer
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.max_open_segments = max_open_segments
+        self._segments: OrderedDict[
+            tuple[str | None, str, int], tuple[int, np.memmap]
+        ] = OrderedDict()
+        self._lock_file = None
+        self._thread = threading.Thread(
+            target=self._run, name="sentinel-metrics-store", daemon=True
+        )
+
+    @property
+    def resolution(self) -> int:
+        return self.resolutions[0]
+
+    def start(self) -> "ZoneMetricsStore":
+        writer_dir = self.directory / self.writer
+        writer_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_file = (writer_dir / ".lock").open("w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise ValueError(f"Metrics store writer already in use: {writer_dir}")
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        for _, segment in self._segments.values():
+            segment.flush()
+        self._segments.clear()
+        if self._lock_file:
+            self._lock_file.close()
+
+    def record(
+        self,
+        timestamp: float,
+        metrics: dict[str, ZoneMetrics],
+        events: list[ZoneEvent] | None = None,
+        source: str | None = None,
+    ) -> None:
+        """Queue one frame's zone counts and events without blocking."""
+        sample = (
+            self._apply,
+            source,
+            timestamp,
+            [(zone_id, metric.current_count) for zone_id, metric in metrics.items()],
+            [
+                (event.zone_id, event.type, event.timestamp, event.dwell_time)
+                for event in events or []
+            ],
+        )
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+            METRICS_STORE_DROPPED.inc()
+
+    def release(self, source: str | None) -> None:
+        """Unmap ``source``'s segments once everything it recorded is written.
+
+        Queued behind its samples; if the queue is full the segments are
+        left to age out instead."""
+        try:
+            self._queue.put_nowait((self._release, source))
+        except queue.Full:
+            pass
+
+    def flush(self) -> None:
+        """Wait until everything recorded so far is written."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            sample = self._queue.get()
+            try:
+                if sample is None:
+                    return
+                apply, *args = sample
+                apply(*args)
+            except Exception as e:
+                log.warning("metrics_store_write_failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _apply(
+        self,
+        source: str | None,
+        timestamp: float,
+        counts: list[tuple[str, int]],
+        events: list[tuple[str, ZoneEventType, float, float | None]],
+    ) -> None:
+        for zone_id, count in counts:
+            for row in self._rows(source, zone_id, timestamp):
+                row[SAMPLES] += 1
+                row[COUNT_SUM] += count
+                row[COUNT_MAX] = max(row[COUNT_MAX], count)
+
+        for zone_id, event_type, event_time, dwell_time in events:
+            for row in self._rows(source, zone_id, event_time):
+                row[ENTRIES if event_type in ENTRY_EVENTS else EXITS] += 1
+                if dwell_time is not None and event_type == ZoneEventType.EXIT:
+                    row[DWELL_SUM] += dwell_time
+                    row[DWELL_COUNT] += 1
+                    row[DWELL_MAX] = max(row[DWELL_MAX], dwell_time)
+
+    def _rows(
+        self, source: str | None, zone_id: str, timestamp: float
+    ) -> list[np.ndarray]:
+        rows = []
+        for resolution in self.resolutions:
+            index, row = divmod(int(timestamp // resolution), SEGMENT_ROWS)
+            key = (source, zone_id, resolution)
+            current = self._segments.get(key)
+            if current is not None and current[0] == index:
+                self._segments.move_to_end(key)
+            else:
+                if current is not None:
+                    current[1].flush()
+                path = (
+                    self.directory
+                    / self.writer
+                    / source_directory(source)
+                    / zone_directory(zone_id)
+                    / f"{resolution}s"
+                    / f"{index}.f64"
+                )
+                current = (index, _open_segment(path))
+                self._segments[key] = current
+                self._segments.move_to_end(key)
+                while len(self._segments) > self.max_open_segments:
+                    self._segments.popitem(last=False)[1][1].flush()
+            rows.append(current[1][row])
+        return rows
+
+    def _release(self, source: str | None) -> None:
+        for key in [key for key in self._segments if key[0] == source]:
+            self._segments.pop(key)[1].flush()
+
+    def has_zone(self, zone_id: str, source: str | None = None) -> bool:
+        return bool(self._zone_directories(zone_id, source))
+
+    def _zone_directories(self, zone_id: str, source: str | None) -> list[Path]:
+        """The zone's directory for ``source`` (every source if None) in
+        every writer."""
+        pattern = "source-*" if source is None else source_directory(source)
+        name = zone_directory(zone_id)
+        return [
+            path / name
+            for writer in self._writers()
+            for path in writer.glob(pattern)
+            if (path / name).is_dir()
+        ]
+
+    def _writers(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [path for path in self.directory.iterdir() if path.is_dir()]
+
+    def query(
+        self,
+        zone_id: str,
+        start: float,
+        end: float,
+        step: int | None = None,
+        source: str | None = None,
+    ) -> ZoneMetricsSeries:
+        """Buckets of ``step`` seconds covering ``start``..``end``, aligned to
+        multiples of ``step`` since the epoch (UTC), for one source or summed
+        over all of them."""
+        if end <= start:
+            raise ValueError("Query end must be after its start")
+
+        step = step or self._default_step(end - start)
+        if step <= 0 or step % self.resolution:
+            raise ValueError(
+                f"Step must be a multiple of the store resolution ({self.resolution}s)"
+            )
+        first = math.floor(start / step) * step
+        points = math.ceil((end - first) / step)
+        if points > MAX_POINTS:
+            raise ValueError(
+                f"Query spans {points} points (max {MAX_POINTS}); use a larger step"
+            )
+
+        resolution = max(r for r in self.resolutions if step % r == 0)
+        per_point = step // resolution
+        if points * per_point > MAX_ROWS:
+            raise ValueError(
+                f"Query would read {points * per_point} stored buckets "
+                f"(max {MAX_ROWS}); use a shorter range, or a step that is a "
+                "multiple of a coarser resolution"
+            )
+        rows = self._read(
+            zone_id, source, resolution, first // resolution, points * per_point
+        )
+        grouped = rows.reshape(points, per_point, len(FIELDS))
+        totals = grouped.sum(axis=1)
+        totals[:, MAX_FIELDS] = grouped[:, :, MAX_FIELDS].max(axis=1)
+
+        samples = totals[:, SAMPLES]
+        dwell_count = totals[:, DWELL_COUNT]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_count = np.where(samples > 0, totals[:, COUNT_SUM] / samples, np.nan)
+            avg_dwell = np.where(
+                dwell_count > 0, totals[:, DWELL_SUM] / dwell_count, np.nan
+            )
+        return ZoneMetricsSeries(
+            zone_id=zone_id,
+            step=step,
+            timestamps=first + np.arange(points, dtype=np.float64) * step,
+            samples=samples,
+            avg_count=avg_count,
+            max_count=totals[:, COUNT_MAX],
+            entries=totals[:, ENTRIES],
+            exits=totals[:, EXITS],
+            avg_dwell_time=avg_dwell,
+            max_dwell_time=np.where(dwell_count > 0, totals[:, DWELL_MAX], np.nan),
+        )
+
+    def _default_step(self, span: float) -> int:
+        for resolution in self.resolutions:
+            if span / resolution <= MAX_POINTS:
+                return resolution
+        return self.resolutions[-1] * math.ceil(
+            span / self.resolutions[-1] / MAX_POINTS
+        )
+
+    def _read(
+        self,
+        zone_id: str,
+        source: str | None,
+        resolution: int,
+        first: int,
+        count: int,
+    ) -> np.ndarray:
+        """Rows for buckets ``first`` to ``first + count``, summed over writers
+        and sources (maxima merged); buckets never written are zero."""
+        result = np.zeros((count, len(FIELDS)))
+        segments = range(first // SEGMENT_ROWS, (first + count - 1) // SEGMENT_ROWS + 1)
+        for zone_path in self._zone_directories(zone_id, source):
+            zone_dir = zone_path / f"{resolution}s"
+            if not zone_dir.is_dir():
+                continue
+            for index in segments:
+                lo = max(first, index * SEGMENT_ROWS)
+                hi = min(first + count, (index + 1) * SEGMENT_ROWS)
+                _merge_rows(
+                    result[lo - first : hi - first],
+                    zone_dir / f"{index}.f64",
+                    lo - index * SEGMENT_ROWS,
+                )
+        return result
+
+
+def source_directory(source: str | None) -> str:
+    return "source-" + urllib.parse.quote(source or "", safe="")
+
+
+def zone_directory(zone_id: str) -> str:
+    # Zone IDs come from config and URLs; quoting keeps each one a single,
+    # non-special path component.
+    return "zone-" + urllib.parse.quote(zone_id, safe="")
+
+
+def _merge_rows(target: np.ndarray, path: Path, offset: int) -> None:
+    """Add ``len(target)`` rows of the segment at ``path``, starting at row
+    ``offset``, into ``target``."""
+    try:
+        file = path.open("rb")
+    except FileNotFoundError:
+        return
+    with file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as segment:
+        rows = np.frombuffer(
+            segment,
+            dtype=np.float64,
+            count=target.size,
+            offset=offset * ROW_BYTES,
+        ).reshape(target.shape)
+        maxima = np.maximum(target[:, MAX_FIELDS], rows[:, MAX_FIELDS])
+        target += rows
+        target[:, MAX_FIELDS] = maxima
+        del rows
+
+
+def _open_segment(path: Path) -> np.memmap:
+    shape = (SEGMENT_ROWS, len(FIELDS))
+    if path.exists():
+        return np.memmap(path, dtype=np.float64, mode="r+", shape=shape)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return np.memmap(path, dtype=np.float64, mode="w+", shape=shape)
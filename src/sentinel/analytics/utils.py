@@ -1,7 +1,9 @@
 import json
+from collections.abc import Iterable
 from pathlib import Path
 
 from sentinel.analytics.models import ZoneConfig, ZoneType
+from sentinel.detection.utils import resolve_classes
 
 
 def load_zones_from_json(path: Path) -> list[ZoneConfig]:
@@ -16,7 +18,54 @@ def load_zones_from_json(path: Path) -> list[ZoneConfig]:
             type=ZoneType(zone_data["type"]),
             polygon=zone_data.get("polygon"),
             line=zone_data.get("line"),
+            classes=zone_data.get("classes"),
         )
         zones.append(zone_config)
 
     return zones
+
+
+def save_zones_to_json(zones: list[ZoneConfig], path: Path) -> None:
+    data = {"zones": []}
+    for zone in zones:
+        zone_data = {"id": zone.id, "name": zone.name, "type": zone.type.value}
+        if zone.polygon is not None:
+            zone_data["polygon"] = zone.polygon
+        if zone.line is not None:
+            zone_data["line"] = list(zone.line)
+        if zone.classes:
+            zone_data["classes"] = zone.classes
+        data["zones"].append(zone_data)
+
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def zone_classes(zones: list[ZoneConfig]) -> list[str | int] | None:
+    """Classes any zone cares about, or None if some zone accepts every class."""
+    if not zones or any(not zone.classes for zone in zones):
+        return None
+    return sorted({item for zone in zones for item in zone.classes}, key=str)
+
+
+def validate_zones(
+    zones: list[ZoneConfig], class_names: Iterable[dict[int, str]]
+) -> None:
+    """Raise ValueError if a zone has unusable geometry or names a class that
+    one of the models behind ``class_names`` does not know."""
+    class_names = list(class_names)
+    for zone in zones:
+        zone.to_supervision_zone()
+        for names in class_names:
+            resolve_classes(zone.classes, names)
+
+
+def same_geometry(a: ZoneConfig, b: ZoneConfig) -> bool:
+    def points(value) -> list | None:
+        return None if value is None else [list(point) for point in value]
+
+    return (
+        a.type == b.type
+        and points(a.polygon) == points(b.polygon)
+        and points(a.line) == points(b.line)
+    )
@@ -0,0 +1,72 @@
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from sentinel.analytics.models import ZoneConfig
+from sentinel.analytics.utils import load_zones_from_json
+from sentinel.config import settings
+from sentinel.logging import get_logger
+
+log = get_logger(__name__)
+
+
+class ZoneFileWatcher:
+    """Polls a zones file and passes each change that parses to ``on_change``.
+
+    Polling the file's mtime and size needs no extra dependency and also sees
+    editors that save by writing a new file and renaming it over the old one.
+    A file that fails to parse is logged and the current zones stay in effect.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[list[ZoneConfig]], None],
+        interval: float | None = None,
+    ):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval or settings.zones_watch_interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sentinel-zone-watcher", daemon=True
+        )
+
+    def start(self) -> "ZoneFileWatcher":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last check; True if it did."""
+        signature = self._stat()
+        if signature == self._signature or signature is None:
+            return False
+        self._signature = signature
+
+        try:
+            zone_configs = load_zones_from_json(self.path)
+            self.on_change(zone_configs)
+        except Exception as e:
+            log.warning("zones_reload_failed", path=str(self.path), error=str(e))
+            return False
+
+        log.info("zones_reloaded", path=str(self.path), zone_count=len(zone_configs))
+        return True
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,90 @@
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class OverloadedError(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps concurrent work, bounds the wait queue and sheds requests that
+    cannot start before their deadline."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        timeout: float,
+        smoothing: float = 0.2,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.smoothing = smoothing
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.avg_service_time: float | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def saturated(self) -> bool:
+        """True when a new request would have to wait and the queue is full."""
+        return self.active >= self.max_concurrency and self.waiting >= self.max_queue
+
+    def estimated_wait(self) -> float:
+        if self.avg_service_time is None or self.active < self.max_concurrency:
+            return 0.0
+        return (self.waiting // self.max_concurrency + 1) * self.avg_service_time
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.estimated_wait()))
+
+    @asynccontextmanager
+    async def admit(self, timeout: float | None = None) -> AsyncIterator[None]:
+        timeout = self.timeout if timeout is None else timeout
+
+        if self.saturated:
+            self.shed_queue_full += 1
+            raise OverloadedError("queue_full", self.retry_after())
+
+        # Only a request that would queue can miss its start deadline; a free
+        # slot is always taken, so one slow request cannot shed an idle server.
+        if self.active >= self.max_concurrency and self.estimated_wait() > timeout:
+            self.shed_deadline += 1
+            raise OverloadedError("deadline", self.retry_after())
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except TimeoutError:
+            self.shed_deadline += 1
+            raise OverloadedError("deadline", self.retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            self._record(time.perf_counter() - start_time)
+
+    def _record(self, service_time: float) -> None:
+        if self.avg_service_time is None:
+            self.avg_service_time = service_time
+        else:
+            self.avg_service_time += self.smoothing * (
+                service_time - self.avg_service_time
+            )
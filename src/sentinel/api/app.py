@@ -1,36 +1,187 @@
+import asyncio
+import time
+import weakref
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-
+from starlette.concurrency import run_in_threadpool
+
+from sentinel.analytics.events import EventBus, EventSink, FileSink, WebhookSink
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.analytics.utils import load_zones_from_json
+from sentinel.analytics.watcher import ZoneFileWatcher
+from sentinel.api.admission import AdmissionController
+from sentinel.api.cache import ResultCache
+from sentinel.api.middleware import BodySizeLimitMiddleware, RequestLoggingMiddleware
+from sentinel.api.routes import metrics_router, router
+from sentinel.api.utils import apply_zone_configs
 from sentinel.config import settings
+from sentinel.cpu import (
+    ThreadPlan,
+    apply_thread_plan,
+    settings_thread_plan,
+    worker_index,
+)
 from sentinel.detection.models import YOLODetector
+from sentinel.detection.registry import ModelRegistry
 from sentinel.detection.service import DetectionService
-from sentinel.api.routes import router
-from sentinel.api.middleware import RequestLoggingMiddleware
+from sentinel.jobs.service import JobService
 from sentinel.logging import configure_logging, get_logger
+from sentinel.metrics import (
+    ACTIVE_JOBS,
+    ACTIVE_REQUESTS,
+    LOADED_MODEL_BYTES,
+    LOADED_MODELS,
+    QUEUE_DEPTH,
+)
 
-configure_logging()
 log = get_logger(__name__)
 
+# Headroom over API_MAX_IMAGE_SIZE for multipart boundaries and form fields.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+async def warm_up(app: FastAPI, detector: YOLODetector, start_time: float) -> None:
+    warmup_time = await run_in_threadpool(
+        detector.warmup, settings.model_warmup_iterations
+    )
+    app.state.ready = True
+    log.info(
+        "api_ready",
+        model_name=detector.model_name,
+        warmup_ms=round(warmup_time * 1000, 1),
+        cold_start_ms=round((time.perf_counter() - start_time) * 1000, 1),
+    )
+
+
+def remote_detector(model: str, device: str):
+    # Imported only when replicas are configured; the transport is POSIX-only.
+    from sentinel.detection.remote import RemoteDetector
+
+    return RemoteDetector(
+        model, settings.inference_addresses, settings.inference_authkey
+    )
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    log.info("loading_model", model_name=settings.model_name, device=settings.device)
-    detector = YOLODetector(settings.model_name, settings.device)
+    start_time = time.perf_counter()
+    # Configured here rather than at import so tests and tooling that import
+    # the app do not start the log writer thread.
+    configure_logging(background=True)
+    app.state.ready = False
+    if settings.inference_addresses:
+        # Replicas own the inference cores; workers only decode and serialize.
+        apply_thread_plan(ThreadPlan(intra_op=1, inter_op=1, opencv=1))
+    else:
+        apply_thread_plan(settings_thread_plan(index=worker_index()))
+    # With inference replicas running, this worker only forwards frames and
+    # holds no model weights of its own.
+    loader = remote_detector if settings.inference_addresses else YOLODetector
+    registry = ModelRegistry(
+        device=settings.device,
+        memory_budget_bytes=settings.model_memory_budget_mb * 1024 * 1024,
+        allowed_models=settings.api_models,
+        pinned_models=[settings.model_name],
+        loader=loader,
+    )
+    detector = registry.get(settings.model_name)
 
+    app.state.model_registry = registry
     app.state.detector = detector
     app.state.detection_service = DetectionService(
         detector=detector,
         enable_tracking=False,
     )
     app.state.device = settings.device
+    app.state.admission = AdmissionController(
+        max_concurrency=settings.api_max_concurrency,
+        max_queue=settings.api_max_queue,
+        timeout=settings.api_request_timeout,
+    )
+    app.state.result_cache = None
+    if settings.api_cache_max_entries > 0:
+        app.state.result_cache = ResultCache(
+            max_entries=settings.api_cache_max_entries,
+            ttl=settings.api_cache_ttl,
+            disk_dir=settings.api_cache_dir,
+            disk_max_entries=settings.api_cache_disk_max_entries,
+        )
+    app.state.zone_configs = []
+
+    if settings.enable_analytics and settings.zones_config_path.exists():
+        app.state.zone_configs = load_zones_from_json(settings.zones_config_path)
+        log.info("zones_loaded", zone_count=len(app.state.zone_configs))
+
+    app.state.event_bus = EventBus()
+    sinks: list[EventSink] = []
+    if settings.events_log_path:
+        sinks.append(FileSink(app.state.event_bus, settings.events_log_path).start())
+    if settings.events_webhook_url:
+        sinks.append(
+            WebhookSink(app.state.event_bus, settings.events_webhook_url).start()
+        )
+
+    app.state.metrics_store = None
+    if settings.metrics_store_dir:
+        app.state.metrics_store = ZoneMetricsStore(
+            settings.metrics_store_dir, writer=f"worker-{worker_index()}"
+        ).start()
+
+    app.state.job_service = JobService(
+        detector=detector,
+        output_dir=settings.jobs_output_dir,
+        max_workers=settings.jobs_max_workers,
+        max_pending=settings.jobs_max_pending,
+        zone_configs=app.state.zone_configs,
+        event_bus=app.state.event_bus,
+        metrics_store=app.state.metrics_store,
+    )
 
-    log.info("model_loaded", device=settings.device)
+    app.state.stream_sessions = weakref.WeakSet()
+    zone_watcher = None
+    if settings.enable_analytics and settings.zones_watch:
+        zone_watcher = ZoneFileWatcher(
+            settings.zones_config_path,
+            lambda zone_configs: apply_zone_configs(app.state, zone_configs),
+        ).start()
+
+    admission = app.state.admission
+    job_service = app.state.job_service
+    QUEUE_DEPTH.set_function(lambda: admission.waiting)
+    ACTIVE_REQUESTS.set_function(lambda: admission.active)
+    LOADED_MODELS.set_function(lambda: len(registry.loaded()))
+    LOADED_MODEL_BYTES.set_function(lambda: registry.memory_bytes)
+    ACTIVE_JOBS.set_function(job_service.active_count)
+
+    # Serve health checks while warming up so orchestrators see "warming_up"
+    # rather than a refused connection.
+    warmup_task = asyncio.create_task(warm_up(app, detector, start_time))
+
+    log.info(
+        "api_started",
+        device=settings.device,
+        inference_replicas=len(settings.inference_addresses),
+        job_workers=app.state.job_service.max_workers,
+        model_load_ms=round(detector.load_time * 1000, 1),
+    )
 
     yield
 
+    warmup_task.cancel()
+
     log.info("shutting_down")
+    if zone_watcher:
+        zone_watcher.close()
+    app.state.job_service.shutdown()
+    for sink in sinks:
+        sink.close()
+    if app.state.metrics_store:
+        app.state.metrics_store.close()
+    if settings.inference_addresses:
+        for model in registry.loaded():
+            registry.get(model.name).close()
 
 
 def create_app() -> FastAPI:
@@ -41,7 +192,21 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        max_body_size=settings.api_max_image_size + MULTIPART_OVERHEAD,
+        paths=("/api/detect",),
+    )
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        max_body_size=settings.jobs_max_upload_size + MULTIPART_OVERHEAD,
+        paths=("/api/jobs",),
+    )
+    app.add_middleware(
+        RequestLoggingMiddleware,
+        sample_rate=settings.api_log_sample_rate,
+        slow_request_ms=settings.api_slow_request_ms,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.api_cors_origins,
@@ -51,6 +216,7 @@ def create_app() -> FastAPI:
     )
 
     app.include_router(router)
+    app.include_router(metrics_router)
 
     return app
 
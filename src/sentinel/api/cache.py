@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+# Share of the disk budget kept after a trim, so trims run once per many writes.
+DISK_TRIM_RATIO = 0.9
+
+
+class ResultCache:
+    """Detection results keyed by a hash of the raw upload and the inference
+    parameters, held in a bounded in-memory LRU with an optional disk tier.
+
+    The disk tier is bounded too: once it holds more than ``disk_max_entries``
+    files, the least recently used ones (by mtime, refreshed on every disk
+    hit) are deleted."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        disk_dir: Path | None = None,
+        disk_max_entries: int = 65536,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_entries = 0
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_entries = sum(1 for _ in self._disk_files())
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def key(self, contents: bytes, *params: object) -> str:
+        digest = hashlib.blake2b(contents, digest_size=16)
+        digest.update(repr(params).encode())
+        return digest.hexdigest()
+
+    def lookup(
+        self, contents: bytes, *params: object
+    ) -> tuple[str, dict[str, Any] | None]:
+        key = self.key(contents, *params)
+        return key, self.get(key)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+
+        payload = self._read_disk(key, now)
+
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, now + self.ttl, payload)
+
+        return payload
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._store(key, expires_at, payload)
+
+        self._write_disk(key, expires_at, payload)
+
+    def _store(self, key: str, expires_at: float, payload: dict[str, Any]) -> None:
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> dict[str, Any] | None:
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry["expires_at"] <= now:
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["payload"]
+
+    def _write_disk(self, key: str, expires_at: float, payload: dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"expires_at": expires_at, "payload": payload}, f)
+        os.replace(tmp_path, path)
+
+        with self._disk_lock:
+            self._disk_entries += 1
+            if self._disk_entries > self.disk_max_entries:
+                self._trim_disk()
+
+    def _disk_files(self):
+        return self.disk_dir.glob("*/*.json")
+
+    def _trim_disk(self) -> None:
+        """Delete the least recently used files down to ``DISK_TRIM_RATIO`` of
+        the budget. Called with ``_disk_lock`` held."""
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+
+        keep = int(self.disk_max_entries * DISK_TRIM_RATIO)
+        files.sort()
+        for _, path in files[: max(0, len(files) - keep)]:
+            path.unlink(missing_ok=True)
+        self._disk_entries = min(len(files), keep)
@@ -1,7 +1,42 @@
-from fastapi import Request
+from starlette.requests import HTTPConnection
 
+from sentinel.analytics.events import EventBus
+from sentinel.analytics.models import ZoneConfig
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.api.admission import AdmissionController
+from sentinel.api.cache import ResultCache
+from sentinel.detection.registry import ModelRegistry
 from sentinel.detection.service import DetectionService
+from sentinel.jobs.service import JobService
 
 
-def get_detection_service(request: Request) -> DetectionService:
-    return request.app.state.detection_service
+def get_admission_controller(connection: HTTPConnection) -> AdmissionController:
+    return connection.app.state.admission
+
+
+def get_detection_service(connection: HTTPConnection) -> DetectionService:
+    return connection.app.state.detection_service
+
+
+def get_model_registry(connection: HTTPConnection) -> ModelRegistry:
+    return connection.app.state.model_registry
+
+
+def get_result_cache(connection: HTTPConnection) -> ResultCache | None:
+    return getattr(connection.app.state, "result_cache", None)
+
+
+def get_zone_configs(connection: HTTPConnection) -> list[ZoneConfig]:
+    return getattr(connection.app.state, "zone_configs", [])
+
+
+def get_job_service(connection: HTTPConnection) -> JobService:
+    return connection.app.state.job_service
+
+
+def get_event_bus(connection: HTTPConnection) -> EventBus:
+    return connection.app.state.event_bus
+
+
+def get_metrics_store(connection: HTTPConnection) -> ZoneMetricsStore | None:
+    return getattr(connection.app.state, "metrics_store", None)
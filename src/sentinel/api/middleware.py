@@ -1,37 +1,111 @@
+import itertools
+import os
+import random
 import time
-import uuid
-from typing import Callable
 
 import structlog
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from sentinel.logging import get_logger
 
 log = get_logger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = str(uuid.uuid4())
+class BodySizeLimitMiddleware:
+    """Rejects request bodies over ``max_body_size`` on the given path
+    prefixes before the route runs.
 
-        structlog.contextvars.clear_contextvars()
-        structlog.contextvars.bind_contextvars(request_id=request_id)
-
-        start_time = time.time()
+    A declared ``Content-Length`` over the limit is answered with 413 without
+    reading the body; otherwise the body is counted as it arrives and the
+    request fails with 413 as soon as it crosses the limit, so a multipart
+    upload is never spooled past it.
+    """
 
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp, max_body_size: int, paths: tuple[str, ...]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = paths
 
-        duration_ms = (time.time() - start_time) * 1000
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
 
-        log.info(
-            "request_complete",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            duration_ms=round(duration_ms, 2),
+        detail = (
+            f"Request body exceeds maximum allowed size of {self.max_body_size} bytes"
         )
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_body_size:
+                response = JSONResponse({"detail": detail}, status_code=413)
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+class RequestLoggingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 1.0,
+        slow_request_ms: float = 1000.0,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+        self._id_prefix = os.urandom(4).hex()
+        self._id_counter = itertools.count()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = f"{self._id_prefix}-{next(self._id_counter):x}"
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+
+        start_time = time.perf_counter()
+        scope.setdefault("state", {})["start_time"] = start_time
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode()),
+                ]
+            await send(message)
 
-        response.headers["X-Request-ID"] = request_id
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
 
-        return response
+            if (
+                status_code >= 500
+                or duration_ms >= self.slow_request_ms
+                or random.random() < self.sample_rate
+            ):
+                log.info(
+                    "request_complete",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status_code=status_code,
+                    duration_ms=round(duration_ms, 2),
+                )
@@ -1,31 +1,158 @@
+import asyncio
 import time
-from fastapi import APIRouter, UploadFile, File, Depends, Request, HTTPException
+import uuid
+from pathlib import Path
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import FileResponse, PlainTextResponse
 from starlette.concurrency import run_in_threadpool
 
-from sentinel.api.schemas import DetectionResponse, HealthResponse
-from sentinel.api.dependencies import get_detection_service
-from sentinel.api.utils import decode_image, results_to_detections
+from sentinel.analytics.events import EventBus
+from sentinel.analytics.models import ZoneConfig
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.analytics.utils import load_zones_from_json, zone_classes
+from sentinel.api.admission import AdmissionController, OverloadedError
+from sentinel.api.cache import ResultCache
+from sentinel.api.dependencies import (
+    get_admission_controller,
+    get_detection_service,
+    get_event_bus,
+    get_job_service,
+    get_metrics_store,
+    get_model_registry,
+    get_result_cache,
+    get_zone_configs,
+)
+from sentinel.api.schemas import (
+    AdmissionStats,
+    CacheStats,
+    DetectionResponse,
+    HealthResponse,
+    JobResponse,
+    LoadedModelInfo,
+    ZoneMetricsHistoryResponse,
+    ZonesReloadResponse,
+)
+from sentinel.api.stream import LatestFrameSlot, StreamSession
+from sentinel.api.utils import (
+    apply_zone_configs,
+    decode_image_bytes,
+    job_to_response,
+    read_upload,
+    render_json,
+    resolve_job_source,
+    results_to_detections,
+    save_upload,
+    select_detection_service,
+)
+from sentinel.config import settings
+from sentinel.detection.registry import ModelRegistry
 from sentinel.detection.service import DetectionService
+from sentinel.detection.utils import parse_classes, resolve_classes
+from sentinel.jobs.models import JobStatus
+from sentinel.jobs.service import JobQueueFullError, JobService
 from sentinel.logging import get_logger
+from sentinel.metrics import (
+    ACTIVE_STREAMS,
+    API_STAGE_SECONDS,
+    CACHE_LOOKUPS,
+    REGISTRY,
+    REQUESTS_SHED,
+)
 
 log = get_logger(__name__)
 router = APIRouter(prefix="/api")
+metrics_router = APIRouter()
 
 
 @router.post("/detect", response_model=DetectionResponse, status_code=200)
 async def detect(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Image file to process"),
+    model: str | None = Form(None, description="Model name (defaults to server model)"),
+    conf_threshold: float | None = Form(
+        None, ge=0.0, le=1.0, description="Confidence threshold"
+    ),
+    classes: str | None = Form(
+        None, description="Comma-separated class names or IDs to detect"
+    ),
     service: DetectionService = Depends(get_detection_service),
-) -> DetectionResponse:
+    registry: ModelRegistry = Depends(get_model_registry),
+    admission: AdmissionController = Depends(get_admission_controller),
+    cache: ResultCache | None = Depends(get_result_cache),
+    request_timeout: float | None = Header(
+        None,
+        alias="X-Request-Timeout",
+        gt=0,
+        description="Seconds the client is willing to wait",
+    ),
+) -> Response:
     try:
         start_time = time.time()
 
-        image = await decode_image(file)
-        height, width = image.shape[:2]
+        service = await select_detection_service(
+            model, service, registry, conf_threshold, parse_classes(classes)
+        )
+        contents = await read_upload(file)
+        upload_start = getattr(request.state, "start_time", None)
+        if upload_start is not None:
+            API_STAGE_SECONDS.labels("upload").observe(
+                time.perf_counter() - upload_start
+            )
+
+        if cache:
+            cache_key, cached = await run_in_threadpool(
+                cache.lookup,
+                contents,
+                service.detector.model_name,
+                service.conf_threshold,
+                service.iou_threshold,
+                settings.max_detections,
+                service.classes,
+            )
+            response.headers["X-Cache"] = "HIT" if cached else "MISS"
+            CACHE_LOOKUPS.labels("hit" if cached else "miss").inc()
+            if cached:
+                return render_json(
+                    DetectionResponse(
+                        **cached, processing_time_ms=(time.time() - start_time) * 1000
+                    ),
+                    response,
+                )
 
-        results = await run_in_threadpool(service.process, image)
+        queued_at = time.perf_counter()
+        async with admission.admit(request_timeout):
+            API_STAGE_SECONDS.labels("queue").observe(time.perf_counter() - queued_at)
 
-        detections = results_to_detections(results)
+            with API_STAGE_SECONDS.labels("decode").time():
+                decoded = await run_in_threadpool(
+                    decode_image_bytes, contents, settings.input_size
+                )
+            width, height = decoded.width, decoded.height
+
+            with API_STAGE_SECONDS.labels("inference").time():
+                results = await run_in_threadpool(service.process, decoded.image)
+
+        with API_STAGE_SECONDS.labels("postprocess").time():
+            detections = results_to_detections(
+                results, decoded.scale_x, decoded.scale_y
+            )
 
         processing_time = (time.time() - start_time) * 1000
 
@@ -37,16 +164,29 @@ async def detect(
             detection_count=len(detections),
         )
 
-        return DetectionResponse(
-            detections=detections,
-            image_width=width,
-            image_height=height,
-            processing_time_ms=processing_time,
-            model_name=str(service.detector.model.ckpt_path.name),
-            device=service.detector.device,
+        result = {
+            "detections": detections,
+            "image_width": width,
+            "image_height": height,
+            "model_name": service.detector.model_name,
+            "device": service.detector.device,
+        }
+        if cache:
+            background_tasks.add_task(cache.put, cache_key, result)
+
+        return render_json(
+            DetectionResponse(**result, processing_time_ms=processing_time), response
         )
     except HTTPException:
         raise
+    except OverloadedError as e:
+        REQUESTS_SHED.labels(e.reason).inc()
+        log.warning("request_shed", reason=e.reason, retry_after=e.retry_after)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is overloaded, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         log.error("detection_failed", error=str(e), exc_info=True)
         raise HTTPException(
@@ -54,10 +194,379 @@ async def detect(
         )
 
 
+@router.websocket("/stream")
+async def stream(
+    websocket: WebSocket,
+    model: str | None = None,
+    classes: str | None = None,
+    source: str | None = None,
+    service: DetectionService = Depends(get_detection_service),
+    registry: ModelRegistry = Depends(get_model_registry),
+    admission: AdmissionController = Depends(get_admission_controller),
+    zone_configs: list[ZoneConfig] = Depends(get_zone_configs),
+    event_bus: EventBus = Depends(get_event_bus),
+    metrics_store: ZoneMetricsStore | None = Depends(get_metrics_store),
+) -> None:
+    await websocket.accept()
+
+    requested_classes = parse_classes(classes)
+    try:
+        # Without an explicit list, detect only what the zones count.
+        service = await select_detection_service(
+            model,
+            service,
+            registry,
+            classes=requested_classes or zone_classes(zone_configs),
+        )
+    except HTTPException as e:
+        await websocket.send_json({"error": e.detail})
+        await websocket.close(code=1008)
+        return
+
+    # History is only kept for streams the client named: a random ID per
+    # connection could never be queried again.
+    session = StreamSession(
+        service,
+        zone_configs,
+        event_bus,
+        source=source or f"stream-{uuid.uuid4().hex[:12]}",
+        metrics_store=metrics_store if source else None,
+        follow_zone_classes=not requested_classes,
+    )
+    slot = LatestFrameSlot()
+    sessions = getattr(websocket.app.state, "stream_sessions", None)
+    if sessions is not None:
+        sessions.add(session)
+    ACTIVE_STREAMS.inc()
+
+    async def receive_frames() -> None:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes") is not None:
+                    slot.put(message["bytes"])
+        finally:
+            slot.close()
+
+    receiver = asyncio.create_task(receive_frames())
+    log.info("stream_opened", zone_count=len(zone_configs))
+
+    try:
+        while (frame := await slot.get()) is not None:
+            if len(frame) > settings.api_max_image_size:
+                await websocket.send_json(
+                    {
+                        "error": f"Image size exceeds maximum allowed size of {settings.api_max_image_size} bytes"
+                    }
+                )
+                continue
+
+            # Frames share the inference slots and load shedding of
+            # /api/detect; a shed frame is reported and the stream goes on.
+            try:
+                async with admission.admit():
+                    response = await run_in_threadpool(
+                        session.process, frame, slot.dropped
+                    )
+            except OverloadedError as e:
+                REQUESTS_SHED.labels(e.reason).inc()
+                await websocket.send_json(
+                    {
+                        "error": "Server is overloaded, retry later",
+                        "retry_after": e.retry_after,
+                    }
+                )
+                continue
+            except HTTPException as e:
+                await websocket.send_json({"error": e.detail})
+                continue
+            except Exception as e:
+                log.error("stream_frame_failed", error=str(e), exc_info=True)
+                await websocket.send_json(
+                    {"error": "Internal server error during detection"}
+                )
+                continue
+
+            await websocket.send_text(response.model_dump_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        session.close()
+        ACTIVE_STREAMS.dec()
+        log.info(
+            "stream_closed",
+            frames_processed=session.frame_index,
+            dropped_frames=slot.dropped,
+        )
+
+
+@router.post("/zones/reload", response_model=ZonesReloadResponse, status_code=200)
+async def reload_zones(request: Request) -> ZonesReloadResponse:
+    if not settings.enable_analytics:
+        raise HTTPException(status_code=409, detail="Analytics is disabled")
+
+    try:
+        zone_configs = await run_in_threadpool(
+            load_zones_from_json, settings.zones_config_path
+        )
+        apply_zone_configs(request.app.state, zone_configs)
+    except (OSError, KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid zones file: {e}")
+
+    log.info("zones_reloaded", zone_count=len(zone_configs))
+    return ZonesReloadResponse(zone_count=len(zone_configs))
+
+
+@router.get(
+    "/zones/{zone_id}/metrics",
+    response_model=ZoneMetricsHistoryResponse,
+    status_code=200,
+)
+async def get_zone_metrics_history(
+    zone_id: str,
+    start: float | None = Query(
+        None, alias="from", description="Start (Unix seconds, default 24h ago)"
+    ),
+    end: float | None = Query(None, alias="to", description="End (Unix seconds)"),
+    step: int | None = Query(None, gt=0, description="Bucket width in seconds"),
+    source: str | None = Query(
+        None, description="Stream or job ID (default: all sources)"
+    ),
+    metrics_store: ZoneMetricsStore | None = Depends(get_metrics_store),
+    zone_configs: list[ZoneConfig] = Depends(get_zone_configs),
+) -> ZoneMetricsHistoryResponse:
+    if metrics_store is None:
+        raise HTTPException(status_code=409, detail="Metrics store is disabled")
+
+    end = time.time() if end is None else end
+    start = end - 86400 if start is None else start
+    configured = any(config.id == zone_id for config in zone_configs)
+    if not configured and not metrics_store.has_zone(zone_id, source):
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    try:
+        series = await run_in_threadpool(
+            metrics_store.query, zone_id, start, end, step, source
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ZoneMetricsHistoryResponse(
+        zone_id=zone_id, source=source, step=series.step, points=series.to_dicts()
+    )
+
+
+@router.websocket("/events")
+async def events(
+    websocket: WebSocket,
+    from_start: bool = False,
+    batch_size: int = 256,
+    event_bus: EventBus = Depends(get_event_bus),
+) -> None:
+    await websocket.accept()
+    subscription = event_bus.subscribe("websocket", from_start=from_start)
+
+    async def watch_disconnect() -> None:
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    log.info("events_subscribed", from_start=from_start)
+
+    try:
+        while batch := await subscription.next_batch(max(1, batch_size)):
+            await websocket.send_json(
+                {
+                    "events": [event.to_dict() for event in batch],
+                    "dropped": subscription.dropped,
+                }
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        subscription.close()
+        log.info(
+            "events_unsubscribed",
+            delivered=subscription.delivered,
+            dropped=subscription.dropped,
+        )
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(
+    file: UploadFile | None = File(None, description="Video file to process"),
+    source: str | None = Form(
+        None, description="Video path relative to the server's jobs input directory"
+    ),
+    track: bool = Form(False, description="Enable tracking"),
+    analytics: bool = Form(False, description="Enable zone analytics"),
+    jobs: JobService = Depends(get_job_service),
+) -> JobResponse:
+    if (file is None) == (source is None):
+        raise HTTPException(
+            status_code=400, detail="Provide exactly one of file or source"
+        )
+    if analytics and not track:
+        raise HTTPException(status_code=400, detail="Analytics requires tracking")
+    if analytics and not jobs.zone_configs:
+        raise HTTPException(status_code=400, detail="No zones configured")
+
+    job_id = jobs.new_job_id()
+    remove_source = file is not None
+
+    if file is not None:
+        suffix = Path(file.filename or "").suffix or ".mp4"
+        source_path = jobs.output_dir / f"{job_id}_input{suffix}"
+        await run_in_threadpool(save_upload, file, source_path)
+    else:
+        source_path = resolve_job_source(source)
+
+    try:
+        job = jobs.submit(
+            source_path,
+            enable_tracking=track,
+            enable_analytics=analytics,
+            job_id=job_id,
+            remove_source=remove_source,
+        )
+    except JobQueueFullError as e:
+        if remove_source:
+            source_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "30"}
+        )
+
+    return job_to_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, status_code=200)
+async def get_job(
+    job_id: str,
+    jobs: JobService = Depends(get_job_service),
+) -> JobResponse:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job_to_response(job)
+
+
+@router.get("/jobs/{job_id}/result", response_class=FileResponse)
+async def get_job_result(
+    job_id: str,
+    jobs: JobService = Depends(get_job_service),
+) -> FileResponse:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job.status.value}, not completed"
+        )
+
+    return FileResponse(
+        job.output_path, media_type="video/mp4", filename=job.output_path.name
+    )
+
+
+@router.get("/jobs/{job_id}/heatmap", response_class=Response)
+async def get_job_heatmap(
+    job_id: str,
+    kind: str = "occupancy",
+    window: float | None = None,
+    classes: str | None = None,
+    jobs: JobService = Depends(get_job_service),
+) -> Response:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.heatmaps:
+        # Finished jobs keep one rendered heatmap per kind and window.
+        if classes:
+            raise HTTPException(
+                status_code=400,
+                detail="Class filters are only available while the job is running",
+            )
+        try:
+            path = job.heatmap_path(kind, window)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FileResponse(path, media_type="image/png")
+
+    heatmap = job.analytics.heatmap if job.analytics else None
+    if heatmap is None:
+        raise HTTPException(status_code=404, detail="Job has no heatmap yet")
+
+    try:
+        class_ids = resolve_classes(parse_classes(classes), heatmap.names)
+        png = await run_in_threadpool(heatmap.to_png, kind, window, class_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(content=png, media_type="image/png")
+
+
 @router.get("/health", response_model=HealthResponse, status_code=200)
-async def health(request: Request) -> HealthResponse:
+async def health(request: Request, response: Response) -> HealthResponse:
+    registry = getattr(request.app.state, "model_registry", None)
+    loaded_models = registry.loaded() if registry else []
+
+    admission = getattr(request.app.state, "admission", None)
+    admission_stats = None
+    status = "healthy"
+    if admission:
+        admission_stats = AdmissionStats(
+            active=admission.active,
+            waiting=admission.waiting,
+            max_concurrency=admission.max_concurrency,
+            max_queue=admission.max_queue,
+            admitted=admission.admitted,
+            shed_queue_full=admission.shed_queue_full,
+            shed_deadline=admission.shed_deadline,
+        )
+        if admission.saturated:
+            status = "saturated"
+            response.status_code = 503
+
+    ready = getattr(request.app.state, "ready", True)
+    if not ready:
+        status = "warming_up"
+        response.status_code = 503
+
+    cache = getattr(request.app.state, "result_cache", None)
+    cache_stats = None
+    if cache:
+        cache_stats = CacheStats(
+            hits=cache.hits, misses=cache.misses, entries=cache.size
+        )
+
     return HealthResponse(
-        status="healthy",
+        status=status,
+        ready=ready,
         model_loaded=hasattr(request.app.state, "detection_service"),
         device=request.app.state.device,
+        loaded_models=[
+            LoadedModelInfo(
+                name=model.name,
+                memory_mb=round(model.memory_bytes / (1024 * 1024), 2),
+            )
+            for model in loaded_models
+        ],
+        admission=admission_stats,
+        cache=cache_stats,
+    )
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
     )
@@ -11,6 +11,7 @@ class DetectionBox(BaseModel):
     )
     class_id: int = Field(..., description="Class ID")
     class_name: str = Field(..., description="Class name")
+    track_id: int | None = Field(None, description="Track ID when tracking is enabled")
 
 
 class DetectionResponse(BaseModel):
@@ -24,7 +25,106 @@ class DetectionResponse(BaseModel):
     device: str = Field(..., description="Device used for inference")
 
 
+class LoadedModelInfo(BaseModel):
+    name: str = Field(..., description="Model name")
+    memory_mb: float = Field(..., description="Memory used by model weights in MB")
+
+
+class AdmissionStats(BaseModel):
+    active: int = Field(..., description="Requests currently being processed")
+    waiting: int = Field(..., description="Requests waiting for a slot")
+    max_concurrency: int = Field(..., description="Maximum concurrent requests")
+    max_queue: int = Field(..., description="Maximum waiting requests")
+    admitted: int = Field(..., description="Requests admitted since startup")
+    shed_queue_full: int = Field(
+        ..., description="Requests rejected because the queue was full"
+    )
+    shed_deadline: int = Field(
+        ..., description="Requests rejected because they could not meet their deadline"
+    )
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(..., description="Requests served from the result cache")
+    misses: int = Field(..., description="Requests that missed the result cache")
+    entries: int = Field(..., description="Entries held in memory")
+
+
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Service status")
+    ready: bool = Field(True, description="Whether model warmup has finished")
     model_loaded: bool = Field(..., description="Whether model is loaded")
     device: str = Field(..., description="Device used for inference")
+    loaded_models: list[LoadedModelInfo] = Field(
+        default_factory=list, description="Models currently resident in memory"
+    )
+    admission: AdmissionStats | None = Field(
+        None, description="Detection request admission statistics"
+    )
+    cache: CacheStats | None = Field(None, description="Result cache statistics")
+
+
+class ZoneMetricsResponse(BaseModel):
+    zone_id: str = Field(..., description="Zone ID")
+    zone_name: str = Field(..., description="Zone name")
+    current_count: int = Field(..., description="Objects currently in the zone")
+    total_entries: int = Field(..., description="Total entries into the zone")
+    total_exits: int = Field(..., description="Total exits from the zone")
+    avg_dwell_time: float = Field(..., description="Average dwell time in seconds")
+    max_dwell_time: float = Field(..., description="Maximum dwell time in seconds")
+
+
+class ZoneMetricsPoint(BaseModel):
+    timestamp: float = Field(..., description="Bucket start (Unix seconds)")
+    samples: int = Field(..., description="Frames recorded in the bucket")
+    avg_count: float | None = Field(
+        None, description="Average objects in the zone (null without samples)"
+    )
+    max_count: int = Field(..., description="Most objects in the zone at once")
+    entries: int = Field(..., description="Entries and inbound line crossings")
+    exits: int = Field(..., description="Exits and outbound line crossings")
+    avg_dwell_time: float | None = Field(
+        None, description="Average dwell time of exits in seconds"
+    )
+    max_dwell_time: float | None = Field(
+        None, description="Longest dwell time of exits in seconds"
+    )
+
+
+class ZoneMetricsHistoryResponse(BaseModel):
+    zone_id: str = Field(..., description="Zone ID")
+    source: str | None = Field(None, description="Source, or None for all sources")
+    step: int = Field(..., description="Bucket width in seconds")
+    points: list[ZoneMetricsPoint] = Field(..., description="One point per bucket")
+
+
+class StreamFrameResponse(BaseModel):
+    frame_index: int = Field(..., description="Index of the processed frame")
+    detections: list[DetectionBox] = Field(..., description="Tracked objects")
+    metrics: list[ZoneMetricsResponse] = Field(..., description="Zone metrics")
+    image_width: int = Field(..., description="Input image width")
+    image_height: int = Field(..., description="Input image height")
+    processing_time_ms: float = Field(
+        ..., description="Processing time in milliseconds"
+    )
+    dropped_frames: int = Field(
+        ..., description="Frames dropped because inference was busy"
+    )
+
+
+class JobResponse(BaseModel):
+    id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="Job status")
+    frames_processed: int = Field(..., description="Frames processed so far")
+    total_frames: int = Field(
+        ..., description="Total frames in the source (0 if unknown)"
+    )
+    fps: float = Field(..., description="Processing throughput in frames per second")
+    error: str | None = Field(None, description="Error message if the job failed")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    started_at: float | None = Field(None, description="Start time (Unix seconds)")
+    finished_at: float | None = Field(None, description="Finish time (Unix seconds)")
+
+
+class ZonesReloadResponse(BaseModel):
+    zone_count: int = Field(..., description="Zones now in effect")
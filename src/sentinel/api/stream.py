@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+from sentinel.analytics.events import EventBus
+from sentinel.analytics.models import ZoneConfig
+from sentinel.analytics.service import AnalyticsService
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.analytics.utils import zone_classes
+from sentinel.api.schemas import StreamFrameResponse, ZoneMetricsResponse
+from sentinel.api.utils import decode_image_bytes, results_to_detections
+from sentinel.detection.service import DetectionService
+from sentinel.detection.tracking import create_tracker
+
+
+class LatestFrameSlot:
+    """Single-slot buffer that keeps only the newest unprocessed frame."""
+
+    def __init__(self):
+        self._frame: bytes | None = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame: bytes) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self._ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> bytes | None:
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        frame, self._frame = self._frame, None
+        return frame
+
+
+class StreamSession:
+    def __init__(
+        self,
+        detection_service: DetectionService,
+        zone_configs: list[ZoneConfig] | None = None,
+        event_bus: EventBus | None = None,
+        source: str | None = None,
+        metrics_store: ZoneMetricsStore | None = None,
+        follow_zone_classes: bool = False,
+    ):
+        self.detection_service = detection_service
+        self.tracker = create_tracker()
+        self.event_bus = event_bus
+        self.source = source
+        self.metrics_store = metrics_store
+        # Sessions opened without an explicit class list detect only what the
+        # zones count, and keep doing so across reloads.
+        self.follow_zone_classes = follow_zone_classes
+        self.analytics_service = (
+            self._create_analytics(zone_configs) if zone_configs else None
+        )
+        self.frame_index = 0
+
+    def _create_analytics(self, zone_configs: list[ZoneConfig]) -> AnalyticsService:
+        return AnalyticsService(
+            zone_configs,
+            event_bus=self.event_bus,
+            source=self.source,
+            metrics_store=self.metrics_store,
+        )
+
+    def reload_zones(self, zone_configs: list[ZoneConfig]) -> None:
+        """Swap zones in between frames; a session opened before any zones
+        existed starts counting once some are configured."""
+        if self.analytics_service:
+            self.analytics_service.reload(zone_configs)
+        elif zone_configs:
+            self.analytics_service = self._create_analytics(zone_configs)
+
+        if self.follow_zone_classes:
+            # Replaced rather than updated: the session may be sharing the
+            # app's default service.
+            service = self.detection_service
+            self.detection_service = DetectionService(
+                detector=service.detector,
+                conf_threshold=service.conf_threshold,
+                iou_threshold=service.iou_threshold,
+                classes=zone_classes(zone_configs),
+            )
+
+    def close(self) -> None:
+        if self.metrics_store:
+            self.metrics_store.release(self.source)
+
+    def process(self, contents: bytes, dropped_frames: int = 0) -> StreamFrameResponse:
+        start_time = time.time()
+
+        image = decode_image_bytes(contents).image
+        height, width = image.shape[:2]
+
+        results = self.detection_service.process(image)
+        results = self.tracker.update(results)
+
+        metrics = {}
+        if self.analytics_service:
+            metrics = self.analytics_service.update(results)
+
+        response = StreamFrameResponse(
+            frame_index=self.frame_index,
+            detections=results_to_detections(results),
+            metrics=[
+                ZoneMetricsResponse(
+                    zone_id=metric.zone_id,
+                    zone_name=metric.zone_name,
+                    current_count=metric.current_count,
+                    total_entries=metric.total_entries,
+                    total_exits=metric.total_exits,
+                    avg_dwell_time=metric.avg_dwell_time,
+                    max_dwell_time=metric.max_dwell_time,
+                )
+                for metric in metrics.values()
+            ],
+            image_width=width,
+            image_height=height,
+            processing_time_ms=(time.time() - start_time) * 1000,
+            dropped_frames=dropped_frames,
+        )
+        self.frame_index += 1
+
+        return response
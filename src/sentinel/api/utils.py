@@ -1,32 +1,128 @@
-import imghdr
-import numpy as np
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
 import cv2
-from fastapi import UploadFile, HTTPException
+import numpy as np
+from fastapi import HTTPException, Response, UploadFile
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from ultralytics.engine.results import Results
 
+from sentinel.analytics.models import ZoneConfig
+from sentinel.analytics.utils import validate_zones
+from sentinel.api.schemas import JobResponse
 from sentinel.config import settings
+from sentinel.detection.registry import ModelRegistry, UnknownModelError
+from sentinel.detection.service import DetectionService
+from sentinel.jobs.models import Job
+from sentinel.metrics import API_STAGE_SECONDS
 
 ALLOWED_IMAGE_TYPES = {"jpeg", "png", "bmp", "webp"}
+IMAGE_HEADER_SIZE = 12
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
 
 
-async def decode_image(file: UploadFile) -> np.ndarray:
-    contents = await file.read()
+@dataclass
+class DecodedImage:
+    image: np.ndarray
+    width: int
+    height: int
 
-    if len(contents) > settings.api_max_image_size:
+    @property
+    def scale_x(self) -> float:
+        return self.width / self.image.shape[1]
+
+    @property
+    def scale_y(self) -> float:
+        return self.height / self.image.shape[0]
+
+
+def sniff_image_type(header: bytes) -> str | None:
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def jpeg_size(contents: bytes) -> tuple[int, int] | None:
+    i = 2
+    while i + 9 <= len(contents):
+        if contents[i] != 0xFF:
+            return None
+
+        marker = contents[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            i += 2
+            continue
+
+        if marker in JPEG_SOF_MARKERS:
+            height = int.from_bytes(contents[i + 5 : i + 7], "big")
+            width = int.from_bytes(contents[i + 7 : i + 9], "big")
+            return width, height
+
+        i += 2 + int.from_bytes(contents[i + 2 : i + 4], "big")
+
+    return None
+
+
+def _invalid_image_type() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"Invalid image type. Allowed types: {', '.join(sorted(ALLOWED_IMAGE_TYPES))}",
+    )
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    if file.size is not None and file.size > settings.api_max_image_size:
         raise HTTPException(
             status_code=400,
             detail=f"Image size exceeds maximum allowed size of {settings.api_max_image_size} bytes",
         )
 
-    image_type = imghdr.what(None, h=contents)
-    if image_type not in ALLOWED_IMAGE_TYPES:
+    header = await file.read(IMAGE_HEADER_SIZE)
+    if sniff_image_type(header) not in ALLOWED_IMAGE_TYPES:
+        raise _invalid_image_type()
+
+    contents = header + await file.read(settings.api_max_image_size + 1 - len(header))
+
+    if len(contents) > settings.api_max_image_size:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid image type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}",
+            detail=f"Image size exceeds maximum allowed size of {settings.api_max_image_size} bytes",
         )
 
+    return contents
+
+
+def decode_image_bytes(contents: bytes, target_size: int | None = None) -> DecodedImage:
+    image_type = sniff_image_type(contents[:IMAGE_HEADER_SIZE])
+    if image_type not in ALLOWED_IMAGE_TYPES:
+        raise _invalid_image_type()
+
+    flags = cv2.IMREAD_COLOR
+    size = jpeg_size(contents) if image_type == "jpeg" else None
+    if size and target_size:
+        for factor, reduced_flags in REDUCED_DECODE_FLAGS:
+            if max(size) // factor >= target_size:
+                flags = reduced_flags
+                break
+
     nparr = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    image = cv2.imdecode(nparr, flags)
 
     if image is None:
         raise HTTPException(
@@ -34,15 +130,58 @@ async def decode_image(file: UploadFile) -> np.ndarray:
             detail="Failed to decode image. File may be corrupted.",
         )
 
-    return image
+    height, width = image.shape[:2]
+    if flags != cv2.IMREAD_COLOR:
+        width, height = size
+        if (image.shape[1] >= image.shape[0]) != (width >= height):
+            width, height = height, width
+
+    return DecodedImage(image=image, width=width, height=height)
+
 
+async def select_detection_service(
+    model: str | None,
+    service: DetectionService,
+    registry: ModelRegistry,
+    conf_threshold: float | None = None,
+    classes: list[str | int] | None = None,
+) -> DetectionService:
+    if model is None or model == service.detector.model_name:
+        detector = service.detector
+    else:
+        try:
+            detector = await run_in_threadpool(registry.get, model)
+        except UnknownModelError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-def results_to_detections(results: Results) -> list[dict]:
+    if detector is service.detector and conf_threshold is None and classes is None:
+        return service
+
+    try:
+        return DetectionService(
+            detector=detector,
+            conf_threshold=(
+                conf_threshold if conf_threshold is not None else service.conf_threshold
+            ),
+            iou_threshold=service.iou_threshold,
+            classes=classes if classes is not None else service.classes,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def results_to_detections(
+    results: Results, scale_x: float = 1.0, scale_y: float = 1.0
+) -> list[dict]:
     detections = []
 
     if results.boxes is None or len(results.boxes) == 0:
         return detections
 
+    track_ids = None
+    if results.boxes.id is not None:
+        track_ids = results.boxes.id.int().cpu().tolist()
+
     for i in range(len(results.boxes)):
         box = results.boxes.xyxy[i].cpu().numpy()
         conf = float(results.boxes.conf[i].cpu().numpy())
@@ -50,14 +189,89 @@ def results_to_detections(results: Results) -> list[dict]:
 
         detections.append(
             {
-                "x1": float(box[0]),
-                "y1": float(box[1]),
-                "x2": float(box[2]),
-                "y2": float(box[3]),
+                "x1": float(box[0]) * scale_x,
+                "y1": float(box[1]) * scale_y,
+                "x2": float(box[2]) * scale_x,
+                "y2": float(box[3]) * scale_y,
                 "confidence": conf,
                 "class_id": cls,
                 "class_name": results.names[cls],
+                "track_id": track_ids[i] if track_ids is not None else None,
             }
         )
 
     return detections
+
+
+def render_json(model: BaseModel, response: Response) -> Response:
+    with API_STAGE_SECONDS.labels("serialize").time():
+        body = model.model_dump_json()
+
+    headers = {
+        key: value for key, value in response.headers.items() if key != "content-length"
+    }
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def save_upload(file: UploadFile, path: Path) -> None:
+    if file.size is not None and file.size > settings.jobs_max_upload_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Video size exceeds maximum allowed size of {settings.jobs_max_upload_size} bytes",
+        )
+
+    with open(path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+
+
+def resolve_job_source(source: str) -> Path:
+    if settings.jobs_input_dir is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Submitting server-side paths is disabled. Upload the video instead.",
+        )
+
+    input_dir = settings.jobs_input_dir.resolve()
+    path = (input_dir / source).resolve()
+
+    if not path.is_relative_to(input_dir) or not path.is_file():
+        raise HTTPException(status_code=400, detail=f"Video not found: {source}")
+
+    return path
+
+
+def job_to_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        status=job.status.value,
+        frames_processed=job.frames_processed,
+        total_frames=job.total_frames,
+        fps=job.fps,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def apply_zone_configs(state, zone_configs: list[ZoneConfig]) -> None:
+    """Use new zones for later streams and jobs and swap them into the ones
+    already running.
+
+    The zones are checked against every model in use first, so a file that
+    any of them rejects changes nothing.
+    """
+    sessions = list(getattr(state, "stream_sessions", ()))
+    detectors = [
+        state.detection_service.detector,
+        *state.job_service.analytics_detectors(),
+        *(session.detection_service.detector for session in sessions),
+    ]
+    validate_zones(
+        zone_configs, {id(detector): detector.names for detector in detectors}.values()
+    )
+
+    state.zone_configs = zone_configs
+    state.job_service.reload_zones(zone_configs)
+    for session in sessions:
+        session.reload_zones(zone_configs)
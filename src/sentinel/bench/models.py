@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from sentinel.bench.utils import percentile
+
+SCENARIOS = (
+    "predict",
+    "predict_batch",
+    "lookahead",
+    "track",
+    "tracker_scaling",
+    "analytics",
+    "analytics_scaling",
+    "heatmap",
+    "metrics_store",
+    "annotate",
+    "headless",
+    "threads",
+    "api",
+    "import",
+)
+
+
+class MotionPattern(str, Enum):
+    LINEAR = "linear"
+    RANDOM_WALK = "random_walk"
+    STATIC = "static"
+
+
+class ZoneLayout(str, Enum):
+    GRID = "grid"
+    RANDOM = "random"
+    LINES = "lines"
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: list[float] = field(repr=False)
+    items_per_iteration: int = 1
+    peak_rss_mb: float = 0.0
+    params: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def iterations(self) -> int:
+        return len(self.latencies_ms)
+
+    @property
+    def p50_ms(self) -> float:
+        return percentile(self.latencies_ms, 50)
+
+    @property
+    def p95_ms(self) -> float:
+        return percentile(self.latencies_ms, 95)
+
+    @property
+    def p99_ms(self) -> float:
+        return percentile(self.latencies_ms, 99)
+
+    @property
+    def throughput(self) -> float:
+        total_seconds = sum(self.latencies_ms) / 1000
+        if total_seconds == 0:
+            return 0.0
+        return self.iterations * self.items_per_iteration / total_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "items_per_iteration": self.items_per_iteration,
+            "p50_ms": round(self.p50_ms, 3),
+            "p95_ms": round(self.p95_ms, 3),
+            "p99_ms": round(self.p99_ms, 3),
+            "mean_ms": round(sum(self.latencies_ms) / max(self.iterations, 1), 3),
+            "throughput_per_s": round(self.throughput, 2),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "params": self.params,
+        }
@@ -0,0 +1,602 @@
+import asyncio
+import itertools
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+import torch
+from fastapi import FastAPI
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.heatmap import OccupancyHeatmap
+from sentinel.analytics.models import ZoneConfig, ZoneMetrics
+from sentinel.analytics.service import AnalyticsService
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.api.admission import AdmissionController
+from sentinel.api.middleware import RequestLoggingMiddleware
+from sentinel.api.routes import metrics_router, router
+from sentinel.bench.models import SCENARIOS, ScenarioResult, ZoneLayout
+from sentinel.bench.synthetic import (
+    SyntheticScene,
+    SyntheticWorkload,
+    moving_box_frames,
+    zone_layout,
+)
+from sentinel.bench.utils import peak_rss_mb, time_iterations
+from sentinel.config import settings
+from sentinel.cpu import available_cpus
+from sentinel.detection.models import YOLODetector
+from sentinel.detection.registry import ModelRegistry
+from sentinel.detection.service import DetectionService
+from sentinel.detection.tracking import create_tracker
+from sentinel.records import open_record_writer
+from sentinel.video_pipeline import VideoPipeline
+from sentinel.visualization.annotators import Annotators
+
+PREDICT_SIZES = ((640, 480), (1280, 720), (1920, 1080))
+VIDEO_SIZE = (1280, 720)
+ANNOTATE_SIZE = (1920, 1080)
+SCALING_STEPS = ((10, 50), (100, 250), (500, 1000))
+TRACKER_STEPS = (10, 100, 500, 1000)
+CLI_MODULE = "sentinel.cli"
+HEAVY_MODULES = ("torch", "ultralytics", "cv2", "supervision", "fastapi")
+
+
+class BenchmarkRunner:
+    """Runs a fixed set of benchmark scenarios against one detector."""
+
+    def __init__(
+        self,
+        detector: YOLODetector,
+        iterations: int = 30,
+        warmup: int = 3,
+        batch_size: int = 8,
+        zone_count: int = 10,
+        zone_layout: ZoneLayout = ZoneLayout.GRID,
+        scene: SyntheticScene | None = None,
+        video: Path | None = None,
+    ):
+        self.detector = detector
+        self.iterations = iterations
+        self.warmup = warmup
+        self.batch_size = batch_size
+        self.zone_count = zone_count
+        self.zone_layout = zone_layout
+        self.scene = scene or SyntheticScene(*ANNOTATE_SIZE)
+        self.video = video
+        self.skipped: dict[str, str] = {}
+        self._scenarios: dict[str, Callable[[], list[ScenarioResult]]] = {
+            "predict": self.bench_predict,
+            "predict_batch": self.bench_predict_batch,
+            "lookahead": self.bench_lookahead,
+            "track": self.bench_track,
+            "tracker_scaling": self.bench_tracker_scaling,
+            "analytics": self.bench_analytics,
+            "analytics_scaling": self.bench_analytics_scaling,
+            "heatmap": self.bench_heatmap,
+            "metrics_store": self.bench_metrics_store,
+            "annotate": self.bench_annotate,
+            "headless": self.bench_headless,
+            "threads": self.bench_threads,
+            "api": self.bench_api,
+            "import": self.bench_import,
+        }
+
+    def run(
+        self,
+        scenarios: list[str] | None = None,
+        on_result: Callable[[ScenarioResult], None] | None = None,
+    ) -> list[ScenarioResult]:
+        results = []
+        for name in scenarios or SCENARIOS:
+            if name not in self._scenarios:
+                raise ValueError(f"Unknown scenario: {name}")
+            for result in self._scenarios[name]():
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        return results
+
+    def _result(
+        self, name: str, latencies: list[float], items: int = 1, **params: Any
+    ) -> ScenarioResult:
+        return ScenarioResult(
+            name=name,
+            latencies_ms=latencies,
+            items_per_iteration=items,
+            peak_rss_mb=peak_rss_mb(),
+            params=params,
+        )
+
+    def bench_predict(self) -> list[ScenarioResult]:
+        service = DetectionService(self.detector)
+        results = []
+        for width, height in PREDICT_SIZES:
+            frame = moving_box_frames(1, width, height)[0]
+            latencies = time_iterations(
+                lambda _: service.process(frame), self.iterations, self.warmup
+            )
+            results.append(
+                self._result(
+                    f"predict_{width}x{height}", latencies, width=width, height=height
+                )
+            )
+        return results
+
+    def bench_predict_batch(self) -> list[ScenarioResult]:
+        frames = moving_box_frames(self.batch_size, *VIDEO_SIZE)
+        latencies = time_iterations(
+            lambda _: self.detector.predict_batch(frames),
+            self.iterations,
+            self.warmup,
+        )
+        return [
+            self._result(
+                f"predict_batch_{self.batch_size}",
+                latencies,
+                items=self.batch_size,
+                batch_size=self.batch_size,
+            )
+        ]
+
+    def bench_lookahead(self) -> list[ScenarioResult]:
+        """Headless pipeline runs over a clip of ``batch_size`` frames, one
+        frame at a time against one look-ahead batch."""
+        frames = self._video_frames(self.batch_size)
+        height, width = frames[0].shape[:2]
+        service = DetectionService(self.detector)
+        annotators = Annotators()
+
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "clip.mp4"
+            writer = cv2.VideoWriter(
+                str(path), cv2.VideoWriter_fourcc(*"mp4v"), 30, (width, height)
+            )
+            for frame in frames:
+                writer.write(frame)
+            writer.release()
+
+            for batch_size in dict.fromkeys((1, self.batch_size)):
+                pipeline = VideoPipeline(
+                    service,
+                    annotators,
+                    show_display=False,
+                    headless=True,
+                    batch_size=batch_size,
+                )
+                latencies = time_iterations(
+                    lambda _: pipeline.run(str(path)), self.iterations, self.warmup
+                )
+                results.append(
+                    self._result(
+                        f"lookahead_{batch_size}",
+                        latencies,
+                        items=len(frames),
+                        batch_size=batch_size,
+                        width=width,
+                        height=height,
+                    )
+                )
+        return results
+
+    def bench_track(self) -> list[ScenarioResult]:
+        frames = self._video_frames(self.iterations + self.warmup)
+        # Ultralytics keeps tracker state on the model, so tracking gets its
+        # own detector instead of leaving trackers attached to the shared one.
+        detector = YOLODetector(self.detector.model_name, self.detector.device)
+        service = DetectionService(detector, enable_tracking=True)
+        latencies = time_iterations(
+            lambda i: service.process(frames[i % len(frames)]),
+            self.iterations,
+            self.warmup,
+        )
+        height, width = frames[0].shape[:2]
+        return [
+            self._result(
+                "track_video",
+                latencies,
+                tracker=detector.tracker_type,
+                source=str(self.video) if self.video else "synthetic",
+                width=width,
+                height=height,
+            )
+        ]
+
+    def bench_tracker_scaling(self) -> list[ScenarioResult]:
+        results = []
+        for objects in TRACKER_STEPS:
+            scene = replace(self.scene, objects=objects)
+            frames = list(
+                SyntheticWorkload(scene).results(
+                    self.iterations + self.warmup, tracked=False
+                )
+            )
+            for tracker_type in ("native", "botsort"):
+                tracker = create_tracker(tracker_type)
+                latencies = time_iterations(
+                    lambda i: tracker.update(frames[i]), self.iterations, self.warmup
+                )
+                results.append(
+                    self._result(
+                        f"tracker_{tracker_type}_{objects}t",
+                        latencies,
+                        tracker=tracker_type,
+                        tracks=objects,
+                    )
+                )
+        return results
+
+    def zone_configs(self, count: int | None = None) -> list[ZoneConfig]:
+        return zone_layout(
+            count or self.zone_count,
+            self.scene.width,
+            self.scene.height,
+            self.zone_layout,
+            seed=self.scene.seed,
+        )
+
+    def _scene_results(self, objects: int | None = None) -> list[Results]:
+        scene = replace(self.scene, objects=objects or self.scene.objects)
+        return list(SyntheticWorkload(scene).results(self.iterations + self.warmup))
+
+    def _bench_analytics(
+        self, name: str, zone_count: int, track_count: int
+    ) -> ScenarioResult:
+        frames = self._scene_results(track_count)
+        service = AnalyticsService(self.zone_configs(zone_count))
+        latencies = time_iterations(
+            lambda i: service.update(frames[i]), self.iterations, self.warmup
+        )
+        return self._result(
+            f"{name}_{zone_count}z_{track_count}t",
+            latencies,
+            zones=zone_count,
+            tracks=track_count,
+            layout=self.zone_layout.value,
+            motion=self.scene.motion.value,
+        )
+
+    def bench_analytics(self) -> list[ScenarioResult]:
+        return [self._bench_analytics("analytics", self.zone_count, self.scene.objects)]
+
+    def bench_analytics_scaling(self) -> list[ScenarioResult]:
+        return [
+            self._bench_analytics("scaling", zone_count, track_count)
+            for zone_count, track_count in SCALING_STEPS
+        ]
+
+    def bench_heatmap(self) -> list[ScenarioResult]:
+        results = []
+        for objects in TRACKER_STEPS:
+            scene = replace(self.scene, objects=objects)
+            frames = list(
+                SyntheticWorkload(scene).detections(self.iterations + self.warmup)
+            )
+            heatmap = OccupancyHeatmap(scene.width, scene.height)
+            clock = itertools.count()
+            latencies = time_iterations(
+                lambda i: heatmap.update(
+                    frames[i].xyxy,
+                    frames[i].class_id,
+                    frames[i].tracker_id,
+                    timestamp=next(clock) / 30,
+                ),
+                self.iterations,
+                self.warmup,
+            )
+            results.append(
+                self._result(
+                    f"heatmap_{objects}t",
+                    latencies,
+                    tracks=objects,
+                    grid=f"{heatmap.shape[1]}x{heatmap.shape[0]}",
+                    grid_kb=round(heatmap.memory_bytes / 1024),
+                )
+            )
+        return results
+
+    def bench_metrics_store(self) -> list[ScenarioResult]:
+        """Frame-loop cost of recording zone metrics, and queries over a month
+        of one-minute history from the hourly and one-minute rollups."""
+        metrics = {
+            config.id: ZoneMetrics(config.id, config.name, current_count=3)
+            for config in self.zone_configs()
+        }
+        params = {"zones": self.zone_count}
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = ZoneMetricsStore(Path(directory)).start()
+            latencies = time_iterations(
+                lambda i: store.record(i / 30, metrics), self.iterations, self.warmup
+            )
+            store.close()
+            results = [self._result("metrics_store_record", latencies, **params)]
+
+            # Seeded through the writer thread; the queue holds the whole month
+            # so no sample is dropped.
+            month = 30 * 86400
+            store = ZoneMetricsStore(
+                Path(directory), writer="month", queue_size=month // 60
+            ).start()
+            for minute in range(month // 60):
+                store.record(
+                    minute * 60.0, {"month": ZoneMetrics("month", "Month", minute % 7)}
+                )
+            store.flush()
+            store.close()
+
+            for step in (3600, 300):
+                latencies = time_iterations(
+                    lambda _: store.query("month", 0, month, step),
+                    self.iterations,
+                    self.warmup,
+                )
+                results.append(
+                    self._result(
+                        f"metrics_store_query_month_{step}s",
+                        latencies,
+                        points=month // step,
+                        step=step,
+                    )
+                )
+        return results
+
+    def bench_annotate(self) -> list[ScenarioResult]:
+        frames = self._scene_results()
+        zone_configs = self.zone_configs()
+        metrics = AnalyticsService(zone_configs).update(frames[0])
+        annotators = Annotators(enable_tracking=True, zone_configs=zone_configs)
+        frame = np.zeros((self.scene.height, self.scene.width, 3), dtype=np.uint8)
+        latencies = time_iterations(
+            lambda i: annotators.draw(frame, frames[i], 30.0, metrics),
+            self.iterations,
+            self.warmup,
+        )
+        return [
+            self._result(
+                f"annotate_{self.scene.width}x{self.scene.height}",
+                latencies,
+                zones=self.zone_count,
+                tracks=self.scene.objects,
+            )
+        ]
+
+    def bench_headless(self) -> list[ScenarioResult]:
+        """Per-frame output cost: drawing and JPEG-encoding an annotated frame
+        against emitting the same detections and metrics as a record."""
+        frames = self._scene_results()
+        zone_configs = self.zone_configs()
+        metrics = AnalyticsService(zone_configs).update(frames[0])
+        annotators = Annotators(enable_tracking=True, zone_configs=zone_configs)
+        frame = np.zeros((self.scene.height, self.scene.width, 3), dtype=np.uint8)
+        params = {"zones": self.zone_count, "tracks": self.scene.objects}
+
+        latencies = time_iterations(
+            lambda i: cv2.imencode(
+                ".jpg", annotators.draw(frame, frames[i], 30.0, metrics)
+            ),
+            self.iterations,
+            self.warmup,
+        )
+        results = [self._result("headless_render", latencies, **params)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            for suffix in ("jsonl", "bin"):
+                path = Path(directory) / f"records.{suffix}"
+                with open_record_writer(path) as writer:
+                    latencies = time_iterations(
+                        lambda i: writer.write(i, i / 30, frames[i], metrics),
+                        self.iterations,
+                        self.warmup,
+                    )
+                results.append(
+                    self._result(
+                        f"headless_{suffix}",
+                        latencies,
+                        record_kb=round(path.stat().st_size / 1024),
+                        **params,
+                    )
+                )
+        return results
+
+    def bench_threads(self) -> list[ScenarioResult]:
+        frame = moving_box_frames(1, *PREDICT_SIZES[0])[0]
+        cpus = len(available_cpus())
+        original = torch.get_num_threads(), cv2.getNumThreads()
+
+        results = []
+        try:
+            for threads in thread_counts(cpus):
+                torch.set_num_threads(threads)
+                cv2.setNumThreads(threads)
+                latencies = time_iterations(
+                    lambda _: self.detector.predict(frame), self.iterations, self.warmup
+                )
+                partitions = cpus // threads
+                result = self._result(
+                    f"threads_{threads}",
+                    latencies,
+                    intra_op=threads,
+                    partitions=partitions,
+                )
+                # Assumes each share of the machine runs its own detector and
+                # scales linearly, which is an upper bound.
+                result.params["machine_throughput_per_s"] = round(
+                    result.throughput * partitions, 2
+                )
+                results.append(result)
+        finally:
+            torch.set_num_threads(original[0])
+            cv2.setNumThreads(original[1])
+        return results
+
+    def bench_import(self) -> list[ScenarioResult]:
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        command = [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys, {CLI_MODULE}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        ]
+
+        latencies = []
+        heavy_modules: list[str] = []
+        for i in range(self.warmup + self.iterations):
+            completed = subprocess.run(
+                command, env=env, capture_output=True, text=True, check=True
+            )
+            heavy_modules = [m for m in completed.stdout.strip().split(",") if m]
+            if i >= self.warmup:
+                latencies.append(parse_import_time(completed.stderr, CLI_MODULE))
+
+        return [
+            self._result(
+                "import_cli",
+                latencies,
+                module=CLI_MODULE,
+                heavy_modules=heavy_modules,
+            )
+        ]
+
+    def bench_api(self) -> list[ScenarioResult]:
+        try:
+            import httpx
+        except ImportError:
+            self.skipped["api"] = "httpx is not installed"
+            return []
+
+        frame = moving_box_frames(1, *VIDEO_SIZE)[0]
+        image = cv2.imencode(".jpg", frame)[1].tobytes()
+        latencies = asyncio.run(self._api_round_trips(httpx, image))
+        return [self._result("api_detect", latencies, image_bytes=len(image))]
+
+    async def _api_round_trips(self, httpx, image: bytes) -> list[float]:
+        app = self._build_api_app()
+        transport = httpx.ASGITransport(app=app)
+        files = {"file": ("image.jpg", image, "image/jpeg")}
+
+        latencies = []
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for i in range(self.warmup + self.iterations):
+                start_time = time.perf_counter()
+                response = await client.post("/api/detect", files=files)
+                response.raise_for_status()
+                if i >= self.warmup:
+                    latencies.append((time.perf_counter() - start_time) * 1000)
+        return latencies
+
+    def _build_api_app(self) -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(
+            RequestLoggingMiddleware,
+            sample_rate=settings.api_log_sample_rate,
+            slow_request_ms=settings.api_slow_request_ms,
+        )
+        app.include_router(router)
+        app.include_router(metrics_router)
+
+        app.state.device = self.detector.device
+        app.state.detection_service = DetectionService(self.detector)
+        app.state.model_registry = ModelRegistry(
+            device=self.detector.device,
+            memory_budget_bytes=0,
+            pinned_models=[self.detector.model_name],
+            loader=lambda name, device: self.detector,
+        )
+        app.state.admission = AdmissionController(
+            max_concurrency=settings.api_max_concurrency,
+            max_queue=settings.api_max_queue,
+            timeout=settings.api_request_timeout,
+        )
+        # Every request should reach the model, so the result cache stays off.
+        app.state.result_cache = None
+        return app
+
+    def _video_frames(self, count: int) -> list[np.ndarray]:
+        if not self.video:
+            return moving_box_frames(count, *VIDEO_SIZE)
+
+        cap = cv2.VideoCapture(str(self.video))
+        if not cap.isOpened():
+            raise ValueError(f"Failed to open video source: {self.video}")
+
+        frames = []
+        try:
+            while len(frames) < count:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+        finally:
+            cap.release()
+
+        if not frames:
+            raise ValueError(f"No frames could be read from: {self.video}")
+        return frames
+
+
+def thread_counts(cpus: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def best_thread_plan(results: list[ScenarioResult]) -> ScenarioResult | None:
+    sweep = [result for result in results if result.name.startswith("threads_")]
+    if not sweep:
+        return None
+    return max(sweep, key=lambda result: result.params["machine_throughput_per_s"])
+
+
+def environment_info() -> dict[str, str | int | None]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def parse_import_time(importtime_output: str, module: str) -> float:
+    """Cumulative import time of ``module`` in milliseconds from -X importtime."""
+    for line in importtime_output.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise ValueError(f"Module not found in import time output: {module}")
+
+
+def build_report(
+    results: list[ScenarioResult],
+    runner: BenchmarkRunner,
+) -> dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "model": runner.detector.model_name,
+        "device": runner.detector.device,
+        "iterations": runner.iterations,
+        "warmup": runner.warmup,
+        "environment": environment_info(),
+        "scenarios": [result.to_dict() for result in results],
+        "skipped": runner.skipped,
+    }
@@ -0,0 +1,215 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+import supervision as sv
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.models import ZoneConfig, ZoneType
+from sentinel.bench.models import MotionPattern, ZoneLayout
+
+
+@dataclass
+class SyntheticScene:
+    width: int = 1920
+    height: int = 1080
+    objects: int = 50
+    motion: MotionPattern = MotionPattern.LINEAR
+    speed: float = 5.0
+    enter_rate: float = 0.0
+    exit_rate: float = 0.0
+    class_count: int = 1
+    seed: int = 0
+
+
+class SyntheticWorkload:
+    """Deterministic stream of tracked detections for a synthetic scene.
+
+    ``enter_rate`` is the expected number of new objects per frame and
+    ``exit_rate`` the per-frame probability that an object leaves, so a scene
+    settles around ``enter_rate / exit_rate`` objects.
+    """
+
+    def __init__(self, scene: SyntheticScene):
+        self.scene = scene
+        self.names = {i: f"class_{i}" for i in range(scene.class_count)}
+        self.names[0] = "person"
+        self._rng = np.random.default_rng(scene.seed)
+        self._image = np.zeros((scene.height, scene.width, 3), dtype=np.uint8)
+        self._next_id = 1
+        self._position = np.empty((0, 2))
+        self._velocity = np.empty((0, 2))
+        self._size = np.empty((0, 2))
+        self._confidence = np.empty(0, dtype=np.float32)
+        self._class_id = np.empty(0, dtype=int)
+        self._tracker_id = np.empty(0, dtype=int)
+        self._spawn(scene.objects)
+
+    def _spawn(self, count: int) -> None:
+        if count <= 0:
+            return
+
+        rng = self._rng
+        bounds = [self.scene.width, self.scene.height]
+        self._position = np.vstack([self._position, rng.uniform(0, bounds, (count, 2))])
+        self._velocity = np.vstack(
+            [self._velocity, rng.uniform(-1, 1, (count, 2)) * self.scene.speed]
+        )
+        self._size = np.vstack([self._size, rng.uniform(20, 80, (count, 2))])
+        self._confidence = np.concatenate(
+            [self._confidence, rng.uniform(0.5, 1.0, count).astype(np.float32)]
+        )
+        self._class_id = np.concatenate(
+            [self._class_id, rng.integers(0, self.scene.class_count, count)]
+        )
+        self._tracker_id = np.concatenate(
+            [self._tracker_id, np.arange(self._next_id, self._next_id + count)]
+        )
+        self._next_id += count
+
+    def _step(self) -> None:
+        scene = self.scene
+        rng = self._rng
+
+        if scene.exit_rate > 0 and len(self._tracker_id):
+            keep = rng.random(len(self._tracker_id)) >= scene.exit_rate
+            self._position = self._position[keep]
+            self._velocity = self._velocity[keep]
+            self._size = self._size[keep]
+            self._confidence = self._confidence[keep]
+            self._class_id = self._class_id[keep]
+            self._tracker_id = self._tracker_id[keep]
+
+        if scene.enter_rate > 0:
+            self._spawn(int(rng.poisson(scene.enter_rate)))
+
+        if scene.motion == MotionPattern.RANDOM_WALK:
+            self._velocity = rng.uniform(-1, 1, self._velocity.shape) * scene.speed
+        elif scene.motion == MotionPattern.STATIC:
+            return
+
+        bounds = np.array([scene.width, scene.height])
+        self._position += self._velocity
+        outside = (self._position < 0) | (self._position > bounds)
+        self._velocity[outside] *= -1
+        self._position = np.clip(self._position, 0, bounds)
+
+    def detections(self, count: int) -> Iterator[sv.Detections]:
+        for _ in range(count):
+            half = self._size / 2
+            yield sv.Detections(
+                xyxy=np.hstack([self._position - half, self._position + half]),
+                confidence=self._confidence.copy(),
+                class_id=self._class_id.copy(),
+                tracker_id=self._tracker_id.copy(),
+            )
+            self._step()
+
+    def results(self, count: int, tracked: bool = True) -> Iterator[Results]:
+        for detections in self.detections(count):
+            columns = [detections.xyxy, detections.confidence, detections.class_id]
+            if tracked:
+                columns.insert(1, detections.tracker_id)
+            boxes = np.column_stack(columns).astype(np.float32)
+            yield Results(
+                self._image,
+                path="",
+                names=self.names,
+                boxes=torch.from_numpy(boxes.reshape(-1, len(columns) + 3)),
+            )
+
+
+def moving_box_frames(
+    count: int, width: int, height: int, objects: int = 8, seed: int = 0
+) -> list[np.ndarray]:
+    workload = SyntheticWorkload(
+        SyntheticScene(
+            width=width,
+            height=height,
+            objects=objects,
+            speed=8.0,
+            seed=seed,
+        )
+    )
+    rng = np.random.default_rng(seed)
+    colors = rng.integers(64, 256, (objects, 3)).tolist()
+
+    frames = []
+    for detections in workload.detections(count):
+        frame = np.full((height, width, 3), 32, dtype=np.uint8)
+        for (x1, y1, x2, y2), color in zip(detections.xyxy.astype(int), colors):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, -1)
+        frames.append(frame)
+
+    return frames
+
+
+def zone_layout(
+    count: int,
+    width: int,
+    height: int,
+    layout: ZoneLayout = ZoneLayout.GRID,
+    seed: int = 0,
+) -> list[ZoneConfig]:
+    if layout == ZoneLayout.GRID:
+        return grid_zones(count, width, height)
+
+    rng = np.random.default_rng(seed)
+    zones = []
+    for i in range(count):
+        if layout == ZoneLayout.LINES:
+            y = int((i + 1) * height / (count + 1))
+            zones.append(
+                ZoneConfig(
+                    id=f"line_{i}",
+                    name=f"Line {i}",
+                    type=ZoneType.LINE,
+                    line=([0, y], [width, y]),
+                )
+            )
+            continue
+
+        zone_width = int(rng.uniform(0.05, 0.3) * width)
+        zone_height = int(rng.uniform(0.05, 0.3) * height)
+        x = int(rng.integers(0, width - zone_width))
+        y = int(rng.integers(0, height - zone_height))
+        zones.append(
+            ZoneConfig(
+                id=f"zone_{i}",
+                name=f"Zone {i}",
+                type=ZoneType.POLYGON,
+                polygon=[
+                    [x, y],
+                    [x + zone_width, y],
+                    [x + zone_width, y + zone_height],
+                    [x, y + zone_height],
+                ],
+            )
+        )
+    return zones
+
+
+def grid_zones(count: int, width: int, height: int) -> list[ZoneConfig]:
+    columns = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / columns))
+    cell_width, cell_height = width // columns, height // rows
+
+    zones = []
+    for i in range(count):
+        x, y = (i % columns) * cell_width, (i // columns) * cell_height
+        zones.append(
+            ZoneConfig(
+                id=f"zone_{i}",
+                name=f"Zone {i}",
+                type=ZoneType.POLYGON,
+                polygon=[
+                    [x, y],
+                    [x + cell_width, y],
+                    [x + cell_width, y + cell_height],
+                    [x, y + cell_height],
+                ],
+            )
+        )
+    return zones
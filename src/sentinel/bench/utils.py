@@ -0,0 +1,39 @@
+import math
+import resource
+import sys
+import time
+from collections.abc import Callable
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    weight = rank - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def time_iterations(
+    fn: Callable[[int], object], iterations: int, warmup: int = 0
+) -> list[float]:
+    for i in range(warmup):
+        fn(i)
+
+    latencies = []
+    for i in range(iterations):
+        start_time = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from sentinel.logging import get_logger
+from sentinel.metrics import CAPTURE_FRAMES_DROPPED
+
+log = get_logger(__name__)
+
+
+class LatestFrameGrabber:
+    """Reads a live capture on its own thread and keeps only the newest frame.
+
+    OpenCV queues frames inside the capture, so a consumer slower than the
+    camera falls further behind with every frame. Draining the capture as fast
+    as it delivers keeps that queue empty: ``read`` always returns the most
+    recent frame with the time it was grabbed, and frames that were replaced
+    before anyone read them are counted as dropped.
+
+    The grabber owns the capture once started and releases it from its own
+    thread, so ``release`` never runs while a slow or stalled ``read`` is still
+    in progress.
+    """
+
+    def __init__(self, cap: cv2.VideoCapture):
+        self.cap = cap
+        self.grabbed = 0
+        self.dropped = 0
+        self._frame: np.ndarray | None = None
+        self._timestamp = 0.0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="sentinel-frame-grabber", daemon=True
+        )
+
+    def start(self) -> "LatestFrameGrabber":
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop grabbing and wait up to ``timeout`` for the capture to be
+        released. A thread still blocked in ``read`` releases it as soon as
+        that read returns."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread.ident is None:
+            self.cap.release()
+        elif self._thread.is_alive():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                log.warning("frame_grabber_still_reading", timeout=timeout)
+
+    def read(self, timeout: float | None = None) -> tuple[np.ndarray, float] | None:
+        """Wait for a frame newer than the last one read. Returns None once the
+        source has ended, or if nothing arrived within ``timeout``."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frame is not None or self._stopped, timeout
+            )
+            if self._frame is None:
+                return None
+            frame, self._frame = self._frame, None
+            return frame, self._timestamp
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped:
+                ret, frame = self.cap.read()
+                timestamp = time.time()
+                if not ret:
+                    break
+
+                with self._condition:
+                    if self._frame is not None:
+                        self.dropped += 1
+                        CAPTURE_FRAMES_DROPPED.inc()
+                    self._frame, self._timestamp = frame, timestamp
+                    self.grabbed += 1
+                    self._condition.notify_all()
+        finally:
+            self.cap.release()
+            with self._condition:
+                self._stopped = True
+                self._condition.notify_all()
+        log.info("frame_grabber_stopped", grabbed=self.grabbed, dropped=self.dropped)
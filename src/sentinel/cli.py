@@ -1,21 +1,20 @@
+import json
+from contextlib import nullcontext
 from enum import Enum
 from pathlib import Path
 from typing import Annotated, Optional
 
-import torch
 import typer
 from rich.status import Status
+from rich.table import Table
 
-from sentinel.analytics.service import AnalyticsService
-from sentinel.analytics.utils import load_zones_from_json
+from sentinel.bench.models import SCENARIOS, MotionPattern, ScenarioResult, ZoneLayout
 from sentinel.cli_utils import console, print_error, print_success
 from sentinel.config import settings
-from sentinel.detection.models import YOLODetector
-from sentinel.detection.service import DetectionService
-from sentinel.image_pipeline import ImagePipeline
 from sentinel.logging import configure_logging
-from sentinel.video_pipeline import VideoPipeline
-from sentinel.visualization.annotators import Annotators
+
+# Commands import torch, ultralytics, OpenCV and the pipelines inside their
+# bodies so that --help and argument errors return without loading them.
 
 app = typer.Typer(help="Object detection and tracking system")
 
@@ -26,8 +25,16 @@ class Device(str, Enum):
     CPU = "cpu"
 
 
+class Tracker(str, Enum):
+    BOTSORT = "botsort"
+    BYTETRACK = "bytetrack"
+    NATIVE = "native"
+
+
 def get_default_device() -> Device:
     """Auto-detect the best available device."""
+    import torch
+
     if torch.cuda.is_available():
         return Device.CUDA
     elif torch.backends.mps.is_available():
@@ -35,6 +42,38 @@ def get_default_device() -> Device:
     return Device.CPU
 
 
+def load_detector(
+    model_name: str,
+    device: Device,
+    quiet: bool,
+    tracker: Optional[Tracker] = None,
+):
+    from sentinel.detection.models import YOLODetector
+
+    tracker_type = tracker.value if tracker else None
+    try:
+        if not quiet:
+            with Status("Loading model...", console=console):
+                detector = YOLODetector(
+                    model_name, device.value, tracker_type=tracker_type
+                )
+        else:
+            detector = YOLODetector(model_name, device.value, tracker_type=tracker_type)
+    except FileNotFoundError:
+        print_error(f"Model not found: {model_name}")
+        raise typer.Exit(1)
+    except RuntimeError as e:
+        print_error(f"Model load failed: {e}")
+        raise typer.Exit(1)
+
+    if not quiet:
+        print_success(
+            f"Model loaded: {model_name} ({detector.load_time * 1000:.0f} ms)"
+        )
+
+    return detector
+
+
 @app.command("image")
 def detect_image(
     source: Annotated[str, typer.Argument(help="Path to input image or directory")],
@@ -65,9 +104,30 @@ def detect_image(
     track: Annotated[
         bool, typer.Option("--track", "-t", help="Enable tracking")
     ] = False,
+    classes: Annotated[
+        Optional[str],
+        typer.Option(
+            "--classes",
+            help="Comma-separated class names or IDs to detect (e.g. person,car)",
+        ),
+    ] = None,
     no_display: Annotated[
         bool, typer.Option("--no-display", help="Don't show window (save only)")
     ] = False,
+    headless: Annotated[
+        bool,
+        typer.Option(
+            "--headless",
+            help="Skip drawing and encoding entirely; only emit structured results",
+        ),
+    ] = False,
+    records: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--records",
+            help="Write detections, metrics and events per frame (.jsonl or .bin)",
+        ),
+    ] = None,
     quiet: Annotated[
         bool, typer.Option("--quiet", "-q", help="Suppress output")
     ] = False,
@@ -85,41 +145,59 @@ def detect_image(
             print_error(f"Unsupported image format: {source_path.suffix}")
             raise typer.Exit(1)
 
+    if headless and output:
+        print_error("--headless cannot be combined with --output")
+        raise typer.Exit(1)
+
+    from sentinel.cpu import apply_thread_plan, settings_thread_plan
+    from sentinel.detection.service import DetectionService
+    from sentinel.detection.utils import parse_classes
+    from sentinel.image_pipeline import ImagePipeline
+    from sentinel.records import open_record_writer
+    from sentinel.visualization.annotators import Annotators
+
+    apply_thread_plan(settings_thread_plan())
+
     model_name = model if model else settings.model_name
     selected_device = device if device else get_default_device()
+    detector = load_detector(model_name, selected_device, quiet)
 
     try:
-        if not quiet:
-            with Status("Loading model...", console=console):
-                detector = YOLODetector(model_name, selected_device.value)
-        else:
-            detector = YOLODetector(model_name, selected_device.value)
-    except FileNotFoundError:
-        print_error(f"Model not found: {model_name}")
-        raise typer.Exit(1)
-    except RuntimeError as e:
-        print_error(f"Model load failed: {e}")
+        detection_service = DetectionService(
+            detector=detector,
+            enable_tracking=track,
+            conf_threshold=conf,
+            classes=parse_classes(classes),
+        )
+    except ValueError as e:
+        print_error(str(e))
         raise typer.Exit(1)
 
-    if not quiet:
-        print_success(f"Model loaded: {model_name}")
-
-    detection_service = DetectionService(
-        detector=detector,
-        enable_tracking=track,
-        conf_threshold=conf,
-    )
-
     annotators = Annotators(enable_tracking=track, zone_configs=[])
 
     try:
-        pipeline = ImagePipeline(detection_service, annotators)
-        pipeline.run(source, output_path=output, show_display=not no_display)
+        record_writer = open_record_writer(records) if records else None
+    except ValueError as e:
+        print_error(str(e))
+        raise typer.Exit(1)
+
+    try:
+        pipeline = ImagePipeline(
+            detection_service, annotators, headless=headless, records=record_writer
+        )
+        pipeline.run(
+            source, output_path=output, show_display=not (no_display or headless)
+        )
 
         if output and not quiet:
             print_success(f"Saved: {output}")
     except KeyboardInterrupt:
         raise typer.Exit(0)
+    finally:
+        if record_writer:
+            record_writer.close()
+            if not quiet:
+                print_success(f"Records: {records}")
 
 
 @app.command("video")
@@ -135,6 +213,20 @@ def detect_video(
     no_display: Annotated[
         bool, typer.Option("--no-display", help="Don't show video window")
     ] = False,
+    headless: Annotated[
+        bool,
+        typer.Option(
+            "--headless",
+            help="Skip drawing and encoding entirely; only emit structured results",
+        ),
+    ] = False,
+    records: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--records",
+            help="Write detections, metrics and events per frame (.jsonl or .bin)",
+        ),
+    ] = None,
     conf: Annotated[
         float,
         typer.Option("--conf", "-c", min=0.0, max=1.0, help="Confidence threshold"),
@@ -156,12 +248,116 @@ def detect_video(
     track: Annotated[
         bool, typer.Option("--track", "-t", help="Enable tracking")
     ] = False,
+    classes: Annotated[
+        Optional[str],
+        typer.Option(
+            "--classes",
+            help="Comma-separated class names or IDs to detect (e.g. person,car)",
+        ),
+    ] = None,
+    tracker: Annotated[
+        Optional[Tracker],
+        typer.Option("--tracker", help="Tracking algorithm (native is fastest on CPU)"),
+    ] = None,
+    batch_size: Annotated[
+        Optional[int],
+        typer.Option(
+            "--batch-size",
+            min=1,
+            help="Frames to read ahead and detect as one batch (video files only)",
+        ),
+    ] = None,
+    every_frame: Annotated[
+        bool,
+        typer.Option(
+            "--every-frame",
+            help="Process every frame of a live source, even as it falls behind",
+        ),
+    ] = False,
     analytics: Annotated[
         bool, typer.Option("--analytics", "-a", help="Enable zone analytics")
     ] = False,
     zones: Annotated[
         Optional[str], typer.Option("--zones", "-z", help="Path to zones JSON")
     ] = None,
+    watch_zones: Annotated[
+        bool,
+        typer.Option(
+            "--watch-zones",
+            help="Reload the zones file when it changes, without restarting",
+        ),
+    ] = False,
+    stream_port: Annotated[
+        Optional[int],
+        typer.Option(
+            "--stream-port",
+            min=0,
+            max=65535,
+            help="Serve annotated frames as MJPEG on this port",
+        ),
+    ] = None,
+    events: Annotated[
+        Optional[Path],
+        typer.Option("--events", help="Append zone events to this JSON Lines file"),
+    ] = None,
+    webhook: Annotated[
+        Optional[str],
+        typer.Option("--webhook", help="POST batches of zone events to this URL"),
+    ] = None,
+    metrics_store: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--metrics-store",
+            help="Record zone metric history in this directory (see /api/zones)",
+        ),
+    ] = None,
+    heatmap: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--heatmap",
+            help="Write an occupancy heatmap when the video ends (.npz for raw grids)",
+        ),
+    ] = None,
+    profile: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--profile", help="Write a per-stage Chrome trace (open in Perfetto)"
+        ),
+    ] = None,
+    torch_profile: Annotated[
+        bool,
+        typer.Option(
+            "--torch-profile",
+            help="Also record the torch profiler next to the --profile trace",
+        ),
+    ] = False,
+    threads: Annotated[
+        Optional[int],
+        typer.Option("--threads", min=1, help="Torch intra-op threads (auto if unset)"),
+    ] = None,
+    interop_threads: Annotated[
+        Optional[int],
+        typer.Option("--interop-threads", min=1, help="Torch inter-op threads"),
+    ] = None,
+    opencv_threads: Annotated[
+        Optional[int],
+        typer.Option("--opencv-threads", min=1, help="OpenCV worker threads"),
+    ] = None,
+    cpu_partitions: Annotated[
+        Optional[int],
+        typer.Option(
+            "--cpu-partitions",
+            min=1,
+            help="Streams sharing this machine; each gets an equal share of cores",
+        ),
+    ] = None,
+    cpu_index: Annotated[
+        int,
+        typer.Option("--cpu-index", min=0, help="Which share this stream uses"),
+    ] = 0,
+    pin_cpus: Annotated[
+        bool, typer.Option("--pin-cpus", help="Pin this process to its share of cores")
+    ] = False,
     quiet: Annotated[
         bool, typer.Option("--quiet", "-q", help="Suppress output")
     ] = False,
@@ -173,64 +369,349 @@ def detect_video(
         print_error("Analytics requires --track")
         raise typer.Exit(1)
 
-    parsed_source = (
-        int(source) if source and source.isdigit() else source or settings.video_source
-    )
+    if headless and (output or stream_port is not None):
+        print_error("--headless cannot be combined with --output or --stream-port")
+        raise typer.Exit(1)
 
-    model_name = model if model else settings.model_name
-    selected_device = device if device else get_default_device()
+    if watch_zones and not analytics:
+        print_error("--watch-zones requires --analytics")
+        raise typer.Exit(1)
 
-    try:
-        if not quiet:
-            with Status("Loading model...", console=console):
-                detector = YOLODetector(model_name, selected_device.value)
-        else:
-            detector = YOLODetector(model_name, selected_device.value)
-    except FileNotFoundError:
-        print_error(f"Model not found: {model_name}")
+    if (events or webhook or metrics_store) and not analytics:
+        print_error("--events, --webhook and --metrics-store require --analytics")
         raise typer.Exit(1)
-    except RuntimeError as e:
-        print_error(f"Model load failed: {e}")
+
+    if torch_profile and not profile:
+        print_error("--torch-profile requires --profile")
         raise typer.Exit(1)
 
-    if not quiet:
-        print_success(f"Model loaded: {model_name}")
+    parsed_source = (
+        int(source) if source and source.isdigit() else source or settings.video_source
+    )
 
-    detection_service = DetectionService(
-        detector=detector,
-        enable_tracking=track,
-        conf_threshold=conf,
+    from sentinel.analytics.events import EventBus, FileSink, WebhookSink
+    from sentinel.analytics.service import AnalyticsService
+    from sentinel.analytics.store import ZoneMetricsStore
+    from sentinel.analytics.utils import load_zones_from_json, zone_classes
+    from sentinel.analytics.watcher import ZoneFileWatcher
+    from sentinel.cpu import apply_thread_plan, plan_threads
+    from sentinel.detection.service import DetectionService
+    from sentinel.detection.utils import parse_classes
+    from sentinel.profiling import TraceRecorder, record_torch_trace
+    from sentinel.records import open_record_writer
+    from sentinel.video_pipeline import VideoPipeline
+    from sentinel.visualization.annotators import Annotators
+    from sentinel.visualization.broadcast import FrameBroadcaster, MJPEGServer
+
+    apply_thread_plan(
+        plan_threads(
+            partitions=cpu_partitions or settings.cpu_partitions or 1,
+            index=cpu_index,
+            intra_op=threads or settings.torch_threads,
+            inter_op=interop_threads or settings.torch_interop_threads,
+            opencv=opencv_threads or settings.opencv_threads,
+            pin=pin_cpus or settings.cpu_affinity,
+        )
     )
 
+    model_name = model if model else settings.model_name
+    selected_device = device if device else get_default_device()
+    detector = load_detector(model_name, selected_device, quiet, tracker)
+
     analytics_service = None
     zone_configs = []
+    event_bus = EventBus()
+    metrics_history = None
+    zones_path = Path(zones) if zones else settings.zones_config_path
     if analytics:
-        zones_path = Path(zones) if zones else settings.zones_config_path
         if not zones_path.exists():
             print_error(f"Zones file not found: {zones_path}")
             raise typer.Exit(1)
 
         zone_configs = load_zones_from_json(zones_path)
-        analytics_service = AnalyticsService(zone_configs)
+        if metrics_store:
+            try:
+                metrics_history = ZoneMetricsStore(metrics_store, writer="cli").start()
+            except ValueError as e:
+                print_error(str(e))
+                raise typer.Exit(1)
         if not quiet:
             print_success(f"Loaded {len(zone_configs)} zone(s)")
+    if analytics or heatmap:
+        analytics_service = AnalyticsService(
+            zone_configs,
+            enable_heatmap=heatmap or None,
+            event_bus=event_bus,
+            metrics_store=metrics_history,
+        )
+
+    try:
+        detection_service = DetectionService(
+            detector=detector,
+            enable_tracking=track,
+            conf_threshold=conf,
+            classes=parse_classes(classes) or zone_classes(zone_configs),
+        )
+    except ValueError as e:
+        print_error(str(e))
+        raise typer.Exit(1)
 
     annotators = Annotators(enable_tracking=track, zone_configs=zone_configs)
 
+    broadcaster = None
+    mjpeg_server = None
+    if stream_port is not None:
+        broadcaster = FrameBroadcaster(quality=settings.stream_jpeg_quality)
+        try:
+            mjpeg_server = MJPEGServer(
+                broadcaster,
+                settings.api_host,
+                stream_port,
+                heatmap=lambda: analytics_service and analytics_service.heatmap,
+            )
+        except OSError as e:
+            print_error(f"Failed to start MJPEG server: {e}")
+            raise typer.Exit(1)
+        mjpeg_server.start()
+        if not quiet:
+            print_success(
+                f"Streaming: http://{settings.api_host}:{mjpeg_server.port}/stream.mjpg"
+            )
+
+    sinks = []
+    if events:
+        sinks.append(FileSink(event_bus, events).start())
+    if webhook:
+        sinks.append(WebhookSink(event_bus, webhook).start())
+
+    try:
+        record_writer = open_record_writer(records) if records else None
+    except ValueError as e:
+        print_error(str(e))
+        raise typer.Exit(1)
+
+    trace = TraceRecorder() if profile else None
+    torch_trace_path = profile.with_suffix(".torch.json") if torch_profile else None
+    zone_watcher = None
+
     try:
         pipeline = VideoPipeline(
             detection_service,
             annotators,
             analytics_service,
             output_path=output,
-            show_display=not no_display,
+            show_display=not (no_display or headless),
+            broadcaster=broadcaster,
+            trace=trace,
+            headless=headless,
+            records=record_writer,
+            batch_size=batch_size,
+            latest_frame=False if every_frame else None,
         )
-        pipeline.run(parsed_source)
+
+        if watch_zones:
+
+            def reload_zones(zone_configs):
+                if not classes:
+                    detection_service.set_classes(zone_classes(zone_configs))
+                pipeline.reload_zones(zone_configs)
+
+            zone_watcher = ZoneFileWatcher(zones_path, reload_zones).start()
+        with (
+            record_torch_trace(torch_trace_path) if torch_trace_path else nullcontext()
+        ):
+            pipeline.run(parsed_source)
 
         if output and not quiet:
             print_success(f"Saved: {output}")
     except KeyboardInterrupt:
         raise typer.Exit(0)
+    finally:
+        if zone_watcher:
+            zone_watcher.close()
+        if heatmap and analytics_service.heatmap:
+            analytics_service.heatmap.export(heatmap)
+            if not quiet:
+                print_success(f"Heatmap: {heatmap}")
+        if mjpeg_server:
+            mjpeg_server.close()
+        for sink in sinks:
+            sink.close()
+        if record_writer:
+            record_writer.close()
+            if not quiet:
+                print_success(f"Records: {records}")
+        if metrics_history:
+            metrics_history.close()
+            if not quiet:
+                print_success(f"Metrics store: {metrics_store}")
+        if events and not quiet:
+            print_success(f"Events: {events}")
+        if trace:
+            trace.export(profile)
+            if not quiet:
+                print_success(f"Trace: {profile}")
+                if torch_trace_path:
+                    print_success(f"Torch trace: {torch_trace_path}")
+
+
+@app.command("bench")
+def bench(
+    model: Annotated[
+        str,
+        typer.Option(
+            "--model",
+            "-m",
+            help="Model to benchmark (yolo11n.yaml builds an untrained model offline)",
+        ),
+    ] = "yolo11n.yaml",
+    device: Annotated[
+        Device, typer.Option("--device", "-d", help="Device for inference")
+    ] = Device.CPU,
+    scenario: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--scenario",
+            "-s",
+            help=f"Scenario to run, repeatable ({', '.join(SCENARIOS)})",
+        ),
+    ] = None,
+    iterations: Annotated[
+        int, typer.Option("--iterations", "-n", min=1, help="Timed iterations")
+    ] = 30,
+    warmup: Annotated[
+        int, typer.Option("--warmup", min=0, help="Untimed warmup iterations")
+    ] = 3,
+    batch_size: Annotated[
+        int, typer.Option("--batch-size", min=1, help="Frames per batched predict")
+    ] = 8,
+    zones: Annotated[
+        int, typer.Option("--zones", min=1, help="Zones in analytics scenarios")
+    ] = 10,
+    tracks: Annotated[
+        int, typer.Option("--tracks", min=1, help="Tracks in analytics scenarios")
+    ] = 50,
+    layout: Annotated[
+        ZoneLayout, typer.Option("--layout", help="Synthetic zone layout")
+    ] = ZoneLayout.GRID,
+    motion: Annotated[
+        MotionPattern, typer.Option("--motion", help="Synthetic object motion")
+    ] = MotionPattern.LINEAR,
+    enter_rate: Annotated[
+        float,
+        typer.Option("--enter-rate", min=0.0, help="New synthetic objects per frame"),
+    ] = 0.0,
+    exit_rate: Annotated[
+        float,
+        typer.Option(
+            "--exit-rate",
+            min=0.0,
+            max=1.0,
+            help="Per-frame probability a synthetic object leaves",
+        ),
+    ] = 0.0,
+    save_zones: Annotated[
+        Optional[Path],
+        typer.Option("--save-zones", help="Write the synthetic zone layout as JSON"),
+    ] = None,
+    video: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--video", help="Clip for the tracking scenario (synthetic if unset)"
+        ),
+    ] = None,
+    output: Annotated[
+        Optional[Path],
+        typer.Option("--output", "-o", help="Write the JSON report to this path"),
+    ] = None,
+    quiet: Annotated[
+        bool, typer.Option("--quiet", "-q", help="Suppress output")
+    ] = False,
+) -> None:
+    """Benchmark inference, tracking, analytics, annotation and the API."""
+    configure_logging(use_rich=not quiet, level="WARNING")
+
+    unknown = [name for name in scenario or [] if name not in SCENARIOS]
+    if unknown:
+        print_error(f"Unknown scenario: {', '.join(unknown)}")
+        raise typer.Exit(1)
+
+    if video and not video.exists():
+        print_error(f"Video not found: {video}")
+        raise typer.Exit(1)
+
+    from sentinel.analytics.utils import save_zones_to_json
+    from sentinel.bench.service import (
+        BenchmarkRunner,
+        best_thread_plan,
+        build_report,
+    )
+    from sentinel.bench.synthetic import SyntheticScene
+
+    detector = load_detector(model, device, quiet=True)
+
+    runner = BenchmarkRunner(
+        detector,
+        iterations=iterations,
+        warmup=warmup,
+        batch_size=batch_size,
+        zone_count=zones,
+        zone_layout=layout,
+        scene=SyntheticScene(
+            objects=tracks,
+            motion=motion,
+            enter_rate=enter_rate,
+            exit_rate=exit_rate,
+        ),
+        video=video,
+    )
+
+    if save_zones:
+        save_zones_to_json(runner.zone_configs(), save_zones)
+        if not quiet:
+            print_success(f"Saved zones: {save_zones}")
+
+    table = Table(title=f"Benchmark: {model} on {detector.device}")
+    for column in ("Scenario", "p50 ms", "p95 ms", "p99 ms", "items/s", "peak RSS MB"):
+        table.add_column(column, justify="left" if column == "Scenario" else "right")
+
+    def add_row(result: ScenarioResult) -> None:
+        if not quiet:
+            console.print(f"  {result.name}: p50 {result.p50_ms:.2f} ms")
+        table.add_row(
+            result.name,
+            f"{result.p50_ms:.2f}",
+            f"{result.p95_ms:.2f}",
+            f"{result.p99_ms:.2f}",
+            f"{result.throughput:.1f}",
+            f"{result.peak_rss_mb:.0f}",
+        )
+
+    try:
+        results = runner.run(scenario, on_result=add_row)
+    except ValueError as e:
+        print_error(str(e))
+        raise typer.Exit(1)
+
+    if not quiet:
+        console.print(table)
+        for name, reason in runner.skipped.items():
+            console.print(f"Skipped {name}: {reason}")
+
+        best = best_thread_plan(results)
+        if best:
+            console.print(
+                f"Best thread plan: --threads {best.params['intra_op']} "
+                f"--cpu-partitions {best.params['partitions']} "
+                f"(~{best.params['machine_throughput_per_s']:.1f} frames/s per machine)"
+            )
+
+    if output:
+        report = build_report(results, runner)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        if not quiet:
+            print_success(f"Saved: {output}")
 
 
 def cli() -> None:
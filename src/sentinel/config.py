@@ -1,4 +1,5 @@
 from pathlib import Path
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,27 +11,74 @@ class Settings(BaseSettings):
     conf_threshold: float = 0.5
     iou_threshold: float = 0.45
     max_detections: int = 300
+    detection_classes: list[str] = []
     input_size: int = 640
+    model_cache_dir: Path | None = None
+    model_export_format: str | None = None
+    model_warmup_iterations: int = 2
+    api_models: list[str] = []
+    model_memory_budget_mb: int = 1024
 
     video_source: str | int = 0
+    video_batch_size: int = 1
+    video_latest_frame: bool = True
     display_width: int = 1280
     display_height: int = 720
+    stream_jpeg_quality: int = 80
 
     enable_tracking: bool = False
+    tracker_type: str = "botsort"
     tracker_max_age: int = 30
     tracker_min_hits: int = 3
     tracker_iou_threshold: float = 0.3
 
     enable_analytics: bool = False
     zones_config_path: Path = Path("zones.json")
+    zones_watch: bool = False
+    zones_watch_interval: float = 1.0
+    heatmap_enabled: bool = True
+    heatmap_cell_size: int = 16
+    heatmap_windows: list[float] = [60.0, 900.0]
+    event_buffer_size: int = 4096
+    events_log_path: Path | None = None
+    events_webhook_url: str | None = None
+    metrics_store_dir: Path | None = None
+    metrics_store_resolutions: list[int] = [60, 3600, 86400]
 
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_cors_origins: list[str] = []
     api_max_image_size: int = 10 * 1024 * 1024
+    api_max_concurrency: int = 4
+    api_max_queue: int = 32
+    api_request_timeout: float = 10.0
+    api_cache_max_entries: int = 1024
+    api_cache_ttl: float = 300.0
+    api_cache_dir: Path | None = None
+    api_cache_disk_max_entries: int = 65536
+
+    torch_threads: int = 0
+    torch_interop_threads: int = 0
+    opencv_threads: int = 0
+    cpu_partitions: int = 0
+    cpu_affinity: bool = False
+
+    inference_replicas: int = 0
+    inference_addresses: list[str] = []
+    inference_authkey: str = ""
+
+    jobs_max_workers: int = 0
+    jobs_max_pending: int = 16
+    jobs_output_dir: Path = Path("jobs")
+    jobs_input_dir: Path | None = None
+    jobs_max_upload_size: int = 2 * 1024 * 1024 * 1024
+    jobs_max_retained: int = 100
+    jobs_retention_seconds: float = 86400.0
 
     log_level: str = "INFO"
     log_format: str = "console"
+    api_log_sample_rate: float = 1.0
+    api_slow_request_ms: float = 1000.0
 
 
 settings = Settings()
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+from dataclasses import dataclass
+
+import cv2
+import torch
+
+from sentinel.config import settings
+from sentinel.logging import get_logger
+
+log = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ThreadPlan:
+    intra_op: int
+    inter_op: int
+    opencv: int
+    cpus: tuple[int, ...] | None = None
+
+
+def available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_index() -> int:
+    # uvicorn names its worker processes SpawnProcess-1, SpawnProcess-2, ...
+    suffix = multiprocessing.current_process().name.rsplit("-", 1)[-1]
+    return int(suffix) - 1 if suffix.isdigit() else 0
+
+
+def plan_threads(
+    partitions: int = 1,
+    index: int = 0,
+    intra_op: int = 0,
+    inter_op: int = 0,
+    opencv: int = 0,
+    pin: bool = False,
+    cpus: list[int] | None = None,
+) -> ThreadPlan:
+    """Split the machine evenly between ``partitions`` processes or streams
+    and return the share for the one at ``index``. Zero counts mean auto."""
+    cpus = sorted(cpus or available_cpus())
+    partitions = max(1, min(partitions, len(cpus)))
+    share = len(cpus) // partitions
+    start = (index % partitions) * share
+
+    return ThreadPlan(
+        intra_op=intra_op or share,
+        # A detector runs one graph at a time, so inter-op parallelism mostly
+        # competes with the intra-op pool.
+        inter_op=inter_op or 1,
+        opencv=opencv or share,
+        cpus=tuple(cpus[start : start + share]) if pin else None,
+    )
+
+
+def settings_thread_plan(index: int = 0, partitions: int | None = None) -> ThreadPlan:
+    return plan_threads(
+        partitions=partitions or settings.cpu_partitions or 1,
+        index=index,
+        intra_op=settings.torch_threads,
+        inter_op=settings.torch_interop_threads,
+        opencv=settings.opencv_threads,
+        pin=settings.cpu_affinity,
+    )
+
+
+def apply_thread_plan(plan: ThreadPlan) -> None:
+    torch.set_num_threads(plan.intra_op)
+    cv2.setNumThreads(plan.opencv)
+
+    # Torch only accepts the inter-op size before its pool first runs work.
+    if torch.get_num_interop_threads() != plan.inter_op:
+        try:
+            torch.set_num_interop_threads(plan.inter_op)
+        except RuntimeError:
+            log.warning("interop_threads_locked", inter_op=plan.inter_op)
+
+    if plan.cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, plan.cpus)
+
+    log.info(
+        "thread_plan_applied",
+        intra_op=plan.intra_op,
+        inter_op=torch.get_num_interop_threads(),
+        opencv=plan.opencv,
+        cpus=list(plan.cpus) if plan.cpus else None,
+    )
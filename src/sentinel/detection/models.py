@@ -1,21 +1,93 @@
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
 import torch
 from ultralytics import YOLO
+from ultralytics.engine.results import Results
+
+from sentinel.config import settings
+from sentinel.detection.tracking import (
+    LOW_CONFIDENCE,
+    NativeTracker,
+    StreamTracker,
+    create_tracker,
+)
+from sentinel.detection.utils import export_model, resolve_model_path
 
 
 class YOLODetector:
-    def __init__(self, model: str = "yolo11m.pt", device: str = "mps"):
-        self.device = device
-        self.model = YOLO(model)
+    def __init__(
+        self,
+        model: str = "yolo11m.pt",
+        device: str = "mps",
+        export_format: str | None = None,
+        cache_dir: Path | None = None,
+        input_size: int | None = None,
+        tracker_type: str | None = None,
+    ):
+        start_time = time.perf_counter()
+        self.model_name = model
+        self.tracker_type = tracker_type or settings.tracker_type
+        self._tracker: StreamTracker | NativeTracker | None = None
+        # Ultralytics writes each call's conf/classes/imgsz into the shared
+        # predictor before running it, so concurrent callers (API requests,
+        # streams, warmup) must take turns. Reentrant: ``track`` and
+        # ``warmup`` call ``predict``.
+        self._lock = threading.RLock()
+        self.input_size = input_size or settings.input_size
+        self.export_format = export_format or settings.model_export_format
+        cache_dir = cache_dir or settings.model_cache_dir
 
         if device == "mps" and torch.backends.mps.is_available():
-            self.model.to("mps")
+            self.device = "mps"
         elif device == "cuda" and torch.cuda.is_available():
-            self.model.to("cuda")
+            self.device = "cuda"
         else:
-            self.model.to("cpu")
             self.device = "cpu"
 
-        self.model.model.eval()
+        self.model_path = resolve_model_path(model, cache_dir)
+        if self.export_format:
+            self.model_path = export_model(
+                self.model_path, self.export_format, self.input_size, cache_dir
+            )
+
+        self.model = YOLO(self.model_path, task="detect")
+        if not self.export_format:
+            self.model.to(self.device)
+            self.model.model.eval()
+
+        self.load_time = time.perf_counter() - start_time
+
+    @property
+    def names(self) -> dict[int, str]:
+        return self.model.names
+
+    def memory_bytes(self) -> int:
+        if self.export_format:
+            path = Path(self.model_path)
+            files = path.rglob("*") if path.is_dir() else [path]
+            return sum(file.stat().st_size for file in files if file.is_file())
+
+        module = self.model.model
+        return sum(
+            tensor.numel() * tensor.element_size()
+            for tensor in [*module.parameters(), *module.buffers()]
+        )
+
+    def close(self) -> None:
+        """Nothing to release; present so callers can close any detector."""
+
+    def warmup(self, iterations: int = 2) -> float:
+        start_time = time.perf_counter()
+        frame = np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8)
+        # Held for the whole warmup so requests admitted meanwhile wait for
+        # it rather than interleaving with it.
+        with self._lock:
+            for _ in range(iterations):
+                self.predict(frame)
+        return time.perf_counter() - start_time
 
     @torch.inference_mode()
     def predict(
@@ -24,17 +96,43 @@ class YOLODetector:
         conf: float = 0.5,
         iou: float = 0.45,
         max_det: int = 300,
+        classes: list[int] | None = None,
     ):
-        results = self.model.predict(
-            frame,
-            conf=conf,
-            iou=iou,
-            max_det=max_det,
-            verbose=False,
-            device=self.device,
-        )
+        with self._lock:
+            results = self.model.predict(
+                frame,
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=classes,
+                imgsz=self.input_size,
+                verbose=False,
+                device=self.device,
+            )
         return results[0]
 
+    @torch.inference_mode()
+    def predict_batch(
+        self,
+        frames: list,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+    ):
+        with self._lock:
+            return self.model.predict(
+                frames,
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=classes,
+                imgsz=self.input_size,
+                verbose=False,
+                device=self.device,
+                batch=len(frames),
+            )
+
     @torch.inference_mode()
     def track(
         self,
@@ -43,15 +141,58 @@ class YOLODetector:
         iou: float = 0.45,
         max_det: int = 300,
         persist: bool = True,
+        classes: list[int] | None = None,
     ):
-        results = self.model.track(
-            frame,
-            conf=conf,
-            iou=iou,
-            max_det=max_det,
-            verbose=False,
-            device=self.device,
-            persist=persist,
-            tracker="botsort.yaml",
-        )
-        return results[0]
+        with self._lock:
+            if self.tracker_type == "native":
+                if self._tracker is None or not persist:
+                    self._tracker = NativeTracker()
+                # Low-confidence boxes only extend existing tracks; `conf` still
+                # decides which detections may start one.
+                self._tracker.high_threshold = conf
+                results = self.predict(
+                    frame,
+                    conf=min(conf, LOW_CONFIDENCE),
+                    iou=iou,
+                    max_det=max_det,
+                    classes=classes,
+                )
+                return self._tracker.update(results)
+
+            results = self.model.track(
+                frame,
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=classes,
+                imgsz=self.input_size,
+                verbose=False,
+                device=self.device,
+                persist=persist,
+                tracker=f"{self.tracker_type}.yaml",
+            )
+            return results[0]
+
+    @torch.inference_mode()
+    def track_batch(
+        self,
+        frames: list,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        max_det: int = 300,
+        persist: bool = True,
+        classes: list[int] | None = None,
+    ) -> list[Results]:
+        """Detect ``frames`` in one batched call, then track them one at a
+        time in order, so the tracker sees the same sequence as ``track``."""
+        with self._lock:
+            if self._tracker is None or not persist:
+                self._tracker = create_tracker(self.tracker_type)
+            if isinstance(self._tracker, NativeTracker):
+                self._tracker.high_threshold = conf
+                conf = min(conf, LOW_CONFIDENCE)
+
+            results = self.predict_batch(
+                frames, conf=conf, iou=iou, max_det=max_det, classes=classes
+            )
+            return [self._tracker.update(result) for result in results]
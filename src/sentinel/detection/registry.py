@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sentinel.detection.models import YOLODetector
+from sentinel.logging import get_logger
+
+log = get_logger(__name__)
+
+
+class UnknownModelError(ValueError):
+    pass
+
+
+@dataclass
+class LoadedModel:
+    name: str
+    memory_bytes: int
+
+
+class ModelRegistry:
+    """Lazily loads detectors by name and evicts the least recently used ones
+    once their combined weight memory exceeds the budget."""
+
+    def __init__(
+        self,
+        device: str,
+        memory_budget_bytes: int,
+        allowed_models: list[str] | None = None,
+        pinned_models: list[str] | None = None,
+        loader: Callable[[str, str], YOLODetector] = YOLODetector,
+    ):
+        self.device = device
+        self.memory_budget_bytes = memory_budget_bytes
+        self.pinned_models = set(pinned_models or [])
+        self.allowed_models = set(allowed_models or []) | self.pinned_models
+        self.loader = loader
+        self._detectors: OrderedDict[str, YOLODetector] = OrderedDict()
+        self._memory: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    def get(self, name: str) -> YOLODetector:
+        if name not in self.allowed_models:
+            raise UnknownModelError(f"Model not available: {name}")
+
+        with self._lock:
+            if name in self._detectors:
+                self._detectors.move_to_end(name)
+                return self._detectors[name]
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if name in self._detectors:
+                    self._detectors.move_to_end(name)
+                    return self._detectors[name]
+
+            log.info("loading_model", model_name=name, device=self.device)
+            start_time = time.perf_counter()
+            detector = self.loader(name, self.device)
+            load_ms = (time.perf_counter() - start_time) * 1000
+            memory_bytes = detector.memory_bytes()
+
+            with self._lock:
+                self._detectors[name] = detector
+                self._memory[name] = memory_bytes
+                self._evict(keep=name)
+
+            log.info(
+                "model_loaded",
+                model_name=name,
+                memory_bytes=memory_bytes,
+                load_ms=round(load_ms, 1),
+            )
+            return detector
+
+    def loaded(self) -> list[LoadedModel]:
+        with self._lock:
+            return [
+                LoadedModel(name=name, memory_bytes=self._memory[name])
+                for name in self._detectors
+            ]
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(self._memory.values())
+
+    def _evict(self, keep: str) -> None:
+        for name in list(self._detectors):
+            if self.memory_bytes <= self.memory_budget_bytes:
+                break
+            if name == keep or name in self.pinned_models:
+                continue
+
+            del self._detectors[name]
+            freed = self._memory.pop(name)
+            log.info("model_evicted", model_name=name, memory_bytes=freed)
@@ -0,0 +1,418 @@
+import itertools
+import mmap
+import os
+import queue
+import tempfile
+import threading
+import time
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.process import BaseProcess
+from multiprocessing.reduction import recv_handle, send_handle
+from pathlib import Path
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.config import settings
+from sentinel.cpu import apply_thread_plan, settings_thread_plan
+from sentinel.detection.registry import ModelRegistry
+from sentinel.detection.tracking import NativeTracker, StreamTracker, create_tracker
+from sentinel.logging import configure_logging, get_logger
+
+log = get_logger(__name__)
+
+
+class RemoteInferenceError(RuntimeError):
+    pass
+
+
+def anonymous_shared_file(size: int) -> int:
+    """Descriptor of ``size`` bytes of shareable memory with no name, so the
+    kernel frees it with the last process holding it, however that process
+    exits."""
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("sentinel-frames", os.MFD_CLOEXEC)
+    else:
+        fd, path = tempfile.mkstemp(prefix="sentinel-frames-")
+        os.unlink(path)
+    os.ftruncate(fd, size)
+    return fd
+
+
+class SharedFrames:
+    """Shared memory block reused for every batch sent over one connection,
+    grown when a batch does not fit. The replica maps the same memory from a
+    descriptor passed over the connection."""
+
+    def __init__(self):
+        self.buffer: mmap.mmap | None = None
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer) if self.buffer is not None else 0
+
+    def reserve(self, size: int) -> int | None:
+        """Make room for ``size`` bytes. Returns the descriptor of a new block,
+        which the caller sends to the replica and then closes, or None when
+        the current block already fits."""
+        if size <= self.size:
+            return None
+
+        self.close()
+        fd = anonymous_shared_file(size)
+        try:
+            self.buffer = mmap.mmap(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def write(self, frames: list[np.ndarray]) -> list[tuple]:
+        layout = []
+        offset = 0
+        for frame in frames:
+            view = np.ndarray(
+                frame.shape, frame.dtype, buffer=self.buffer, offset=offset
+            )
+            view[...] = frame
+            layout.append((frame.shape, frame.dtype.str, offset))
+            offset += frame.nbytes
+        return layout
+
+    def close(self) -> None:
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+
+class InferenceServer:
+    """Serves detection requests from HTTP workers over a local socket.
+
+    Each connection gets its own thread; calls to the same model are serialized
+    because a YOLO predictor is not safe to share between threads.
+    """
+
+    def __init__(self, address: str, authkey: str, registry: ModelRegistry):
+        self.address = address
+        self.registry = registry
+        self.listener = Listener(address, family="AF_UNIX", authkey=authkey.encode())
+        self._model_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def serve_forever(self) -> None:
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                break
+            except Exception as e:
+                log.warning("inference_connection_rejected", error=str(e))
+                continue
+
+            threading.Thread(
+                target=self._handle, args=(connection,), daemon=True
+            ).start()
+
+    def close(self) -> None:
+        self.listener.close()
+
+    def _model_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._model_locks.setdefault(name, threading.Lock())
+
+    def _handle(self, connection: Connection) -> None:
+        # A replaced segment is not closed explicitly: ultralytics may still
+        # hold a view of the last batch, and the mapping is released once the
+        # last view goes away.
+        segment = None
+        try:
+            while True:
+                try:
+                    op, payload = connection.recv()
+                except (EOFError, OSError):
+                    break
+
+                try:
+                    if op == "info":
+                        reply = self._info(payload)
+                    elif op == "attach":
+                        fd = recv_handle(connection)
+                        try:
+                            segment = mmap.mmap(fd, payload["size"])
+                        finally:
+                            os.close(fd)
+                        reply = None
+                    elif op == "predict":
+                        if segment is None:
+                            raise ValueError("No frame segment attached")
+                        reply = self._predict(payload, segment)
+                    else:
+                        raise ValueError(f"Unknown operation: {op}")
+                    connection.send(("ok", reply))
+                except Exception as e:
+                    log.exception("inference_request_failed", operation=op)
+                    connection.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            connection.close()
+
+    def _info(self, payload: dict) -> dict:
+        detector = self.registry.get(payload["model"])
+        return {
+            "device": detector.device,
+            "input_size": detector.input_size,
+            "names": detector.model.names,
+        }
+
+    def _predict(self, payload: dict, segment: mmap.mmap) -> list:
+        detector = self.registry.get(payload["model"])
+        frames = [
+            np.ndarray(shape, np.dtype(dtype), buffer=segment, offset=offset)
+            for shape, dtype, offset in payload["frames"]
+        ]
+        kwargs = {key: payload[key] for key in ("conf", "iou", "max_det", "classes")}
+
+        with self._model_lock(payload["model"]):
+            if len(frames) == 1:
+                results = [detector.predict(frames[0], **kwargs)]
+            else:
+                results = detector.predict_batch(frames, **kwargs)
+
+        return [
+            (result.boxes.data.cpu().numpy(), dict(result.speed)) for result in results
+        ]
+
+
+class _Channel:
+    def __init__(self, address: str, authkey: str):
+        self.connection = Client(address, family="AF_UNIX", authkey=authkey.encode())
+        self.frames = SharedFrames()
+
+    def call(self, op: str, payload: dict, frames: list[np.ndarray] | None = None):
+        if frames is not None:
+            frames = [np.ascontiguousarray(frame) for frame in frames]
+            fd = self.frames.reserve(max(sum(frame.nbytes for frame in frames), 1))
+            if fd is not None:
+                try:
+                    self.connection.send(("attach", {"size": self.frames.size}))
+                    send_handle(self.connection, fd, None)
+                    self._reply()
+                finally:
+                    os.close(fd)
+            payload["frames"] = self.frames.write(frames)
+
+        self.connection.send((op, payload))
+        return self._reply()
+
+    def _reply(self):
+        status, reply = self.connection.recv()
+        if status == "error":
+            raise RemoteInferenceError(reply)
+        return reply
+
+    def close(self) -> None:
+        self.connection.close()
+        self.frames.close()
+
+
+class RemoteDetector:
+    """Detector that runs the model in an inference replica.
+
+    Frames travel through shared memory; only box arrays come back. Connections
+    are pooled and spread across replicas, so an HTTP worker holds no weights.
+    """
+
+    def __init__(self, model: str, addresses: list[str], authkey: str):
+        if not addresses:
+            raise ValueError("At least one inference replica address is required")
+
+        start_time = time.perf_counter()
+        self.model_name = model
+        self.addresses = addresses
+        self._authkey = authkey
+        self._pool: queue.SimpleQueue[_Channel] = queue.SimpleQueue()
+        self._replica = itertools.count(os.getpid())
+        self._tracker: StreamTracker | NativeTracker | None = None
+
+        info = self._call("info", {"model": model})
+        self.device = info["device"]
+        self.input_size = info["input_size"]
+        self.names = info["names"]
+        self.load_time = time.perf_counter() - start_time
+
+    def _channel(self) -> _Channel:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            address = self.addresses[next(self._replica) % len(self.addresses)]
+            return _Channel(address, self._authkey)
+
+    def _call(self, op: str, payload: dict, frames: list[np.ndarray] | None = None):
+        # A replica may have restarted since a pooled connection was opened,
+        # so a broken connection gets one retry on a fresh one.
+        for attempt in range(2):
+            channel = self._channel()
+            try:
+                reply = channel.call(op, payload, frames)
+            except (EOFError, OSError) as e:
+                channel.close()
+                if attempt:
+                    raise RemoteInferenceError(f"Inference replica unavailable: {e}")
+                continue
+            except Exception:
+                channel.close()
+                raise
+
+            self._pool.put(channel)
+            return reply
+
+    def memory_bytes(self) -> int:
+        # Weights live in the inference replicas, not in this process.
+        return 0
+
+    def warmup(self, iterations: int = 2) -> float:
+        start_time = time.perf_counter()
+        frame = np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8)
+        for _ in range(iterations):
+            self.predict(frame)
+        return time.perf_counter() - start_time
+
+    def predict_batch(
+        self,
+        frames: list,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+    ) -> list[Results]:
+        payload = {
+            "model": self.model_name,
+            "conf": conf,
+            "iou": iou,
+            "max_det": max_det,
+            "classes": classes,
+        }
+        replies = self._call("predict", payload, frames=frames)
+
+        results = []
+        for frame, (boxes, speed) in zip(frames, replies):
+            result = Results(
+                frame, path="", names=self.names, boxes=torch.from_numpy(boxes)
+            )
+            result.speed = speed
+            results.append(result)
+        return results
+
+    def predict(
+        self,
+        frame,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+    ) -> Results:
+        return self.predict_batch(
+            [frame], conf=conf, iou=iou, max_det=max_det, classes=classes
+        )[0]
+
+    def track(
+        self,
+        frame,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        max_det: int = 300,
+        persist: bool = True,
+        classes: list[int] | None = None,
+    ) -> Results:
+        # Tracking state stays with the caller so replicas remain stateless.
+        if self._tracker is None or not persist:
+            self._tracker = create_tracker()
+        return self._tracker.update(
+            self.predict(frame, conf=conf, iou=iou, max_det=max_det, classes=classes)
+        )
+
+    def track_batch(
+        self,
+        frames: list,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        max_det: int = 300,
+        persist: bool = True,
+        classes: list[int] | None = None,
+    ) -> list[Results]:
+        if self._tracker is None or not persist:
+            self._tracker = create_tracker()
+        results = self.predict_batch(
+            frames, conf=conf, iou=iou, max_det=max_det, classes=classes
+        )
+        return [self._tracker.update(result) for result in results]
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> "RemoteDetector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_replica(address: str, authkey: str, ready, index: int = 0) -> None:
+    configure_logging(background=True)
+    apply_thread_plan(settings_thread_plan(index=index))
+    registry = ModelRegistry(
+        device=settings.device,
+        memory_budget_bytes=settings.model_memory_budget_mb * 1024 * 1024,
+        allowed_models=settings.api_models,
+        pinned_models=[settings.model_name],
+    )
+    detector = registry.get(settings.model_name)
+    detector.warmup(settings.model_warmup_iterations)
+
+    server = InferenceServer(address, authkey, registry)
+    log.info("inference_replica_started", address=address, pid=os.getpid())
+    ready.set()
+    server.serve_forever()
+
+
+def start_replicas(
+    count: int, socket_dir: Path, authkey: str, timeout: float = 300.0
+) -> tuple[list[BaseProcess], list[str]]:
+    context = get_context("spawn")
+    processes, addresses, events = [], [], []
+
+    for i in range(count):
+        address = str(socket_dir / f"replica-{i}.sock")
+        ready = context.Event()
+        process = context.Process(
+            target=run_replica,
+            args=(address, authkey, ready, i),
+            name=f"sentinel-inference-{i}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+        addresses.append(address)
+        events.append(ready)
+
+    deadline = time.monotonic() + timeout
+    for process, ready in zip(processes, events):
+        while not ready.wait(0.1):
+            if not process.is_alive() or time.monotonic() > deadline:
+                stop_replicas(processes)
+                raise RuntimeError(f"Inference replica {process.name} failed to start")
+
+    return processes, addresses
+
+
+def stop_replicas(processes: list[BaseProcess], timeout: float = 5.0) -> None:
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout)
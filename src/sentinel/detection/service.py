@@ -3,6 +3,8 @@ from ultralytics.engine.results import Results
 
 from sentinel.config import settings
 from sentinel.detection.models import YOLODetector
+from sentinel.detection.tracking import LOW_CONFIDENCE, NativeTracker, StreamTracker
+from sentinel.detection.utils import resolve_classes
 
 
 class DetectionService:
@@ -12,19 +14,47 @@ class DetectionService:
         enable_tracking: bool = False,
         conf_threshold: float | None = None,
         iou_threshold: float | None = None,
+        classes: list[str | int] | None = None,
+        tracker: StreamTracker | NativeTracker | None = None,
     ):
         self.detector = detector
         self.enable_tracking = enable_tracking
-        self.conf_threshold = conf_threshold or settings.conf_threshold
-        self.iou_threshold = iou_threshold or settings.iou_threshold
+        # With its own tracker the service can share a detector with other
+        # callers; without one, tracking state lives on the detector.
+        self.tracker = tracker
+        self.conf_threshold = (
+            conf_threshold if conf_threshold is not None else settings.conf_threshold
+        )
+        self.iou_threshold = (
+            iou_threshold if iou_threshold is not None else settings.iou_threshold
+        )
+        self.set_classes(classes)
+
+    def set_classes(self, classes: list[str | int] | None) -> None:
+        # Resolved to class IDs up front so the detector drops other classes
+        # before NMS rather than after.
+        self.classes = resolve_classes(
+            classes or settings.detection_classes, self.detector.names
+        )
 
     def process(self, frame: np.ndarray) -> Results:
+        if self.enable_tracking and self.tracker is not None:
+            return self.tracker.update(
+                self.detector.predict(
+                    frame,
+                    conf=self._tracking_conf(),
+                    iou=self.iou_threshold,
+                    max_det=settings.max_detections,
+                    classes=self.classes,
+                )
+            )
         if self.enable_tracking:
             return self.detector.track(
                 frame,
                 conf=self.conf_threshold,
                 iou=self.iou_threshold,
                 max_det=settings.max_detections,
+                classes=self.classes,
             )
 
         return self.detector.predict(
@@ -32,4 +62,43 @@ class DetectionService:
             conf=self.conf_threshold,
             iou=self.iou_threshold,
             max_det=settings.max_detections,
+            classes=self.classes,
+        )
+
+    def process_batch(self, frames: list[np.ndarray]) -> list[Results]:
+        """One model call for all ``frames``; with tracking enabled they are
+        still tracked one by one in order."""
+        if self.enable_tracking and self.tracker is not None:
+            results = self.detector.predict_batch(
+                frames,
+                conf=self._tracking_conf(),
+                iou=self.iou_threshold,
+                max_det=settings.max_detections,
+                classes=self.classes,
+            )
+            return [self.tracker.update(result) for result in results]
+        if self.enable_tracking:
+            return self.detector.track_batch(
+                frames,
+                conf=self.conf_threshold,
+                iou=self.iou_threshold,
+                max_det=settings.max_detections,
+                classes=self.classes,
+            )
+
+        return self.detector.predict_batch(
+            frames,
+            conf=self.conf_threshold,
+            iou=self.iou_threshold,
+            max_det=settings.max_detections,
+            classes=self.classes,
         )
+
+    def _tracking_conf(self) -> float:
+        """Confidence to detect at for the service's own tracker. The native
+        tracker extends tracks with low-confidence boxes; the threshold still
+        decides which detections may start one."""
+        if isinstance(self.tracker, NativeTracker):
+            self.tracker.high_threshold = self.conf_threshold
+            return min(self.conf_threshold, LOW_CONFIDENCE)
+        return self.conf_threshold
@@ -0,0 +1,332 @@
+import lap
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+from ultralytics.trackers.track import TRACKER_MAP
+from ultralytics.utils import YAML, IterableSimpleNamespace
+from ultralytics.utils.checks import check_yaml
+
+from sentinel.config import settings
+
+TRACKER_TYPES = ("botsort", "bytetrack", "native")
+
+# Detections between LOW_CONFIDENCE and the detection threshold are only used
+# to keep existing tracks alive, as in ByteTrack.
+LOW_CONFIDENCE = 0.1
+
+# Kalman noise as a fraction of box height, from the ByteTrack/DeepSORT filter.
+POSITION_STD = 1 / 20
+VELOCITY_STD = 1 / 160
+
+_TRANSITION = np.eye(8)
+_TRANSITION[:4, 4:] = np.eye(4)
+
+
+class StreamTracker:
+    """Tracker state owned by a single stream, independent of the detector.
+
+    `YOLODetector.track` keeps its tracker on the shared model, so streams that
+    share a detector would corrupt each other's track IDs.
+    """
+
+    def __init__(self, config: str = "botsort.yaml"):
+        cfg = IterableSimpleNamespace(**YAML.load(check_yaml(config)))
+        self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg)
+
+    def update(self, results: Results) -> Results:
+        tracks = self.tracker.update(results.boxes.cpu().numpy(), results.orig_img)
+        return apply_tracks(results, tracks)
+
+    def reset(self) -> None:
+        self.tracker.reset()
+
+
+class NativeTracker:
+    """Vectorized IoU + Kalman tracker with ByteTrack's two-stage matching.
+
+    All tracks are predicted, matched and updated as arrays in one pass per
+    frame, with no appearance features or camera-motion compensation. State is
+    per instance, so every stream can own one.
+    """
+
+    def __init__(
+        self,
+        max_age: int | None = None,
+        min_hits: int | None = None,
+        iou_threshold: float | None = None,
+        high_threshold: float | None = None,
+    ):
+        self.max_age = settings.tracker_max_age if max_age is None else max_age
+        self.min_hits = settings.tracker_min_hits if min_hits is None else min_hits
+        self.iou_threshold = (
+            settings.tracker_iou_threshold if iou_threshold is None else iou_threshold
+        )
+        self.high_threshold = (
+            settings.conf_threshold if high_threshold is None else high_threshold
+        )
+        self.reset()
+
+    def reset(self) -> None:
+        self.frame_count = 0
+        self._next_id = 1
+        self._mean = np.empty((0, 8))
+        self._covariance = np.empty((0, 8, 8))
+        self._ids = np.empty(0, dtype=int)
+        self._hits = np.empty(0, dtype=int)
+        self._misses = np.empty(0, dtype=int)
+        self._scores = np.empty(0)
+        self._classes = np.empty(0)
+
+    def update(self, results: Results) -> Results:
+        boxes = results.boxes.data.cpu().numpy()
+        tracks = self.step(boxes[:, :4], boxes[:, -2], boxes[:, -1])
+        return apply_tracks(results, tracks)
+
+    def step(
+        self, xyxy: np.ndarray, scores: np.ndarray, class_ids: np.ndarray
+    ) -> np.ndarray:
+        """Advance one frame and return rows of
+        ``x1, y1, x2, y2, track_id, score, class_id, detection_index``."""
+        self.frame_count += 1
+        self._predict()
+
+        high = np.flatnonzero(scores >= self.high_threshold)
+        low = np.flatnonzero(scores < self.high_threshold)
+        unmatched_tracks = np.arange(len(self._ids))
+
+        matched_tracks, matched_detections = [], []
+        for candidates in (high, low):
+            rows, cols = self._match(unmatched_tracks, xyxy[candidates])
+            matched_tracks.append(unmatched_tracks[rows])
+            matched_detections.append(candidates[cols])
+            unmatched_tracks = np.delete(unmatched_tracks, rows)
+
+        tracks = np.concatenate(matched_tracks)
+        detections = np.concatenate(matched_detections)
+        self._update(
+            tracks, xyxy[detections], scores[detections], class_ids[detections]
+        )
+
+        new = np.setdiff1d(high, detections)
+        self._initiate(xyxy[new], scores[new], class_ids[new])
+
+        indices = np.full(len(self._ids), -1)
+        indices[tracks] = detections
+        indices[len(self._ids) - len(new) :] = new
+        indices = indices[self._prune()]
+
+        updated = self._misses == 0
+        if self.frame_count > self.min_hits:
+            updated &= self._hits >= self.min_hits
+        return np.column_stack(
+            [
+                _to_xyxy(self._mean[updated, :4]),
+                self._ids[updated],
+                self._scores[updated],
+                self._classes[updated],
+                indices[updated],
+            ]
+        ).reshape(-1, 8)
+
+    def _predict(self) -> None:
+        if not len(self._ids):
+            return
+        height = self._mean[:, 3]
+        noise = np.column_stack(
+            [
+                POSITION_STD * height,
+                POSITION_STD * height,
+                np.full_like(height, 1e-2),
+                POSITION_STD * height,
+                VELOCITY_STD * height,
+                VELOCITY_STD * height,
+                np.full_like(height, 1e-5),
+                VELOCITY_STD * height,
+            ]
+        )
+        self._mean = self._mean @ _TRANSITION.T
+        self._covariance = _TRANSITION @ self._covariance @ _TRANSITION.T + _diagonal(
+            noise**2
+        )
+        self._misses += 1
+
+    def _match(
+        self, tracks: np.ndarray, xyxy: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if not len(tracks) or not len(xyxy):
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+        iou = box_iou(_to_xyxy(self._mean[tracks, :4]), xyxy)
+        valid = iou >= self.iou_threshold
+
+        # Pairs that overlap nothing else are matched directly; only rows and
+        # columns with competing candidates go through the assignment solver,
+        # which keeps crowded scenes from paying for a dense square LAP.
+        row_counts = valid.sum(axis=1)
+        col_counts = valid.sum(axis=0)
+        unique = valid & (row_counts[:, None] == 1) & (col_counts[None, :] == 1)
+        rows, cols = np.nonzero(unique)
+
+        contested_rows = np.flatnonzero(row_counts > unique.sum(axis=1))
+        contested_cols = np.flatnonzero(col_counts > unique.sum(axis=0))
+        if len(contested_rows) and len(contested_cols):
+            cost = 1 - iou[np.ix_(contested_rows, contested_cols)]
+            _, assignment, _ = lap.lapjv(
+                cost, extend_cost=True, cost_limit=1 - self.iou_threshold
+            )
+            assigned = np.flatnonzero(assignment >= 0)
+            rows = np.concatenate([rows, contested_rows[assigned]])
+            cols = np.concatenate([cols, contested_cols[assignment[assigned]]])
+
+        return rows, cols
+
+    def _update(
+        self,
+        tracks: np.ndarray,
+        xyxy: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+    ) -> None:
+        if not len(tracks):
+            return
+        mean, covariance = self._mean[tracks], self._covariance[tracks]
+        height = mean[:, 3]
+        noise = np.column_stack(
+            [
+                POSITION_STD * height,
+                POSITION_STD * height,
+                np.full_like(height, 1e-1),
+                POSITION_STD * height,
+            ]
+        )
+        innovation_cov = covariance[:, :4, :4] + _diagonal(noise**2)
+        gain = np.linalg.solve(innovation_cov, covariance[:, :4, :]).transpose(0, 2, 1)
+        innovation = _to_xyah(xyxy) - mean[:, :4]
+
+        self._mean[tracks] = mean + (gain @ innovation[..., None])[..., 0]
+        self._covariance[tracks] = covariance - gain @ innovation_cov @ gain.transpose(
+            0, 2, 1
+        )
+        self._hits[tracks] += 1
+        self._misses[tracks] = 0
+        self._scores[tracks] = scores
+        self._classes[tracks] = class_ids
+
+    def _initiate(
+        self, xyxy: np.ndarray, scores: np.ndarray, class_ids: np.ndarray
+    ) -> None:
+        count = len(xyxy)
+        if not count:
+            return
+        measurement = _to_xyah(xyxy)
+        height = measurement[:, 3]
+        std = np.column_stack(
+            [
+                2 * POSITION_STD * height,
+                2 * POSITION_STD * height,
+                np.full_like(height, 1e-2),
+                2 * POSITION_STD * height,
+                10 * VELOCITY_STD * height,
+                10 * VELOCITY_STD * height,
+                np.full_like(height, 1e-5),
+                10 * VELOCITY_STD * height,
+            ]
+        )
+        mean = np.hstack([measurement, np.zeros((count, 4))])
+
+        self._mean = np.vstack([self._mean, mean])
+        self._covariance = np.concatenate([self._covariance, _diagonal(std**2)])
+        self._ids = np.concatenate(
+            [self._ids, np.arange(self._next_id, self._next_id + count)]
+        )
+        self._next_id += count
+        self._hits = np.concatenate([self._hits, np.ones(count, dtype=int)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=int)])
+        self._scores = np.concatenate([self._scores, scores])
+        self._classes = np.concatenate([self._classes, class_ids])
+
+    def _prune(self) -> np.ndarray:
+        # Tentative tracks are dropped on their first miss, confirmed ones
+        # after max_age missed frames.
+        keep = (self._misses <= self.max_age) & (
+            (self._misses == 0) | (self._hits >= self.min_hits)
+        )
+        self._mean = self._mean[keep]
+        self._covariance = self._covariance[keep]
+        self._ids = self._ids[keep]
+        self._hits = self._hits[keep]
+        self._misses = self._misses[keep]
+        self._scores = self._scores[keep]
+        self._classes = self._classes[keep]
+        return keep
+
+
+def create_tracker(tracker_type: str | None = None) -> StreamTracker | NativeTracker:
+    tracker_type = tracker_type or settings.tracker_type
+    if tracker_type not in TRACKER_TYPES:
+        raise ValueError(f"Unknown tracker: {tracker_type}")
+    if tracker_type == "native":
+        return NativeTracker()
+    return StreamTracker(f"{tracker_type}.yaml")
+
+
+def apply_tracks(results: Results, tracks: np.ndarray) -> Results:
+    if len(tracks) == 0:
+        return results[:0]
+
+    tracked = results[tracks[:, -1].astype(int)]
+    tracked.update(boxes=torch.as_tensor(tracks[:, :-1]))
+    return tracked
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Built one axis at a time with in-place ops: at a thousand objects the
+    # (N, M, 2) intermediates of the broadcast form dominate tracking time.
+    width = np.minimum(a[:, None, 2], b[None, :, 2])
+    width -= np.maximum(a[:, None, 0], b[None, :, 0])
+    np.clip(width, 0, None, out=width)
+    height = np.minimum(a[:, None, 3], b[None, :, 3])
+    height -= np.maximum(a[:, None, 1], b[None, :, 1])
+    np.clip(height, 0, None, out=height)
+    intersection = width
+    intersection *= height
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :]
+    union -= intersection
+    union += 1e-9
+    return np.divide(intersection, union, out=union)
+
+
+def _to_xyah(xyxy: np.ndarray) -> np.ndarray:
+    width = xyxy[:, 2] - xyxy[:, 0]
+    height = xyxy[:, 3] - xyxy[:, 1]
+    return np.column_stack(
+        [
+            xyxy[:, 0] + width / 2,
+            xyxy[:, 1] + height / 2,
+            width / np.maximum(height, 1e-9),
+            height,
+        ]
+    )
+
+
+def _to_xyxy(xyah: np.ndarray) -> np.ndarray:
+    height = xyah[:, 3]
+    width = xyah[:, 2] * height
+    return np.column_stack(
+        [
+            xyah[:, 0] - width / 2,
+            xyah[:, 1] - height / 2,
+            xyah[:, 0] + width / 2,
+            xyah[:, 1] + height / 2,
+        ]
+    )
+
+
+def _diagonal(values: np.ndarray) -> np.ndarray:
+    matrices = np.zeros((*values.shape, values.shape[-1]))
+    index = np.arange(values.shape[-1])
+    matrices[:, index, index] = values
+    return matrices
@@ -1,5 +1,13 @@
+import shutil
 import time
 from collections import deque
+from pathlib import Path
+
+from ultralytics import YOLO
+
+from sentinel.logging import get_logger
+
+log = get_logger(__name__)
 
 
 class FPSCounter:
@@ -15,3 +23,79 @@ class FPSCounter:
         if len(self.frame_times) > 0:
             return len(self.frame_times) / sum(self.frame_times)
         return 0.0
+
+
+EXPORT_SUFFIXES = {
+    "torchscript": ".torchscript",
+    "onnx": ".onnx",
+    "openvino": "_openvino_model",
+    "engine": ".engine",
+    "coreml": ".mlpackage",
+    "ncnn": "_ncnn_model",
+}
+
+
+def resolve_model_path(model: str, cache_dir: Path | None) -> str:
+    path = Path(model)
+    if cache_dir is None or path.suffix != ".pt" or path.parent != Path("."):
+        return model
+    if path.exists():
+        return model
+
+    # Ultralytics downloads known weights to whatever path it is given, so a
+    # bare name pointed into the cache keeps downloads out of the working dir.
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return str(cache_dir / path.name)
+
+
+def export_model(
+    model_path: str, export_format: str, input_size: int, cache_dir: Path | None
+) -> str:
+    if export_format not in EXPORT_SUFFIXES:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    weights = Path(model_path)
+    artifact = (cache_dir or weights.parent) / (
+        f"{weights.stem}_{input_size}{EXPORT_SUFFIXES[export_format]}"
+    )
+    if artifact.exists():
+        return str(artifact)
+
+    exported = YOLO(model_path).export(format=export_format, imgsz=input_size)
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(exported, artifact)
+    log.info(
+        "model_exported",
+        model_path=model_path,
+        export_format=export_format,
+        artifact=str(artifact),
+    )
+    return str(artifact)
+
+
+def parse_classes(value: str | None) -> list[str] | None:
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()] or None
+
+
+def resolve_classes(
+    classes: list[str | int] | None, names: dict[int, str]
+) -> list[int] | None:
+    """Map class names or IDs to the model's class IDs."""
+    if not classes:
+        return None
+
+    ids = {name.lower(): class_id for class_id, name in names.items()}
+    resolved = set()
+    for item in classes:
+        if isinstance(item, int) or item.isdigit():
+            class_id = int(item)
+            if class_id not in names:
+                raise ValueError(f"Unknown class: {item}")
+        elif item.lower() in ids:
+            class_id = ids[item.lower()]
+        else:
+            raise ValueError(f"Unknown class: {item}")
+        resolved.add(class_id)
+    return sorted(resolved)
@@ -1,9 +1,10 @@
+import time
 from pathlib import Path
 
 import cv2
-import numpy as np
 
 from sentinel.detection.service import DetectionService
+from sentinel.records import RecordWriter
 from sentinel.visualization.annotators import Annotators
 
 SUPPORTED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
@@ -14,9 +15,14 @@ class ImagePipeline:
         self,
         detection_service: DetectionService,
         annotators: Annotators,
+        headless: bool = False,
+        records: RecordWriter | None = None,
     ):
         self.detection_service = detection_service
         self.annotators = annotators
+        self.headless = headless
+        self.records = records
+        self.frame_index = 0
 
     def run(
         self,
@@ -26,6 +32,9 @@ class ImagePipeline:
     ) -> None:
         source = Path(source)
 
+        if self.headless and (output_path or show_display):
+            raise ValueError("Headless mode cannot display or save annotated images")
+
         if not source.exists():
             raise FileNotFoundError(f"Source not found: {source}")
 
@@ -72,7 +81,18 @@ class ImagePipeline:
         if frame is None:
             raise ValueError(f"Failed to load image: {image_path}")
 
-        annotated_frame = self._process_frame(frame)
+        timestamp = time.time()
+        results = self.detection_service.process(frame)
+        if self.records:
+            self.records.write(
+                self.frame_index, timestamp, results, source=str(image_path)
+            )
+        self.frame_index += 1
+
+        if self.headless:
+            return
+
+        annotated_frame = self.annotators.draw(frame, results, fps=None, metrics=None)
 
         if output_path:
             output_path = Path(output_path)
@@ -85,11 +105,6 @@ class ImagePipeline:
             cv2.waitKey(0)
             cv2.destroyAllWindows()
 
-    def _process_frame(self, frame: np.ndarray) -> np.ndarray:
-        results = self.detection_service.process(frame)
-        annotated_frame = self.annotators.draw(frame, results, fps=None, metrics=None)
-        return annotated_frame
-
     def _get_window_name(self) -> str:
         if self.detection_service.enable_tracking:
             return "Object Detection & Tracking"
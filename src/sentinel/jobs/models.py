@@ -0,0 +1,75 @@
+import math
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+from sentinel.analytics.service import AnalyticsService
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    source: Path
+    output_path: Path
+    enable_tracking: bool = False
+    enable_analytics: bool = False
+    remove_source: bool = False
+    status: JobStatus = JobStatus.QUEUED
+    frames_processed: int = 0
+    total_frames: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    # Live analytics while the job runs; once it finishes only the rendered
+    # heatmaps are kept, keyed by (kind, window).
+    analytics: AnalyticsService | None = field(default=None, repr=False)
+    heatmaps: dict[tuple[str, float], Path] = field(default_factory=dict, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+    @property
+    def fps(self) -> float:
+        if self.started_at is None:
+            return 0.0
+
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.frames_processed / elapsed
+
+    @property
+    def files(self) -> list[Path]:
+        files = [self.output_path, *self.heatmaps.values()]
+        if self.remove_source:
+            files.append(self.source)
+        return files
+
+    def heatmap_path(self, kind: str, window: float | None = None) -> Path:
+        """Rendered heatmap of a finished job (the longest window by default)."""
+        windows = sorted(
+            {value for heatmap_kind, value in self.heatmaps if heatmap_kind == kind}
+        )
+        if not windows:
+            raise ValueError(f"Unknown heatmap kind: {kind}")
+        if window is None:
+            return self.heatmaps[(kind, windows[-1])]
+        for value in windows:
+            if math.isclose(value, window):
+                return self.heatmaps[(kind, value)]
+        have = ", ".join(f"{value:g}" for value in windows)
+        raise ValueError(f"Unknown heatmap window: {window:g} (have {have})")
+
+    def update_progress(self, frames_processed: int, total_frames: int) -> None:
+        self.frames_processed = frames_processed
+        self.total_frames = total_frames
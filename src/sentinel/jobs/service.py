@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sentinel.analytics.events import EventBus
+from sentinel.analytics.heatmap import HEATMAP_KINDS
+from sentinel.analytics.models import ZoneConfig
+from sentinel.analytics.service import AnalyticsService
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.analytics.utils import zone_classes
+from sentinel.config import settings
+from sentinel.detection.models import YOLODetector
+from sentinel.detection.service import DetectionService
+from sentinel.detection.tracking import create_tracker
+from sentinel.jobs.models import Job, JobStatus
+from sentinel.logging import get_logger
+from sentinel.video_pipeline import VideoPipeline
+from sentinel.visualization.annotators import Annotators
+
+log = get_logger(__name__)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+def resolve_worker_count(requested: int) -> int:
+    if requested > 0:
+        return requested
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+class JobService:
+    def __init__(
+        self,
+        detector: YOLODetector,
+        output_dir: Path,
+        max_workers: int = 0,
+        max_pending: int = 16,
+        zone_configs: list[ZoneConfig] | None = None,
+        event_bus: EventBus | None = None,
+        metrics_store: ZoneMetricsStore | None = None,
+        max_retained: int | None = None,
+        retention_seconds: float | None = None,
+    ):
+        # Shared with the API: its calls are serialized by the detector, and
+        # every job tracks with its own tracker.
+        self.detector = detector
+        self.output_dir = output_dir
+        self.max_workers = resolve_worker_count(max_workers)
+        self.max_pending = max_pending
+        self.zone_configs = zone_configs or []
+        self.event_bus = event_bus
+        self.metrics_store = metrics_store
+        self.max_retained = (
+            settings.jobs_max_retained if max_retained is None else max_retained
+        )
+        self.retention_seconds = (
+            settings.jobs_retention_seconds
+            if retention_seconds is None
+            else retention_seconds
+        )
+        self._pipelines: dict[str, VideoPipeline] = {}
+        self.jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # Set on shutdown; running pipelines stop at their next frame.
+        self._stopping = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="sentinel-job"
+        )
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def submit(
+        self,
+        source: Path,
+        enable_tracking: bool = False,
+        enable_analytics: bool = False,
+        job_id: str | None = None,
+        remove_source: bool = False,
+    ) -> Job:
+        job_id = job_id or self.new_job_id()
+        job = Job(
+            id=job_id,
+            source=source,
+            output_path=self.output_dir / f"{job_id}.mp4",
+            enable_tracking=enable_tracking,
+            enable_analytics=enable_analytics,
+            remove_source=remove_source,
+        )
+
+        with self._lock:
+            self._prune()
+            if self.active_count() >= self.max_workers + self.max_pending:
+                raise JobQueueFullError("Job queue is full")
+            self.jobs[job.id] = job
+
+        self._executor.submit(self._run, job)
+        log.info("job_queued", job_id=job.id, source=str(source))
+
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def active_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.is_active)
+
+    def analytics_detectors(self) -> list[YOLODetector]:
+        """Detectors of the running jobs that follow zone reloads."""
+        return [
+            pipeline.detection_service.detector
+            for pipeline in list(self._pipelines.values())
+        ]
+
+    def reload_zones(self, zone_configs: list[ZoneConfig]) -> None:
+        """Use new zones for queued jobs and swap them into running analytics
+        jobs between frames."""
+        self.zone_configs = zone_configs
+        for pipeline in list(self._pipelines.values()):
+            pipeline.reload_zones(zone_configs)
+            pipeline.detection_service.set_classes(zone_classes(zone_configs))
+
+    def _prune(self) -> None:
+        """Forget finished jobs past the retention window or beyond the
+        newest ``max_retained``, deleting their files. Called with ``_lock``
+        held."""
+        finished = sorted(
+            (job for job in self.jobs.values() if not job.is_active),
+            key=lambda job: job.finished_at or 0.0,
+        )
+        expires_before = time.time() - self.retention_seconds
+        excess = len(finished) - self.max_retained
+        for index, job in enumerate(finished):
+            if index >= excess and (job.finished_at or 0.0) >= expires_before:
+                continue
+            del self.jobs[job.id]
+            for path in job.files:
+                path.unlink(missing_ok=True)
+            log.info("job_evicted", job_id=job.id)
+
+    def _render_heatmaps(self, job: Job) -> None:
+        """Keep the rendered heatmaps and drop the live analytics, whose grids
+        and last-frame background are far larger."""
+        heatmap = job.analytics.heatmap if job.analytics else None
+        if heatmap is not None:
+            heatmaps = {}
+            for kind in HEATMAP_KINDS:
+                for window in heatmap.windows.tolist():
+                    path = self.output_dir / f"{job.id}_{kind}_{window:g}s.png"
+                    heatmap.export(path, kind, window)
+                    heatmaps[(kind, window)] = path
+            job.heatmaps = heatmaps
+        job.analytics = None
+
+    def shutdown(self) -> None:
+        """Drop queued jobs and stop running ones after their current frame."""
+        self._stopping.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        log.info("job_started", job_id=job.id)
+
+        # Published only once the job's files are final, so a finished job
+        # always has its heatmaps rendered.
+        status = JobStatus.FAILED
+        try:
+            analytics_service = None
+            zone_configs = []
+            if job.enable_analytics:
+                zone_configs = self.zone_configs
+            if job.enable_analytics or settings.heatmap_enabled:
+                analytics_service = AnalyticsService(
+                    zone_configs,
+                    event_bus=self.event_bus,
+                    source=job.id,
+                    metrics_store=self.metrics_store,
+                )
+                job.analytics = analytics_service
+
+            detection_service = DetectionService(
+                detector=self.detector,
+                enable_tracking=job.enable_tracking,
+                classes=zone_classes(zone_configs),
+                tracker=create_tracker() if job.enable_tracking else None,
+            )
+
+            pipeline = VideoPipeline(
+                detection_service,
+                Annotators(
+                    enable_tracking=job.enable_tracking, zone_configs=zone_configs
+                ),
+                analytics_service,
+                output_path=str(job.output_path),
+                show_display=False,
+                progress_callback=job.update_progress,
+                stop_event=self._stopping,
+            )
+            if job.enable_analytics:
+                self._pipelines[job.id] = pipeline
+            pipeline.run(str(job.source))
+            if pipeline.stopped:
+                raise RuntimeError("Cancelled at shutdown")
+
+            status = JobStatus.COMPLETED
+            log.info(
+                "job_complete",
+                job_id=job.id,
+                frames_processed=job.frames_processed,
+                fps=round(job.fps, 2),
+            )
+        except Exception as e:
+            job.error = str(e)
+            log.error("job_failed", job_id=job.id, error=str(e), exc_info=True)
+        finally:
+            self._pipelines.pop(job.id, None)
+            if self.metrics_store:
+                self.metrics_store.release(job.id)
+            try:
+                self._render_heatmaps(job)
+            except Exception as e:
+                log.warning("job_heatmap_failed", job_id=job.id, error=str(e))
+            if job.remove_source:
+                job.source.unlink(missing_ok=True)
+            job.finished_at = time.time()
+            job.status = status
+            with self._lock:
+                self._prune()
@@ -1,12 +1,62 @@
+import atexit
+import logging
+import queue
 import sys
+import threading
+from typing import TextIO
 
 import structlog
 
 from sentinel.config import settings
 
 
-def configure_logging(use_rich: bool = True) -> None:
+class BackgroundWriter:
+    """File-like sink that hands log lines to a writer thread.
+
+    Lines are dropped rather than blocking the caller when the buffer is full.
+    """
+
+    def __init__(self, file: TextIO, max_pending: int = 10_000):
+        self.file = file
+        self.dropped = 0
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(
+            target=self._run, name="sentinel-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        pass
+
+    def close(self, timeout: float = 1.0) -> None:
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while (message := self._queue.get()) is not None:
+            try:
+                self.file.write(message)
+                if self._queue.empty():
+                    self.file.flush()
+            except (OSError, ValueError):
+                self.dropped += 1
+
+
+def configure_logging(
+    use_rich: bool = True, background: bool = False, level: str | None = None
+) -> None:
     """Configure structured logging."""
+    level = (level or settings.log_level).upper()
+
     processors = [
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
@@ -25,11 +75,18 @@ def configure_logging(use_rich: bool = True) -> None:
             structlog.dev.ConsoleRenderer(colors=use_rich),
         ]
 
+    if background:
+        logger_factory = structlog.WriteLoggerFactory(file=BackgroundWriter(sys.stdout))
+    else:
+        logger_factory = structlog.PrintLoggerFactory(file=sys.stdout)
+
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.getLevelNamesMapping().get(level, logging.INFO)
+        ),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(file=sys.stdout),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
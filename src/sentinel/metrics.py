@@ -0,0 +1,301 @@
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time)
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _CounterValue:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, values: tuple[str, ...]):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def labels(self, *values: str) -> _HistogramValue:
+        return self._child(values)
+
+    def observe(self, value: float) -> None:
+        self._child(()).observe(value)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for values, child in list(self._children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip([*self.buckets, math.inf], counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, values, le=_format_value(bound)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def labels(self, *values: str) -> _CounterValue:
+        return self._child(values)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._child(()).inc(amount)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for values, child in list(self._children.items()):
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}{labels} {_format_value(child.value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge set directly or read from a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation, ())
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+    def render(self) -> list[str]:
+        return [*super().render(), f"{self.name} {_format_value(self.value)}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+API_STAGE_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        "sentinel_api_stage_seconds",
+        "Time spent in each /api/detect stage",
+        ("stage",),
+    )
+)
+PIPELINE_STAGE_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        "sentinel_pipeline_stage_seconds",
+        "Time spent in each video pipeline stage per frame",
+        ("stage",),
+    )
+)
+FRAME_AGE_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        "sentinel_frame_age_seconds",
+        "Time from capturing a video frame to finishing its processing",
+    )
+)
+REQUESTS_SHED: Counter = REGISTRY.register(
+    Counter(
+        "sentinel_requests_shed_total",
+        "Detection requests rejected by admission control",
+        ("reason",),
+    )
+)
+CACHE_LOOKUPS: Counter = REGISTRY.register(
+    Counter(
+        "sentinel_cache_lookups_total",
+        "Result cache lookups by outcome",
+        ("result",),
+    )
+)
+ZONE_EVENTS: Counter = REGISTRY.register(
+    Counter(
+        "sentinel_zone_events_total",
+        "Zone enter, exit and line-cross events published",
+        ("type",),
+    )
+)
+ZONE_EVENTS_DROPPED: Counter = REGISTRY.register(
+    Counter(
+        "sentinel_zone_events_dropped_total",
+        "Zone events overwritten before a subscriber read them",
+        ("subscriber",),
+    )
+)
+CAPTURE_FRAMES_DROPPED: Counter = REGISTRY.register(
+    Counter(
+        "sentinel_capture_frames_dropped_total",
+        "Live-source frames replaced by a newer one before processing",
+        (),
+    )
+)
+METRICS_STORE_DROPPED: Counter = REGISTRY.register(
+    Counter(
+        "sentinel_metrics_store_dropped_total",
+        "Zone metric samples dropped because the store writer fell behind",
+        (),
+    )
+)
+QUEUE_DEPTH: Gauge = REGISTRY.register(
+    Gauge("sentinel_queue_depth", "Detection requests waiting for admission")
+)
+ACTIVE_REQUESTS: Gauge = REGISTRY.register(
+    Gauge("sentinel_active_requests", "Detection requests currently admitted")
+)
+LOADED_MODELS: Gauge = REGISTRY.register(
+    Gauge("sentinel_loaded_models", "Models resident in the model registry")
+)
+LOADED_MODEL_BYTES: Gauge = REGISTRY.register(
+    Gauge("sentinel_loaded_model_bytes", "Weight memory of resident models")
+)
+ACTIVE_STREAMS: Gauge = REGISTRY.register(
+    Gauge("sentinel_active_streams", "Open WebSocket detection streams")
+)
+ACTIVE_JOBS: Gauge = REGISTRY.register(
+    Gauge("sentinel_active_jobs", "Video jobs queued or running")
+)
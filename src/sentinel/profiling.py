@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import torch
+from ultralytics.engine.results import Results
+
+# Ultralytics reports these per-call timings in milliseconds, in this order.
+DETECTION_SUBSTAGES = (
+    ("preprocess", "preprocess"),
+    ("inference", "inference"),
+    ("nms", "postprocess"),
+)
+
+
+class TraceRecorder:
+    """Collects timed spans and writes them in Chrome trace-event format,
+    which opens directly in Perfetto or chrome://tracing."""
+
+    def __init__(self, max_events: int = 1_000_000):
+        self.max_events = max_events
+        self.dropped = 0
+        self._events: list[dict[str, Any]] = []
+        self._threads: dict[int, str] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _timestamp(self, seconds: float) -> float:
+        return (seconds - self._origin) * 1_000_000
+
+    def add(self, name: str, start: float, end: float, **args: Any) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": "sentinel",
+            "ph": "X",
+            "ts": self._timestamp(start),
+            "dur": (end - start) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": thread.native_id,
+            "args": args,
+        }
+
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._events.append(event)
+            self._threads.setdefault(thread.native_id, thread.name)
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), **args)
+
+    def add_detection(
+        self, results: Results, start: float, end: float, tracked: bool, **args: Any
+    ) -> None:
+        # The model call is opaque, so its sub-stages are laid out back to back
+        # from the start of the call using the durations ultralytics measured.
+        cursor = start
+        for name, key in DETECTION_SUBSTAGES:
+            duration = (results.speed.get(key) or 0.0) / 1000
+            stage_end = min(cursor + duration, end)
+            self.add(name, cursor, stage_end, **args)
+            cursor = stage_end
+
+        if tracked:
+            self.add("track", cursor, end, **args)
+
+    def to_dict(self) -> dict[str, Any]:
+        pid = os.getpid()
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            return {
+                "traceEvents": metadata + list(self._events),
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped},
+            }
+
+    def export(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+@contextmanager
+def record_torch_trace(path: Path) -> Iterator[None]:
+    activities = [torch.profiler.ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(torch.profiler.ProfilerActivity.CUDA)
+
+    with torch.profiler.profile(activities=activities) as profiler:
+        yield
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.export_chrome_trace(str(path))
@@ -0,0 +1,197 @@
+import abc
+import json
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.models import ZoneEvent, ZoneMetrics
+
+BINARY_MAGIC = b"SNTLREC1"
+# frame index, timestamp, detection count, metadata length
+BINARY_HEADER = struct.Struct("<QdII")
+# x1, y1, x2, y2, confidence, class_id, track_id (-1 when untracked)
+DETECTION_COLUMNS = 7
+
+
+@dataclass
+class FrameRecord:
+    frame_index: int
+    timestamp: float
+    detections: np.ndarray
+    metrics: list[dict]
+    events: list[dict]
+    source: str | None = None
+
+
+def detection_array(results: Results) -> np.ndarray:
+    """Boxes as one float32 array, converted in a single device transfer."""
+    boxes = results.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, DETECTION_COLUMNS), dtype=np.float32)
+
+    data = boxes.data.cpu().numpy()
+    track_ids = data[:, 4] if boxes.is_track else np.full(len(data), -1)
+    return np.column_stack([data[:, :4], data[:, -2], data[:, -1], track_ids]).astype(
+        np.float32
+    )
+
+
+def metrics_to_dicts(metrics: dict[str, ZoneMetrics] | None) -> list[dict]:
+    return [
+        {
+            "zone_id": metric.zone_id,
+            "zone_name": metric.zone_name,
+            "current_count": metric.current_count,
+            "total_entries": metric.total_entries,
+            "total_exits": metric.total_exits,
+            "avg_dwell_time": metric.avg_dwell_time,
+            "max_dwell_time": metric.max_dwell_time,
+        }
+        for metric in (metrics or {}).values()
+    ]
+
+
+class RecordWriter(abc.ABC):
+    """Writes one structured record per frame instead of an annotated image."""
+
+    binary = False
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.records = 0
+        self._file = (
+            path.open("wb") if self.binary else path.open("w", encoding="utf-8")
+        )
+
+    def write(
+        self,
+        frame_index: int,
+        timestamp: float,
+        results: Results,
+        metrics: dict[str, ZoneMetrics] | None = None,
+        events: list[ZoneEvent] | None = None,
+        source: str | None = None,
+    ) -> None:
+        self._write(
+            FrameRecord(
+                frame_index=frame_index,
+                timestamp=timestamp,
+                detections=detection_array(results),
+                metrics=metrics_to_dicts(metrics),
+                events=[event.to_dict() for event in events or []],
+                source=source,
+            ),
+            results.names,
+        )
+        self.records += 1
+
+    @abc.abstractmethod
+    def _write(self, record: FrameRecord, names: dict[int, str]) -> None:
+        """Append one record to ``self._file``."""
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonlRecordWriter(RecordWriter):
+    def _write(self, record: FrameRecord, names: dict[int, str]) -> None:
+        detections = [
+            {
+                "x1": x1,
+                "y1": y1,
+                "x2": x2,
+                "y2": y2,
+                "confidence": confidence,
+                "class_id": int(class_id),
+                "class_name": names[int(class_id)],
+                "track_id": int(track_id) if track_id >= 0 else None,
+            }
+            for x1, y1, x2, y2, confidence, class_id, track_id in (
+                record.detections.tolist()
+            )
+        ]
+        line = {
+            "frame_index": record.frame_index,
+            "timestamp": record.timestamp,
+            "source": record.source,
+            "detections": detections,
+            "metrics": record.metrics,
+            "events": record.events,
+        }
+        self._file.write(json.dumps(line) + "\n")
+
+
+class BinaryRecordWriter(RecordWriter):
+    """Fixed header plus a raw float32 detection array per frame; metrics,
+    events and the source go in a small JSON trailer. Read back with
+    ``read_binary_records``."""
+
+    binary = True
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file.write(BINARY_MAGIC)
+
+    def _write(self, record: FrameRecord, names: dict[int, str]) -> None:
+        metadata = b""
+        if record.metrics or record.events or record.source:
+            metadata = json.dumps(
+                {
+                    "source": record.source,
+                    "metrics": record.metrics,
+                    "events": record.events,
+                }
+            ).encode()
+
+        self._file.write(
+            BINARY_HEADER.pack(
+                record.frame_index,
+                record.timestamp,
+                len(record.detections),
+                len(metadata),
+            )
+        )
+        self._file.write(np.ascontiguousarray(record.detections).tobytes())
+        self._file.write(metadata)
+
+
+def read_binary_records(path: Path) -> Iterator[FrameRecord]:
+    with path.open("rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"Not a sentinel record file: {path}")
+
+        while header := f.read(BINARY_HEADER.size):
+            frame_index, timestamp, count, metadata_size = BINARY_HEADER.unpack(header)
+            detections = np.frombuffer(
+                f.read(count * DETECTION_COLUMNS * 4), dtype=np.float32
+            ).reshape(count, DETECTION_COLUMNS)
+            metadata = json.loads(f.read(metadata_size)) if metadata_size else {}
+            yield FrameRecord(
+                frame_index=frame_index,
+                timestamp=timestamp,
+                detections=detections,
+                metrics=metadata.get("metrics", []),
+                events=metadata.get("events", []),
+                source=metadata.get("source"),
+            )
+
+
+def open_record_writer(path: Path) -> RecordWriter:
+    """JSON Lines for ``.jsonl``/``.json``, the binary format for ``.bin``."""
+    suffix = path.suffix.lower()
+    if suffix in (".jsonl", ".json"):
+        return JsonlRecordWriter(path)
+    if suffix == ".bin":
+        return BinaryRecordWriter(path)
+    raise ValueError(f"Unsupported record format: {path.suffix} (use .jsonl or .bin)")
@@ -1,3 +1,9 @@
+import json
+import os
+import secrets
+import shutil
+import tempfile
+from pathlib import Path
 from typing import Annotated, Optional
 
 import typer
@@ -23,8 +29,65 @@ def main(
     workers: Annotated[
         int, typer.Option("--workers", "-w", help="Worker processes", min=1)
     ] = 1,
+    inference_replicas: Annotated[
+        Optional[int],
+        typer.Option(
+            "--inference-replicas",
+            help="Model processes shared by all workers (0 loads the model per worker)",
+            min=0,
+        ),
+    ] = None,
+    threads: Annotated[
+        Optional[int],
+        typer.Option(
+            "--threads", min=1, help="Torch threads per model process (auto if unset)"
+        ),
+    ] = None,
+    pin_cpus: Annotated[
+        bool,
+        typer.Option("--pin-cpus", help="Pin each model process to its own cores"),
+    ] = False,
 ) -> None:
     """Start the FastAPI REST API server."""
+    if inference_replicas is None:
+        inference_replicas = settings.inference_replicas
+
+    # The cores are split between the processes that run models: the replicas
+    # when there are any, otherwise every worker.
+    thread_env = {
+        "CPU_PARTITIONS": settings.cpu_partitions or inference_replicas or workers,
+        "TORCH_THREADS": threads or settings.torch_threads,
+        "CPU_AFFINITY": pin_cpus or settings.cpu_affinity,
+    }
+    for name, value in thread_env.items():
+        os.environ[name] = str(value)
+        setattr(settings, name.lower(), value)
+
+    if inference_replicas == 0:
+        run_server(host, port, reload, workers)
+        return
+
+    from sentinel.detection.remote import start_replicas, stop_replicas
+
+    socket_dir = Path(tempfile.mkdtemp(prefix="sentinel-inference-"))
+    authkey = secrets.token_hex(16)
+    processes, addresses = start_replicas(inference_replicas, socket_dir, authkey)
+
+    # Workers build their settings from the environment, so this is how they
+    # find the replicas; the in-process copy covers a single worker.
+    os.environ["INFERENCE_ADDRESSES"] = json.dumps(addresses)
+    os.environ["INFERENCE_AUTHKEY"] = authkey
+    settings.inference_addresses = addresses
+    settings.inference_authkey = authkey
+
+    try:
+        run_server(host, port, reload, workers)
+    finally:
+        stop_replicas(processes)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def run_server(host: str | None, port: int | None, reload: bool, workers: int) -> None:
     uvicorn.run(
         "sentinel.api.app:app",
         host=host or settings.api_host,
@@ -1,13 +1,44 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 import cv2
 import numpy as np
+import torch
+from ultralytics.engine.results import Results
 
+from sentinel.analytics.models import ZoneConfig
 from sentinel.analytics.service import AnalyticsService
+from sentinel.capture import LatestFrameGrabber
 from sentinel.config import settings
 from sentinel.detection.service import DetectionService
 from sentinel.detection.utils import FPSCounter
+from sentinel.metrics import FRAME_AGE_SECONDS, PIPELINE_STAGE_SECONDS
+from sentinel.profiling import TraceRecorder
+from sentinel.records import RecordWriter
 from sentinel.visualization.annotators import Annotators
+from sentinel.visualization.broadcast import FrameBroadcaster
+
+
+class MediaClock:
+    """Frame times for a recorded video: when the run started plus each
+    frame's position in the file, so analytics follow the video's own pace
+    however fast it is decoded, and look-ahead batches keep distinct times."""
+
+    def __init__(self, cap: cv2.VideoCapture, fps: float):
+        self.cap = cap
+        self.fps = fps
+        self.origin = time.time()
+
+    def frame_time(self, index: int) -> float:
+        """Time of the frame just read, the ``index``-th of the file."""
+        position = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        if position <= 0 and index > 0:
+            # Some containers report no position; fall back to the frame rate.
+            position = index / self.fps
+        return self.origin + position
 
 
 class VideoPipeline:
@@ -18,12 +49,38 @@ class VideoPipeline:
         analytics_service: AnalyticsService | None = None,
         output_path: str | None = None,
         show_display: bool = True,
+        broadcaster: FrameBroadcaster | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+        trace: TraceRecorder | None = None,
+        headless: bool = False,
+        records: RecordWriter | None = None,
+        batch_size: int | None = None,
+        latest_frame: bool | None = None,
+        stop_event: threading.Event | None = None,
     ):
+        if headless and (output_path or show_display or broadcaster):
+            raise ValueError(
+                "Headless mode cannot display, save or stream annotated frames"
+            )
+
         self.detection_service = detection_service
         self.annotators = annotators
         self.analytics_service = analytics_service
         self.output_path = output_path
         self.show_display = show_display
+        self.broadcaster = broadcaster
+        self.progress_callback = progress_callback
+        self.trace = trace
+        self.headless = headless
+        self.records = records
+        self.batch_size = batch_size or settings.video_batch_size
+        self.latest_frame = (
+            settings.video_latest_frame if latest_frame is None else latest_frame
+        )
+        self.stop_event = stop_event
+        self.stopped = False
+        self.grabber: LatestFrameGrabber | None = None
+        self.frame_index = 0
         self.fps_counter = FPSCounter()
         self.video_writer: cv2.VideoWriter | None = None
 
@@ -31,6 +88,12 @@ class VideoPipeline:
             output_dir = Path(self.output_path).parent
             output_dir.mkdir(parents=True, exist_ok=True)
 
+    def reload_zones(self, zone_configs: list[ZoneConfig]) -> None:
+        """Swap zones between frames; the detector and tracker are untouched."""
+        if self.analytics_service:
+            self.analytics_service.reload(zone_configs)
+        self.annotators.reload(zone_configs)
+
     def run(self, source: str | int | None = None) -> None:
         source = source if source is not None else settings.video_source
         cap = cv2.VideoCapture(source)
@@ -41,6 +104,8 @@ class VideoPipeline:
         fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        frames_processed = 0
 
         if self.output_path:
             fourcc = cv2.VideoWriter_fourcc(*"mp4v")
@@ -49,17 +114,40 @@ class VideoPipeline:
             )
 
         window_name = self._get_window_name()
+        # Look-ahead only pays off when nothing is waiting on the next frame;
+        # live sources go one frame at a time, and only the newest one.
+        if is_video_file(source):
+            clock = MediaClock(cap, fps)
+            detections = (
+                self._read_batches(cap, self.batch_size, clock)
+                if self.batch_size > 1
+                else self._read_frames(cap, clock)
+            )
+        elif self.latest_frame:
+            self.grabber = LatestFrameGrabber(cap).start()
+            detections = self._read_latest(self.grabber)
+        else:
+            detections = self._read_frames(cap)
 
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            for frame, captured_at, frame_time, results in detections:
+                annotated_frame = self._process_frame(frame, frame_time, results)
+                frames_processed += 1
+
+                if annotated_frame is not None:
+                    with self._stage("encode"):
+                        if self.video_writer:
+                            self.video_writer.write(annotated_frame)
+
+                        if self.broadcaster:
+                            self.broadcaster.publish(annotated_frame)
 
-                annotated_frame = self._process_frame(frame)
+                if self.progress_callback:
+                    self.progress_callback(frames_processed, total_frames)
 
-                if self.video_writer:
-                    self.video_writer.write(annotated_frame)
+                FRAME_AGE_SECONDS.observe(time.time() - captured_at)
+
+                self.frame_index += 1
 
                 if self.show_display:
                     cv2.imshow(window_name, annotated_frame)
@@ -67,29 +155,188 @@ class VideoPipeline:
                     if cv2.waitKey(1) & 0xFF == ord("q"):
                         break
 
+                if self.stop_event is not None and self.stop_event.is_set():
+                    self.stopped = True
+                    break
+
         finally:
-            cap.release()
+            if self.grabber:
+                # Releases the capture on its own thread once any read returns.
+                self.grabber.close()
+            else:
+                cap.release()
             if self.video_writer:
                 self.video_writer.release()
             if self.show_display:
                 cv2.destroyAllWindows()
 
-    def _process_frame(self, frame: np.ndarray) -> np.ndarray:
-        results = self.detection_service.process(frame)
+    def _read_frames(
+        self, cap: cv2.VideoCapture, clock: MediaClock | None = None
+    ) -> Iterator[tuple[np.ndarray, float, float, Results]]:
+        """Yields each frame with its read time (for frame age), its time for
+        analytics (the media clock for files, else the read time) and its
+        detections."""
+        while True:
+            with self._stage("capture"):
+                ret, frame = cap.read()
+            if not ret:
+                return
+            captured_at = time.time()
+            frame_time = clock.frame_time(self.frame_index) if clock else captured_at
+            yield frame, captured_at, frame_time, self._detect(frame)
+
+    def _read_latest(
+        self, grabber: LatestFrameGrabber
+    ) -> Iterator[tuple[np.ndarray, float, float, Results]]:
+        while True:
+            # Capture time here is only the wait for a frame newer than the
+            # last one; the read itself happens on the grabber thread.
+            with self._stage("capture"):
+                grabbed = grabber.read()
+            if grabbed is None:
+                return
+            frame, captured_at = grabbed
+            yield frame, captured_at, captured_at, self._detect(frame)
+
+    def _read_batches(
+        self,
+        cap: cv2.VideoCapture,
+        batch_size: int,
+        clock: MediaClock | None = None,
+    ) -> Iterator[tuple[np.ndarray, float, float, Results]]:
+        """Read ``batch_size`` frames ahead into one preallocated buffer and
+        detect them together, then hand them out in order.
+
+        Each slot is overwritten by the next read, which only happens once
+        every frame of the previous batch has been consumed.
+        """
+        buffer: np.ndarray | None = None
+        while True:
+            frames, read_times, frame_times = [], [], []
+            for slot in range(batch_size):
+                with self._stage("capture", self.frame_index + slot):
+                    if buffer is None:
+                        ret, frame = cap.read()
+                        if ret:
+                            buffer = np.empty((batch_size, *frame.shape), frame.dtype)
+                    else:
+                        # A frame of a different size comes back newly allocated.
+                        ret, frame = cap.read(buffer[slot])
+                if not ret:
+                    break
+                captured_at = time.time()
+                frames.append(frame)
+                read_times.append(captured_at)
+                frame_times.append(
+                    clock.frame_time(self.frame_index + slot) if clock else captured_at
+                )
+
+            if frames:
+                yield from zip(
+                    frames, read_times, frame_times, self._detect_batch(frames)
+                )
+            if len(frames) < batch_size:
+                return
 
+    def _process_frame(
+        self, frame: np.ndarray, timestamp: float, results: Results
+    ) -> np.ndarray | None:
         metrics = None
         if self.analytics_service:
-            metrics = self.analytics_service.update(results)
+            with self._stage("analytics"):
+                metrics = self.analytics_service.update(results, timestamp)
+
+        if self.records:
+            with self._stage("emit"):
+                self.records.write(
+                    self.frame_index,
+                    timestamp,
+                    results,
+                    metrics,
+                    self.analytics_service.last_events
+                    if self.analytics_service
+                    else None,
+                )
+
+        if self.headless:
+            return None
 
         fps = self.fps_counter.update()
 
-        annotated_frame = self.annotators.draw(frame, results, fps, metrics)
+        with self._stage("annotate"):
+            annotated_frame = self.annotators.draw(frame, results, fps, metrics)
 
         return annotated_frame
 
+    @contextmanager
+    def _stage(self, name: str, frame_index: int | None = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            PIPELINE_STAGE_SECONDS.labels(name).observe(end - start)
+            if self.trace:
+                frame_index = self.frame_index if frame_index is None else frame_index
+                self.trace.add(name, start, end, frame=frame_index)
+
+    def _detect(self, frame: np.ndarray) -> Results:
+        start = time.perf_counter()
+        if self.trace:
+            with torch.profiler.record_function("sentinel::detect"):
+                results = self.detection_service.process(frame)
+        else:
+            results = self.detection_service.process(frame)
+        end = time.perf_counter()
+
+        tracked = self.detection_service.enable_tracking
+        self._observe_detection(results, end - start)
+        if self.trace:
+            self.trace.add("detect", start, end, frame=self.frame_index)
+            self.trace.add_detection(
+                results, start, end, tracked, frame=self.frame_index
+            )
+
+        return results
+
+    def _detect_batch(self, frames: list[np.ndarray]) -> list[Results]:
+        start = time.perf_counter()
+        if self.trace:
+            with torch.profiler.record_function("sentinel::detect_batch"):
+                results = self.detection_service.process_batch(frames)
+        else:
+            results = self.detection_service.process_batch(frames)
+        end = time.perf_counter()
+
+        # Stage histograms are per frame, so the batch's time is shared out.
+        for result in results:
+            self._observe_detection(result, (end - start) / len(frames))
+        if self.trace:
+            self.trace.add(
+                "detect", start, end, frame=self.frame_index, batch=len(frames)
+            )
+
+        return results
+
+    def _observe_detection(self, results: Results, elapsed: float) -> None:
+        # Ultralytics runs the tracker inside the predict call, after its own
+        # timed stages, so tracking time is whatever the speed breakdown misses.
+        if not self.detection_service.enable_tracking:
+            PIPELINE_STAGE_SECONDS.labels("detect").observe(elapsed)
+            return
+
+        speed = sum(value or 0.0 for value in results.speed.values()) / 1000
+        detect_time = min(speed, elapsed)
+        PIPELINE_STAGE_SECONDS.labels("detect").observe(detect_time)
+        PIPELINE_STAGE_SECONDS.labels("track").observe(elapsed - detect_time)
+
     def _get_window_name(self) -> str:
         if self.analytics_service:
             return "Video Analytics"
         if self.detection_service.enable_tracking:
             return "Object Tracking"
         return "Object Detection"
+
+
+def is_video_file(source: str | int) -> bool:
+    return isinstance(source, str) and Path(source).is_file()
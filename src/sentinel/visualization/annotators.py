@@ -1,3 +1,5 @@
+import threading
+
 import cv2
 import numpy as np
 import supervision as sv
@@ -5,6 +7,8 @@ from ultralytics.engine.results import Results
 
 from sentinel.analytics.models import ZoneConfig, ZoneMetrics, ZoneType
 
+ZoneAnnotator = sv.PolygonZoneAnnotator | sv.LineZoneAnnotator
+
 
 class Annotators:
     def __init__(
@@ -14,18 +18,25 @@ class Annotators:
     ):
         self.enable_tracking = enable_tracking
         self.zone_configs = zone_configs or []
-        self.zone_annotators: dict[
-            str, sv.PolygonZoneAnnotator | sv.LineZoneAnnotator
-        ] = {}
-
-        self._initialize_zone_annotators()
-
-    def _initialize_zone_annotators(self) -> None:
-        for config in self.zone_configs:
+        self.zone_annotators = self._build_zone_annotators(self.zone_configs)
+        self._pending: tuple[list[ZoneConfig], dict[str, ZoneAnnotator]] | None = None
+        self._lock = threading.Lock()
+
+    def reload(self, zone_configs: list[ZoneConfig]) -> None:
+        """Swap in new zones before the next frame is drawn."""
+        annotators = self._build_zone_annotators(zone_configs)
+        with self._lock:
+            self._pending = (zone_configs, annotators)
+
+    def _build_zone_annotators(
+        self, zone_configs: list[ZoneConfig]
+    ) -> dict[str, ZoneAnnotator]:
+        annotators = {}
+        for config in zone_configs:
             zone = config.to_supervision_zone()
 
             if config.type == ZoneType.POLYGON:
-                self.zone_annotators[config.id] = sv.PolygonZoneAnnotator(
+                annotators[config.id] = sv.PolygonZoneAnnotator(
                     zone=zone,
                     color=sv.Color.from_hex("#00FF00"),
                     thickness=2,
@@ -34,13 +45,14 @@ class Annotators:
                     text_padding=10,
                 )
             elif config.type == ZoneType.LINE:
-                self.zone_annotators[config.id] = sv.LineZoneAnnotator(
+                annotators[config.id] = sv.LineZoneAnnotator(
                     thickness=2,
                     color=sv.Color.from_hex("#00FF00"),
                     text_thickness=1,
                     text_scale=0.5,
                     text_padding=10,
                 )
+        return annotators
 
     def draw(
         self,
@@ -49,6 +61,11 @@ class Annotators:
         fps: float | None = None,
         metrics: dict[str, ZoneMetrics] | None = None,
     ) -> np.ndarray:
+        if self._pending is not None:
+            with self._lock:
+                pending, self._pending = self._pending, None
+            self.zone_configs, self.zone_annotators = pending
+
         annotated_frame = results.plot()
 
         if metrics:
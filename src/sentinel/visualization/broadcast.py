@@ -0,0 +1,172 @@
+import threading
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+from sentinel.analytics.heatmap import OccupancyHeatmap
+from sentinel.detection.utils import parse_classes, resolve_classes
+from sentinel.metrics import REGISTRY
+
+BOUNDARY = "frame"
+
+
+class FrameBroadcaster:
+    """Encodes each published frame once and hands the latest JPEG to every viewer.
+
+    Viewers never queue frames: a viewer that is still sending the previous
+    frame simply picks up whatever is newest when it is ready again.
+    """
+
+    def __init__(self, quality: int = 80):
+        self.quality = quality
+        self._condition = threading.Condition()
+        self._jpeg: bytes | None = None
+        self._sequence = 0
+        self._viewers = 0
+        self._closed = False
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    def publish(self, frame: np.ndarray) -> None:
+        if self._viewers == 0:
+            return
+
+        ok, buffer = cv2.imencode(
+            ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        )
+        if not ok:
+            return
+
+        with self._condition:
+            self._jpeg = buffer.tobytes()
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def frames(self, timeout: float = 1.0) -> Iterator[bytes]:
+        with self._condition:
+            self._viewers += 1
+            last_sequence = self._sequence
+
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._sequence != last_sequence or self._closed,
+                        timeout,
+                    )
+                    if self._closed:
+                        return
+                    if self._sequence == last_sequence:
+                        continue
+                    last_sequence, jpeg = self._sequence, self._jpeg
+
+                yield jpeg
+        finally:
+            with self._condition:
+                self._viewers -= 1
+
+
+def multipart_chunk(jpeg: bytes) -> bytes:
+    header = (
+        f"--{BOUNDARY}\r\n"
+        f"Content-Type: image/jpeg\r\n"
+        f"Content-Length: {len(jpeg)}\r\n\r\n"
+    )
+    return header.encode() + jpeg + b"\r\n"
+
+
+def render_heatmap(heatmap: OccupancyHeatmap, query: str) -> bytes:
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    window = params.get("window")
+    return heatmap.to_png(
+        params.get("kind", "occupancy"),
+        float(window) if window else None,
+        resolve_classes(parse_classes(params.get("classes")), heatmap.names),
+    )
+
+
+class MJPEGServer:
+    def __init__(
+        self,
+        broadcaster: FrameBroadcaster,
+        host: str,
+        port: int,
+        heatmap: Callable[[], OccupancyHeatmap | None] | None = None,
+    ):
+        self.broadcaster = broadcaster
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, body: bytes, content_type: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                if url.path == "/metrics":
+                    self._send(
+                        REGISTRY.render().encode(),
+                        "text/plain; version=0.0.4; charset=utf-8",
+                    )
+                    return
+
+                if url.path == "/heatmap.png":
+                    current = heatmap() if heatmap else None
+                    if current is None:
+                        self.send_error(404, "No heatmap yet")
+                        return
+                    try:
+                        body = render_heatmap(current, url.query)
+                    except ValueError as e:
+                        self.send_error(400, str(e))
+                        return
+                    self._send(body, "image/png")
+                    return
+
+                if url.path not in ("/", "/stream.mjpg"):
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+                )
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                try:
+                    for jpeg in broadcaster.frames():
+                        self.wfile.write(multipart_chunk(jpeg))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def close(self) -> None:
+        self.broadcaster.close()
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,382 @@
+import json
+
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.events import EventBus, FileSink
+from sentinel.analytics.heatmap import OccupancyHeatmap
+from sentinel.analytics.models import (
+    ZoneConfig,
+    ZoneEvent,
+    ZoneEventType,
+    ZoneMetrics,
+    ZoneType,
+)
+from sentinel.analytics.service import AnalyticsService
+from sentinel.analytics.store import ZoneMetricsStore, zone_directory
+from sentinel.analytics.utils import (
+    load_zones_from_json,
+    save_zones_to_json,
+    zone_classes,
+)
+from sentinel.analytics.watcher import ZoneFileWatcher
+
+
+def make_zone(zone_id, classes=None):
+    return ZoneConfig(
+        id=zone_id,
+        name=zone_id,
+        type=ZoneType.POLYGON,
+        polygon=[[0, 0], [100, 0], [100, 100], [0, 100]],
+        classes=classes,
+    )
+
+
+def test_zones_only_count_their_classes():
+    service = AnalyticsService([make_zone("people", ["person"]), make_zone("all")])
+    results = Results(
+        np.zeros((100, 100, 3), dtype=np.uint8),
+        path="",
+        names={0: "person", 2: "car"},
+        boxes=torch.tensor(
+            [[10, 10, 40, 40, 1, 0.9, 0], [50, 50, 80, 80, 2, 0.9, 2]],
+            dtype=torch.float32,
+        ),
+    )
+
+    metrics = service.update(results)
+
+    assert metrics["people"].active_track_ids == {1}
+    assert metrics["all"].active_track_ids == {1, 2}
+
+
+def test_zone_classes_round_trip_and_union(tmp_path):
+    zones = [make_zone("a", ["person"]), make_zone("b", ["car", "person"])]
+    path = tmp_path / "zones.json"
+    save_zones_to_json(zones, path)
+
+    loaded = load_zones_from_json(path)
+
+    assert [zone.classes for zone in loaded] == [["person"], ["car", "person"]]
+    assert zone_classes(loaded) == ["car", "person"]
+    assert zone_classes([*loaded, make_zone("c")]) is None
+    assert zone_classes([]) is None
+
+
+def test_heatmap_accumulates_anchors_and_decays_per_window():
+    heatmap = OccupancyHeatmap(100, 100, cell_size=10, windows=[600, 10])
+    box = np.array([[20.0, 10.0, 40.0, 55.0]])
+
+    for second in range(4):
+        heatmap.update(box, np.array([0]), timestamp=float(second))
+
+    occupancy = heatmap.snapshot(window=600)
+    assert occupancy.shape == (10, 10)
+    assert np.flatnonzero(occupancy).tolist() == [53]
+    assert occupancy[5, 3] == pytest.approx(3.0, rel=0.01)
+
+    for second in range(4, 1000, 5):
+        heatmap.update(np.empty((0, 4)), np.empty(0), timestamp=float(second))
+
+    assert heatmap.snapshot(window=10).max() < 1e-6
+    assert heatmap.snapshot(window=600)[5, 3] == pytest.approx(
+        3 * np.exp(-995 / 600), rel=0.01
+    )
+    assert heatmap.memory_bytes == 10 * 10 * 2 * 4
+    with pytest.raises(ValueError, match="Unknown heatmap window"):
+        heatmap.snapshot(window=30)
+
+
+def test_heatmap_traces_track_paths_per_class():
+    heatmap = OccupancyHeatmap(100, 100, cell_size=10, windows=[60])
+    ids = np.array([7, 8])
+    classes = np.array([0, 2])
+
+    heatmap.update(
+        np.array([[0.0, 0, 10, 15], [0, 80, 10, 95]]), classes, ids, timestamp=0.0
+    )
+    heatmap.update(
+        np.array([[60.0, 0, 70, 15], [0, 80, 10, 95]]), classes, ids, timestamp=0.1
+    )
+
+    people = heatmap.snapshot("trajectory", class_ids=[0])
+    assert np.flatnonzero(people[1]).tolist() == [1, 2, 3, 4, 5, 6]
+    assert people.sum() == pytest.approx(6.0)
+    assert heatmap.snapshot("trajectory", class_ids=[2]).sum() == pytest.approx(1.0)
+
+
+def test_analytics_service_builds_heatmap_from_results():
+    service = AnalyticsService([], enable_heatmap=True)
+    results = Results(
+        np.zeros((64, 96, 3), dtype=np.uint8),
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor([[10, 10, 40, 40, 0.9, 0]], dtype=torch.float32),
+    )
+
+    service.update(results, timestamp=0.0)
+    service.update(results, timestamp=0.5)
+
+    assert service.heatmap.shape == (4, 6)
+    assert service.heatmap.snapshot().sum() > 0
+    assert service.heatmap.render().shape == (64, 96, 3)
+    assert AnalyticsService([], enable_heatmap=False).heatmap is None
+
+    # The background is a copy, so a reused frame buffer cannot change it.
+    results.orig_img[:] = 255
+    assert service.heatmap.background.max() == 0
+
+
+def tracked_results(rows):
+    return Results(
+        np.zeros((200, 200, 3), dtype=np.uint8),
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor(rows, dtype=torch.float32).reshape(-1, 7),
+    )
+
+
+def test_zone_transitions_are_published_as_events():
+    line = ZoneConfig(
+        id="line", name="line", type=ZoneType.LINE, line=([50, 0], [50, 200])
+    )
+    service = AnalyticsService(
+        [make_zone("room"), line], enable_heatmap=False, source="cam1"
+    )
+    subscription = service.events.subscribe("test")
+
+    service.update(tracked_results([[10, 10, 30, 40, 1, 0.9, 0]]))
+    service.update(tracked_results([[60, 10, 80, 40, 1, 0.9, 0]]))
+    service.update(tracked_results([[60, 110, 80, 140, 1, 0.9, 0]]))
+    service.update(tracked_results([]))
+
+    events = subscription.poll()
+    assert [(event.type, event.zone_id) for event in events] == [
+        (ZoneEventType.ENTER, "room"),
+        (ZoneEventType.LINE_IN, "line"),
+        (ZoneEventType.EXIT, "room"),
+    ]
+    assert [event.sequence for event in events] == [0, 1, 2]
+    assert events[2].dwell_time is not None
+    assert {event.source for event in events} == {"cam1"}
+    assert service.metrics["room"].current_count == 0
+
+
+def test_events_and_dwell_use_the_capture_timestamp():
+    service = AnalyticsService([make_zone("room")], enable_heatmap=False)
+
+    service.update(tracked_results([[10, 10, 30, 40, 1, 0.9, 0]]), timestamp=100.0)
+    service.update(tracked_results([[10, 10, 30, 40, 1, 0.9, 0]]), timestamp=102.5)
+    service.update(tracked_results([]), timestamp=104.0)
+
+    enter, exit_ = service.events.subscribe("test", from_start=True).poll()
+    assert enter.timestamp == 100.0
+    assert exit_.timestamp == 104.0
+    assert exit_.dwell_time == 2.5
+
+
+def test_event_bus_drops_for_slow_subscribers_only():
+    bus = EventBus(capacity=4)
+    slow = bus.subscribe("slow")
+    fast = bus.subscribe("fast")
+
+    received = []
+    for i in range(10):
+        bus.publish([ZoneEvent(ZoneEventType.ENTER, "zone", i, float(i))])
+        received += fast.poll()
+
+    events = slow.poll(limit=2)
+
+    assert [event.track_id for event in received] == list(range(10))
+    assert fast.dropped == 0
+    assert [event.track_id for event in events] == [6, 7]
+    assert slow.dropped == 6
+    assert slow.lag == 2
+
+
+def test_file_sink_writes_json_lines(tmp_path):
+    bus = EventBus()
+    path = tmp_path / "events.jsonl"
+    sink = FileSink(bus, path).start()
+
+    bus.publish([ZoneEvent(ZoneEventType.LINE_OUT, "gate", 3, 1.5, class_id=0)])
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [
+        {
+            "type": "line_out",
+            "zone_id": "gate",
+            "track_id": 3,
+            "timestamp": 1.5,
+            "class_id": 0,
+            "dwell_time": None,
+            "source": None,
+            "sequence": 0,
+        }
+    ]
+
+
+def test_reload_swaps_zones_between_frames_and_keeps_surviving_state():
+    line = ZoneConfig(
+        id="line", name="line", type=ZoneType.LINE, line=([50, 0], [50, 200])
+    )
+    service = AnalyticsService(
+        [make_zone("room"), make_zone("gone"), line], enable_heatmap=False
+    )
+    subscription = service.events.subscribe("test")
+    service.update(tracked_results([[10, 10, 30, 40, 1, 0.9, 0]]))
+    service.update(tracked_results([[60, 10, 80, 40, 1, 0.9, 0]]))
+    entered_at = service.dwell_tracker.objects[1].entry_times["room"]
+    line_zone = service.zones["line"]
+
+    renamed = make_zone("room")
+    renamed.name = "Lobby"
+    service.reload([renamed, make_zone("new"), line])
+    assert "gone" in service.metrics
+
+    metrics = service.update(tracked_results([[60, 10, 80, 40, 1, 0.9, 0]]))
+
+    assert list(metrics) == ["room", "new", "line"]
+    assert metrics["room"].zone_name == "Lobby"
+    assert metrics["line"].total_entries == 1
+    assert service.zones["line"] is line_zone
+    assert service.dwell_tracker.objects[1].entry_times["room"] == entered_at
+    assert "gone" not in service.dwell_tracker.objects[1].current_zones
+    assert [(event.type, event.zone_id) for event in subscription.poll()] == [
+        (ZoneEventType.ENTER, "room"),
+        (ZoneEventType.ENTER, "gone"),
+        (ZoneEventType.LINE_IN, "line"),
+        (ZoneEventType.ENTER, "new"),
+    ]
+
+
+def test_reload_rejects_unknown_classes_once_names_are_known():
+    service = AnalyticsService([make_zone("room")], enable_heatmap=False)
+    service.update(tracked_results([[10, 10, 30, 40, 1, 0.9, 0]]))
+
+    with pytest.raises(ValueError, match="Unknown class"):
+        service.reload([make_zone("room", ["bicycle"])])
+
+
+def test_zone_file_watcher_reloads_changes_and_skips_broken_files(tmp_path):
+    path = tmp_path / "zones.json"
+    save_zones_to_json([make_zone("a")], path)
+    reloads = []
+    watcher = ZoneFileWatcher(path, reloads.append)
+
+    assert not watcher.check()
+
+    save_zones_to_json([make_zone("a"), make_zone("b")], path)
+    assert watcher.check()
+
+    path.write_text("{not json")
+    assert not watcher.check()
+
+    assert [[zone.id for zone in zones] for zones in reloads] == [["a", "b"]]
+
+
+def zone_event(event_type, timestamp, dwell_time=None):
+    return ZoneEvent(event_type, "door", 1, timestamp, dwell_time=dwell_time)
+
+
+def test_metrics_store_rolls_up_counts_events_and_dwell(tmp_path):
+    store = ZoneMetricsStore(tmp_path, resolutions=[60, 3600]).start()
+    for second, count in [(0, 1), (30, 3), (90, 2), (3700, 5)]:
+        store.record(float(second), {"door": ZoneMetrics("door", "Door", count)})
+    store.record(
+        10.0,
+        {},
+        [
+            zone_event(ZoneEventType.ENTER, 10.0),
+            zone_event(ZoneEventType.EXIT, 70.0, dwell_time=60.0),
+            zone_event(ZoneEventType.LINE_IN, 80.0),
+        ],
+    )
+    store.flush()
+
+    minutes = store.query("door", 0, 120, step=60)
+    hours = store.query("door", 0, 7200, step=3600)
+    store.close()
+
+    assert minutes.samples.tolist() == [2, 1]
+    assert minutes.avg_count.tolist() == [2.0, 2.0]
+    assert minutes.max_count.tolist() == [3, 2]
+    assert minutes.entries.tolist() == [1, 1]
+    assert minutes.exits.tolist() == [0, 1]
+    assert np.isnan(minutes.avg_dwell_time[0])
+    assert minutes.max_dwell_time[1] == 60.0
+    assert hours.samples.tolist() == [3, 1]
+    assert hours.max_count.tolist() == [3, 5]
+    assert hours.to_dicts()[0]["avg_dwell_time"] == 60.0
+    assert hours.to_dicts()[1]["avg_dwell_time"] is None
+
+
+def test_metrics_store_merges_writers_and_validates_queries(tmp_path):
+    for writer, count in [("a", 1), ("b", 4)]:
+        store = ZoneMetricsStore(tmp_path, resolutions=[60], writer=writer).start()
+        store.record(5.0, {"door": ZoneMetrics("door", "Door", count)})
+        store.close()
+
+    store = ZoneMetricsStore(tmp_path, resolutions=[60], writer="a")
+    series = store.query("door", 0, 60)
+
+    assert series.samples.tolist() == [2]
+    assert series.max_count.tolist() == [4]
+    assert store.has_zone("door") and not store.has_zone("hall")
+    with pytest.raises(ValueError, match="multiple"):
+        store.query("door", 0, 60, step=90)
+    with pytest.raises(ValueError, match="larger step"):
+        store.query("door", 0, 60 * 20_000, step=60)
+    with pytest.raises(ValueError):
+        ZoneMetricsStore(tmp_path, resolutions=[60, 90])
+    assert "/" not in zone_directory("../etc")
+
+
+def test_metrics_store_keeps_sources_apart(tmp_path):
+    store = ZoneMetricsStore(tmp_path, resolutions=[60]).start()
+    store.record(5.0, {"door": ZoneMetrics("door", "Door", 1)}, source="cam-a")
+    store.record(5.0, {"door": ZoneMetrics("door", "Door", 4)}, source="cam/b")
+    store.close()
+
+    assert store.query("door", 0, 60, source="cam-a").max_count.tolist() == [1]
+    assert store.query("door", 0, 60, source="cam/b").max_count.tolist() == [4]
+    assert store.query("door", 0, 60).samples.tolist() == [2]
+    assert store.has_zone("door", "cam-a") and not store.has_zone("door", "cam-c")
+
+
+def test_metrics_store_bounds_open_segments(tmp_path):
+    store = ZoneMetricsStore(tmp_path, resolutions=[60], max_open_segments=2).start()
+    for source in ["a", "b", "c"]:
+        store.record(5.0, {"door": ZoneMetrics("door", "Door", 1)}, source=source)
+    store.flush()
+    open_sources = {key[0] for key in store._segments}
+    store.release("c")
+    store.flush()
+    released = {key[0] for key in store._segments}
+    store.close()
+
+    assert open_sources == {"b", "c"}
+    assert released == {"b"}
+    assert store.query("door", 0, 60).samples.tolist() == [3]
+
+
+def test_metrics_store_caps_rows_read(tmp_path):
+    store = ZoneMetricsStore(tmp_path, resolutions=[60, 3600])
+
+    # Each point is a single hourly bucket, but 1_000_020s only divides into
+    # minutes: this would read ~1.7e8 one-minute rows.
+    with pytest.raises(ValueError, match="coarser"):
+        store.query("door", 0, 1e10, step=1_000_020)
+    assert store.query("door", 0, 1e9, step=3_600_000).samples.shape == (278,)
+
+
+def test_metrics_store_drops_instead_of_blocking(tmp_path):
+    store = ZoneMetricsStore(tmp_path, queue_size=1)
+
+    store.record(0.0, {})
+    store.record(1.0, {})
+
+    assert store.dropped == 1
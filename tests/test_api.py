@@ -1,8 +1,45 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import Mock
+
+import cv2
+import numpy as np
 import pytest
+import torch
+from fastapi import FastAPI, File, UploadFile
 from fastapi.testclient import TestClient
-from unittest.mock import Mock
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.events import EventBus
+from sentinel.analytics.models import ZoneEvent, ZoneEventType, ZoneMetrics
+from sentinel.analytics.service import AnalyticsService
+from sentinel.analytics.store import ZoneMetricsStore
+from sentinel.api.admission import AdmissionController, OverloadedError
+from sentinel.api.app import MULTIPART_OVERHEAD, app, create_app
+from sentinel.api.cache import ResultCache
+from sentinel.api.middleware import BodySizeLimitMiddleware
+from sentinel.api.stream import LatestFrameSlot, StreamSession
+from sentinel.api.utils import (
+    decode_image_bytes,
+    jpeg_size,
+    results_to_detections,
+    select_detection_service,
+    sniff_image_type,
+)
+from sentinel.config import settings
+from sentinel.detection.registry import ModelRegistry
+from sentinel.detection.service import DetectionService
+
 
-from sentinel.api.app import app
+def make_detector(name, device):
+    detector = Mock()
+    detector.model_name = name
+    detector.device = device
+    detector.memory_bytes.return_value = 512
+    return detector
 
 
 @pytest.fixture
@@ -10,6 +47,18 @@ def client():
     test_client = TestClient(app)
     app.state.device = "cpu"
     app.state.detection_service = Mock()
+    app.state.result_cache = None
+    app.state.event_bus = EventBus()
+    app.state.metrics_store = None
+    app.state.admission = AdmissionController(
+        max_concurrency=1, max_queue=1, timeout=1.0
+    )
+    app.state.model_registry = ModelRegistry(
+        device="cpu",
+        memory_budget_bytes=1024,
+        pinned_models=["yolo11m.pt"],
+        loader=make_detector,
+    )
     return test_client
 
 
@@ -20,3 +69,527 @@ def test_health_endpoint(client):
     assert data["status"] == "healthy"
     assert data["model_loaded"] is True
     assert data["device"] == "cpu"
+
+
+def test_health_reports_loaded_models(client):
+    app.state.model_registry.get("yolo11m.pt")
+
+    data = client.get("/api/health").json()
+
+    assert [model["name"] for model in data["loaded_models"]] == ["yolo11m.pt"]
+
+
+@pytest.fixture
+def jpeg_bytes():
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+def make_results(boxes):
+    return Results(
+        np.zeros((480, 640, 3), dtype=np.uint8),
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor(boxes, dtype=torch.float32),
+    )
+
+
+def test_stream_endpoint_tracks_detections(client, jpeg_bytes):
+    app.state.detection_service.process.side_effect = lambda frame: make_results(
+        [[10, 10, 100, 100, 0.9, 0]]
+    )
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.send_bytes(jpeg_bytes)
+        data = websocket.receive_json()
+
+    assert data["frame_index"] == 0
+    assert data["image_width"] == 640
+    assert data["image_height"] == 480
+    assert len(data["detections"]) == 1
+    assert data["detections"][0]["class_name"] == "person"
+    assert data["detections"][0]["track_id"] == 1
+
+
+def test_stream_frames_go_through_admission(client, jpeg_bytes):
+    app.state.admission.active = 1
+    app.state.admission.waiting = 1
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.send_bytes(jpeg_bytes)
+        data = websocket.receive_json()
+
+    assert data == {"error": "Server is overloaded, retry later", "retry_after": 1}
+    assert app.state.admission.shed_queue_full == 1
+    app.state.detection_service.process.assert_not_called()
+
+
+def test_stream_endpoint_rejects_invalid_frame(client):
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.send_bytes(b"not an image")
+        data = websocket.receive_json()
+
+    assert "error" in data
+
+
+def test_latest_frame_slot_drops_stale_frames():
+    async def run():
+        slot = LatestFrameSlot()
+        slot.put(b"first")
+        slot.put(b"second")
+        frame = await slot.get()
+        slot.close()
+        return frame, slot.dropped, await slot.get()
+
+    frame, dropped, after_close = asyncio.run(run())
+
+    assert frame == b"second"
+    assert dropped == 1
+    assert after_close is None
+
+
+def test_create_job_requires_a_source(client):
+    app.state.job_service = Mock(zone_configs=[])
+
+    response = client.post("/api/jobs", data={"track": "true"})
+
+    assert response.status_code == 400
+
+
+def test_get_unknown_job_returns_404(client):
+    app.state.job_service = Mock()
+    app.state.job_service.get.return_value = None
+
+    response = client.get("/api/jobs/unknown")
+
+    assert response.status_code == 404
+
+
+def test_job_heatmap_renders_png(client):
+    analytics = AnalyticsService([], enable_heatmap=True)
+    results = Results(
+        np.zeros((48, 64, 3), dtype=np.uint8),
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor([[5, 5, 20, 20, 0.9, 0]], dtype=torch.float32),
+    )
+    analytics.update(results, timestamp=0.0)
+    analytics.update(results, timestamp=1.0)
+    app.state.job_service = Mock()
+    app.state.job_service.get.return_value = Mock(analytics=analytics, heatmaps={})
+
+    response = client.get("/api/jobs/abc/heatmap", params={"classes": "person"})
+    bad_class = client.get("/api/jobs/abc/heatmap", params={"classes": "car"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    image = cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (48, 64, 3)
+    assert bad_class.status_code == 400
+
+
+def test_events_websocket_streams_published_events(client):
+    bus = app.state.event_bus
+    bus.publish([ZoneEvent(ZoneEventType.ENTER, "door", 1, 0.0)])
+
+    with client.websocket_connect("/api/events?from_start=true") as websocket:
+        first = websocket.receive_json()
+        bus.publish([ZoneEvent(ZoneEventType.EXIT, "door", 1, 2.0, dwell_time=2.0)])
+        second = websocket.receive_json()
+
+    assert first["events"][0]["type"] == "enter"
+    assert second["events"][0]["type"] == "exit"
+    assert second["events"][0]["sequence"] == 1
+    assert second["dropped"] == 0
+
+
+def test_detect_rejects_unknown_model(client, jpeg_bytes):
+    app.state.detection_service.detector.model_name = "yolo11m.pt"
+
+    response = client.post(
+        "/api/detect",
+        files={"file": ("image.jpg", jpeg_bytes, "image/jpeg")},
+        data={"model": "unknown.pt"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_detect_sheds_load_when_queue_is_full(client, jpeg_bytes):
+    app.state.admission.active = 1
+    app.state.admission.waiting = 1
+
+    response = client.post(
+        "/api/detect", files={"file": ("image.jpg", jpeg_bytes, "image/jpeg")}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert app.state.admission.shed_queue_full == 1
+
+    health = client.get("/api/health")
+    assert health.status_code == 503
+    assert health.json()["status"] == "saturated"
+
+
+def test_admission_without_queue_admits_while_slots_are_free():
+    async def run():
+        admission = AdmissionController(max_concurrency=2, max_queue=0, timeout=1.0)
+        assert not admission.saturated
+        async with admission.admit():
+            assert not admission.saturated
+            async with admission.admit():
+                assert admission.saturated
+                with pytest.raises(OverloadedError) as exc_info:
+                    async with admission.admit():
+                        pass
+        return admission, exc_info.value
+
+    admission, error = asyncio.run(run())
+
+    assert error.reason == "queue_full"
+    assert admission.admitted == 2
+    assert admission.shed_queue_full == 1
+
+
+def test_admission_sheds_requests_that_cannot_meet_deadline():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=4, timeout=0.05)
+        async with admission.admit():
+            with pytest.raises(OverloadedError) as exc_info:
+                async with admission.admit():
+                    pass
+        return admission, exc_info.value
+
+    admission, error = asyncio.run(run())
+
+    assert error.reason == "deadline"
+    assert admission.shed_deadline == 1
+    assert admission.admitted == 1
+    assert admission.active == 0
+    assert admission.waiting == 0
+
+
+def test_admission_admits_on_an_idle_server_after_a_slow_request():
+    async def run():
+        admission = AdmissionController(max_concurrency=4, max_queue=32, timeout=1.0)
+        admission._record(1.5)
+        async with admission.admit():
+            pass
+        return admission
+
+    admission = asyncio.run(run())
+
+    assert admission.admitted == 1
+    assert admission.shed_deadline == 0
+
+
+def test_select_detection_service_keeps_an_explicit_zero_threshold():
+    detector = make_detector("yolo11n.pt", "cpu")
+    detector.names = {0: "person"}
+    service = DetectionService(detector=detector, conf_threshold=0.5, classes=[0])
+
+    selected = asyncio.run(
+        select_detection_service(None, service, Mock(), conf_threshold=0.0)
+    )
+
+    assert selected is not service
+    assert selected.conf_threshold == 0.0
+    assert selected.classes == [0]
+
+
+def test_detect_serves_repeated_images_from_cache(client, jpeg_bytes):
+    service = app.state.detection_service
+    service.detector.model_name = "yolo11m.pt"
+    service.detector.device = "cpu"
+    service.conf_threshold = 0.5
+    service.iou_threshold = 0.45
+    service.process.side_effect = lambda frame: make_results(
+        [[10, 10, 100, 100, 0.9, 0]]
+    )
+    app.state.result_cache = ResultCache(max_entries=8, ttl=60)
+
+    files = {"file": ("image.jpg", jpeg_bytes, "image/jpeg")}
+    first = client.post("/api/detect", files=files)
+    second = client.post("/api/detect", files=files)
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["detections"] == first.json()["detections"]
+    assert service.process.call_count == 1
+    assert client.get("/api/health").json()["cache"]["hits"] == 1
+
+
+def test_result_cache_evicts_and_expires(tmp_path):
+    cache = ResultCache(max_entries=1, ttl=60)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+
+    assert cache.get("a") is None
+    assert cache.get("b") == {"value": 2}
+
+    cache.ttl = -1
+    cache.put("c", {"value": 3})
+    assert cache.get("c") is None
+
+
+def test_result_cache_disk_tier_survives_memory_eviction(tmp_path):
+    cache = ResultCache(max_entries=1, ttl=60, disk_dir=tmp_path)
+    key = cache.key(b"image", "yolo11m.pt", 0.5)
+    cache.put(key, {"value": 1})
+    cache.put(cache.key(b"other"), {"value": 2})
+
+    assert cache.get(key) == {"value": 1}
+    assert cache.key(b"image", "yolo11m.pt", 0.6) != key
+
+
+def test_result_cache_trims_least_recently_used_disk_entries(tmp_path):
+    cache = ResultCache(max_entries=1, ttl=60, disk_dir=tmp_path, disk_max_entries=3)
+    for index in range(3):
+        cache.put(f"key{index}", {"value": index})
+        os.utime(cache._disk_path(f"key{index}"), (index, index))
+    cache.get("key0")
+
+    cache.put("key3", {"value": 3})
+
+    remaining = sorted(path.stem for path in tmp_path.glob("*/*.json"))
+    assert remaining == ["key0", "key3"]
+
+
+def test_body_size_limit_rejects_oversized_uploads_before_the_route():
+    limited = FastAPI()
+    limited.add_middleware(
+        BodySizeLimitMiddleware, max_body_size=1024, paths=("/api/detect",)
+    )
+    uploads = []
+
+    @limited.post("/api/detect")
+    async def detect(file: UploadFile = File(...)):
+        uploads.append(await file.read())
+
+    limited_client = TestClient(limited)
+
+    declared = limited_client.post("/api/detect", files={"file": b"x" * 2048})
+
+    def chunks():
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a"\r\n\r\n'
+        yield b"x" * 2048
+        yield b"\r\n--b--\r\n"
+
+    streamed = limited_client.post(
+        "/api/detect",
+        content=chunks(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    accepted = limited_client.post("/api/detect", files={"file": b"x" * 512})
+
+    assert declared.status_code == 413
+    assert streamed.status_code == 413
+    assert accepted.status_code == 200
+    assert uploads == [b"x" * 512]
+
+
+def test_job_uploads_are_size_limited_before_the_route():
+    limits = {
+        middleware.kwargs["paths"]: middleware.kwargs["max_body_size"]
+        for middleware in create_app().user_middleware
+        if middleware.cls is BodySizeLimitMiddleware
+    }
+
+    assert limits[("/api/jobs",)] == settings.jobs_max_upload_size + MULTIPART_OVERHEAD
+
+
+def test_decode_uses_reduced_resolution_for_large_jpegs():
+    image = np.zeros((1000, 2000, 3), dtype=np.uint8)
+    contents = cv2.imencode(".jpg", image)[1].tobytes()
+
+    decoded = decode_image_bytes(contents, target_size=640)
+
+    assert jpeg_size(contents) == (2000, 1000)
+    assert decoded.image.shape[:2] == (500, 1000)
+    assert (decoded.width, decoded.height) == (2000, 1000)
+    assert decoded.scale_x == 2.0
+
+
+def test_decode_keeps_full_resolution_for_small_images(jpeg_bytes):
+    decoded = decode_image_bytes(jpeg_bytes, target_size=640)
+
+    assert decoded.image.shape[:2] == (480, 640)
+    assert decoded.scale_x == 1.0
+
+
+def test_sniff_image_type():
+    png = cv2.imencode(".png", np.zeros((4, 4, 3), dtype=np.uint8))[1].tobytes()
+
+    assert sniff_image_type(png[:12]) == "png"
+    assert sniff_image_type(b"GIF89a" + b"\0" * 6) is None
+
+
+def test_results_to_detections_scales_boxes():
+    results = make_results([[10, 20, 30, 40, 0.9, 0]])
+
+    detection = results_to_detections(results, scale_x=2.0, scale_y=4.0)[0]
+
+    assert (detection["x1"], detection["y1"]) == (20.0, 80.0)
+    assert (detection["x2"], detection["y2"]) == (60.0, 160.0)
+
+
+def test_responses_carry_unique_request_ids(client):
+    first = client.get("/api/health")
+    second = client.get("/api/health")
+
+    assert first.headers["X-Request-ID"]
+    assert first.headers["X-Request-ID"] != second.headers["X-Request-ID"]
+
+
+def test_metrics_exposes_detect_stage_latencies(client, jpeg_bytes):
+    service = app.state.detection_service
+    service.detector.model_name = "yolo11m.pt"
+    service.detector.device = "cpu"
+    service.process.side_effect = lambda frame: make_results(
+        [[10, 10, 100, 100, 0.9, 0]]
+    )
+
+    files = {"file": ("image.jpg", jpeg_bytes, "image/jpeg")}
+    assert client.post("/api/detect", files=files).status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("upload", "queue", "decode", "inference", "postprocess", "serialize"):
+        assert f'sentinel_api_stage_seconds_count{{stage="{stage}"}}' in response.text
+    assert "sentinel_active_streams 0.0" in response.text
+
+
+def test_health_reports_warming_up_until_ready(client):
+    app.state.ready = False
+    try:
+        response = client.get("/api/health")
+    finally:
+        app.state.ready = True
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+    assert response.json()["ready"] is False
+
+
+def test_detect_filters_classes_per_request(client, jpeg_bytes):
+    service = app.state.detection_service
+    service.detector.model_name = "yolo11m.pt"
+    service.detector.device = "cpu"
+    service.detector.names = {0: "person", 2: "car"}
+    service.detector.predict.side_effect = lambda frame, **kwargs: make_results(
+        [[10, 10, 100, 100, 0.9, 0]]
+    )
+    files = {"file": ("image.jpg", jpeg_bytes, "image/jpeg")}
+
+    response = client.post("/api/detect", files=files, data={"classes": "car,person"})
+    unknown = client.post("/api/detect", files=files, data={"classes": "zebra"})
+
+    assert response.status_code == 200
+    assert service.detector.predict.call_args.kwargs["classes"] == [0, 2]
+    assert unknown.status_code == 400
+
+
+def test_zone_metrics_history_is_served_from_the_store(client, tmp_path):
+    store = ZoneMetricsStore(tmp_path / "metrics", resolutions=[60, 3600]).start()
+    for second in range(0, 7200, 30):
+        store.record(
+            float(second), {"door": ZoneMetrics("door", "Door", 2)}, source="cam-a"
+        )
+    store.flush()
+    app.state.metrics_store = store
+    app.state.zone_configs = []
+
+    response = client.get(
+        "/api/zones/door/metrics", params={"from": 0, "to": 7200, "step": 3600}
+    )
+    unknown = client.get("/api/zones/hall/metrics", params={"from": 0, "to": 60})
+    bad_step = client.get(
+        "/api/zones/door/metrics", params={"from": 0, "to": 60, "step": 90}
+    )
+    too_many_rows = client.get(
+        "/api/zones/door/metrics", params={"from": 0, "to": 1e10, "step": 1_000_020}
+    )
+    other_source = client.get(
+        "/api/zones/door/metrics", params={"from": 0, "to": 60, "source": "cam-b"}
+    )
+    store.close()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["step"] == 3600
+    assert data["source"] is None
+    assert [point["samples"] for point in data["points"]] == [120, 120]
+    assert data["points"][0]["avg_count"] == 2.0
+    assert data["points"][0]["avg_dwell_time"] is None
+    assert unknown.status_code == 404
+    assert bad_step.status_code == 400
+    assert too_many_rows.status_code == 400
+    assert other_source.status_code == 404
+
+
+def test_importing_app_does_not_start_the_log_writer():
+    code = (
+        "import sys, threading, sentinel.api.app; "
+        "print(','.join(t.name for t in threading.enumerate())); "
+        "print('sentinel.detection.remote' in sys.modules)"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+    completed = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    threads, remote_imported = completed.stdout.splitlines()
+    assert "sentinel-log-writer" not in threads
+    assert remote_imported == "False"
+
+
+def test_zone_reload_is_all_or_nothing_and_reaches_streams(
+    client, tmp_path, monkeypatch
+):
+    def write_zones(classes):
+        zones = {
+            "zones": [
+                {
+                    "id": "door",
+                    "name": "Door",
+                    "type": "polygon",
+                    "polygon": [[0, 0], [10, 0], [10, 10]],
+                    "classes": classes,
+                }
+            ]
+        }
+        path.write_text(json.dumps(zones))
+
+    path = tmp_path / "zones.json"
+    monkeypatch.setattr(settings, "enable_analytics", True)
+    monkeypatch.setattr(settings, "zones_config_path", path)
+    detector = make_detector("yolo11m.pt", "cpu")
+    detector.names = {0: "person", 2: "car"}
+    app.state.detection_service = DetectionService(detector)
+    app.state.zone_configs = []
+    app.state.job_service = Mock()
+    app.state.job_service.analytics_detectors.return_value = []
+    session = StreamSession(app.state.detection_service, [], follow_zone_classes=True)
+    app.state.stream_sessions = {session}
+
+    write_zones(["bicycle"])
+    rejected = client.post("/api/zones/reload")
+
+    assert rejected.status_code == 400
+    assert app.state.zone_configs == []
+    app.state.job_service.reload_zones.assert_not_called()
+    assert session.analytics_service is None
+
+    write_zones(["car"])
+    accepted = client.post("/api/zones/reload")
+
+    assert accepted.status_code == 200
+    assert [zone.id for zone in app.state.zone_configs] == ["door"]
+    assert session.analytics_service is not None
+    assert session.detection_service.classes == [2]
+    assert app.state.detection_service.classes is None
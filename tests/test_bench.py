@@ -0,0 +1,118 @@
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from sentinel.analytics.utils import load_zones_from_json, save_zones_to_json
+from sentinel.bench.models import ScenarioResult
+from sentinel.bench.service import (
+    BenchmarkRunner,
+    best_thread_plan,
+    parse_import_time,
+    thread_counts,
+)
+from sentinel.bench.synthetic import (
+    MotionPattern,
+    SyntheticScene,
+    SyntheticWorkload,
+    ZoneLayout,
+    zone_layout,
+)
+from sentinel.bench.utils import percentile
+
+
+def test_percentile_interpolates_between_samples():
+    values = [4.0, 1.0, 3.0, 2.0]
+
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 99) == 0.0
+
+
+def test_scenario_result_reports_throughput_per_item():
+    result = ScenarioResult("batch", [100.0, 100.0], items_per_iteration=8)
+
+    assert result.throughput == 80.0
+    assert result.to_dict()["p50_ms"] == 100.0
+
+
+def test_runner_benchmarks_analytics_and_annotation_without_inference():
+    runner = BenchmarkRunner(Mock(), iterations=3, warmup=1, zone_count=4)
+
+    results = runner.run(["analytics", "annotate"])
+
+    assert [result.name for result in results] == [
+        "analytics_4z_50t",
+        "annotate_1920x1080",
+    ]
+    assert all(result.iterations == 3 for result in results)
+
+
+def test_thread_sweep_picks_best_machine_throughput(monkeypatch):
+    monkeypatch.setattr("sentinel.bench.service.available_cpus", lambda: [0, 1, 2])
+    runner = BenchmarkRunner(Mock(), iterations=2, warmup=0)
+
+    results = runner.run(["threads"])
+
+    assert thread_counts(6) == [1, 2, 4, 6]
+    assert [result.name for result in results] == [
+        "threads_1",
+        "threads_2",
+        "threads_3",
+    ]
+    assert results[0].params["partitions"] == 3
+    assert best_thread_plan(results) in results
+    assert best_thread_plan([]) is None
+
+
+def test_runner_rejects_unknown_scenario():
+    with pytest.raises(ValueError):
+        BenchmarkRunner(Mock()).run(["nope"])
+
+
+def test_synthetic_workload_is_deterministic():
+    scene = SyntheticScene(objects=20, enter_rate=2.0, exit_rate=0.1, seed=7)
+
+    first = list(SyntheticWorkload(scene).detections(10))
+    second = list(SyntheticWorkload(scene).detections(10))
+
+    assert all(np.array_equal(a.xyxy, b.xyxy) for a, b in zip(first, second))
+    assert len(first[0]) == 20
+    assert {len(d) for d in first} != {20}
+
+
+def test_synthetic_results_carry_track_ids():
+    scene = SyntheticScene(objects=5, motion=MotionPattern.STATIC)
+
+    results = list(SyntheticWorkload(scene).results(2))
+
+    assert results[0].boxes.is_track
+    assert results[0].boxes.id.tolist() == [1, 2, 3, 4, 5]
+    assert results[0].boxes.xyxy.tolist() == results[1].boxes.xyxy.tolist()
+
+
+def test_zone_layout_round_trips_through_json(tmp_path):
+    zones = zone_layout(6, 1920, 1080, ZoneLayout.RANDOM) + zone_layout(
+        2, 1920, 1080, ZoneLayout.LINES
+    )
+    path = tmp_path / "zones.json"
+
+    save_zones_to_json(zones, path)
+
+    loaded = load_zones_from_json(path)
+    assert [(z.id, z.type, z.polygon) for z in loaded] == [
+        (z.id, z.type, z.polygon) for z in zones
+    ]
+    assert loaded[-1].line == list(zones[-1].line)
+
+
+def test_parse_import_time_reads_cumulative_microseconds():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        450 |   sentinel.config\n"
+        "import time:      6855 |     265355 | sentinel.cli\n"
+    )
+
+    assert parse_import_time(output, "sentinel.cli") == 265.355
+    with pytest.raises(ValueError):
+        parse_import_time(output, "torch")
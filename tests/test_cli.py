@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from sentinel.cli import app
+
+
+def test_importing_cli_does_not_load_heavy_dependencies():
+    code = (
+        "import sys, sentinel.cli; "
+        "print(','.join(m for m in ('torch', 'ultralytics', 'cv2', 'supervision') "
+        "if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+    completed = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == ""
+
+
+def test_argument_errors_exit_before_loading_models(monkeypatch):
+    # configure_logging would bind structlog to the runner's captured stdout.
+    monkeypatch.setattr("sentinel.cli.configure_logging", lambda **kwargs: None)
+
+    result = CliRunner().invoke(app, ["video", "--analytics"])
+
+    assert result.exit_code == 1
+    assert "Analytics requires --track" in result.output
@@ -0,0 +1,31 @@
+from sentinel.config import Settings
+from sentinel.cpu import plan_threads
+
+
+def test_plan_threads_splits_cores_between_partitions():
+    cpus = list(range(8))
+
+    whole = plan_threads(cpus=cpus)
+    second = plan_threads(partitions=4, index=1, pin=True, cpus=cpus)
+
+    assert (whole.intra_op, whole.inter_op, whole.opencv) == (8, 1, 8)
+    assert whole.cpus is None
+    assert (second.intra_op, second.opencv) == (2, 2)
+    assert second.cpus == (2, 3)
+
+
+def test_plan_threads_honours_explicit_counts_and_caps_partitions():
+    plan = plan_threads(partitions=16, index=5, intra_op=3, opencv=1, cpus=[0, 1])
+
+    assert (plan.intra_op, plan.opencv) == (3, 1)
+    assert plan_threads(partitions=16, index=3, pin=True, cpus=[0, 1]).cpus == (1,)
+
+
+def test_thread_settings_parse_from_environment(monkeypatch):
+    monkeypatch.setenv("CPU_AFFINITY", "True")
+    monkeypatch.setenv("CPU_PARTITIONS", "4")
+
+    settings = Settings(_env_file=None)
+
+    assert settings.cpu_affinity is True
+    assert settings.cpu_partitions == 4
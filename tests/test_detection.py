@@ -1,9 +1,22 @@
-from unittest.mock import Mock, MagicMock
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, Mock
+
 import numpy as np
 import pytest
+import torch
+from ultralytics.engine.results import Results
 
-from sentinel.detection.service import DetectionService
 from sentinel.detection.models import YOLODetector
+from sentinel.detection.service import DetectionService
+from sentinel.detection.tracking import NativeTracker
+from sentinel.detection.utils import (
+    export_model,
+    parse_classes,
+    resolve_classes,
+    resolve_model_path,
+)
 
 
 @pytest.fixture
@@ -47,3 +60,193 @@ def test_detection_service_with_tracking(mock_detector):
 
     assert result == mock_result
     mock_detector.track.assert_called_once()
+
+
+def test_resolve_model_path_downloads_bare_names_into_cache(tmp_path):
+    cache_dir = tmp_path / "models"
+
+    assert resolve_model_path("yolo11n.pt", cache_dir) == str(cache_dir / "yolo11n.pt")
+    assert resolve_model_path("weights/custom.pt", cache_dir) == "weights/custom.pt"
+    assert resolve_model_path("yolo11n.yaml", cache_dir) == "yolo11n.yaml"
+    assert resolve_model_path("yolo11n.pt", None) == "yolo11n.pt"
+
+
+def test_export_model_reuses_cached_artifact(tmp_path, monkeypatch):
+    artifact = tmp_path / "yolo11n_320.torchscript"
+    artifact.write_bytes(b"")
+    monkeypatch.setattr(
+        "sentinel.detection.utils.YOLO", Mock(side_effect=AssertionError)
+    )
+
+    path = export_model(str(tmp_path / "yolo11n.pt"), "torchscript", 320, tmp_path)
+
+    assert path == str(artifact)
+
+
+def test_export_model_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_model("yolo11n.pt", "pickle", 640, tmp_path)
+
+
+def boxes_at(*offsets, size=40):
+    return np.array([[x, 10, x + size, 10 + size] for x in offsets], dtype=float)
+
+
+def test_native_tracker_keeps_ids_for_moving_objects():
+    tracker = NativeTracker(max_age=5, min_hits=2, iou_threshold=0.3)
+    scores, classes = np.array([0.9, 0.8]), np.array([0.0, 2.0])
+
+    frames = [
+        tracker.step(boxes_at(10 + 4 * i, 200 - 4 * i), scores, classes)
+        for i in range(6)
+    ]
+
+    assert frames[0][:, 4].tolist() == [1, 2]
+    assert all(frame[:, 4].tolist() == [1, 2] for frame in frames)
+    assert frames[-1][:, 6].tolist() == [0.0, 2.0]
+    assert frames[-1][:, 7].tolist() == [0, 1]
+
+
+def test_native_tracker_bridges_low_confidence_frames_and_expires():
+    tracker = NativeTracker(max_age=2, min_hits=1, iou_threshold=0.3)
+    tracker.high_threshold = 0.5
+    classes = np.zeros(1)
+
+    tracker.step(boxes_at(10), np.array([0.9]), classes)
+    low = tracker.step(boxes_at(12), np.array([0.2]), classes)
+    assert low[:, 4].tolist() == [1]
+
+    # A low-confidence box never starts a track on its own.
+    assert len(tracker.step(boxes_at(300), np.array([0.2]), classes)) == 0
+
+    for _ in range(3):
+        tracker.step(np.empty((0, 4)), np.empty(0), np.empty(0))
+    assert tracker.step(boxes_at(12), np.array([0.9]), classes)[:, 4].tolist() == [2]
+
+
+def test_native_tracker_accepts_zero_thresholds():
+    tracker = NativeTracker(iou_threshold=0.0, high_threshold=0.0)
+
+    assert (tracker.iou_threshold, tracker.high_threshold) == (0.0, 0.0)
+
+
+def test_native_tracker_updates_results():
+    results = Results(
+        np.zeros((64, 64, 3), dtype=np.uint8),
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor([[5, 5, 20, 20, 0.9, 0]], dtype=torch.float32),
+    )
+
+    tracked = NativeTracker(min_hits=1).update(results)
+
+    assert tracked.boxes.id.tolist() == [1]
+    assert tracked.boxes.xyxy[0].tolist() == pytest.approx([5, 5, 20, 20])
+
+
+def test_resolve_classes_accepts_names_and_ids():
+    names = {0: "person", 2: "car", 7: "truck"}
+
+    assert resolve_classes(["Car", "0", 7, "car"], names) == [0, 2, 7]
+    assert resolve_classes(None, names) is None
+    assert parse_classes(" person, car ,") == ["person", "car"]
+    with pytest.raises(ValueError):
+        resolve_classes(["zebra"], names)
+    with pytest.raises(ValueError):
+        resolve_classes(["5"], names)
+
+
+def test_detection_service_passes_classes_to_detector(mock_detector):
+    mock_detector.names = {0: "person", 2: "car"}
+    service = DetectionService(detector=mock_detector, classes=["car", "person"])
+
+    service.process(np.zeros((64, 64, 3), dtype=np.uint8))
+
+    assert mock_detector.predict.call_args.kwargs["classes"] == [0, 2]
+
+
+def test_track_batch_matches_per_frame_tracking():
+    def moving_box(frame, **kwargs):
+        offset = float(frame[0, 0, 0])
+        return Results(
+            frame,
+            path="",
+            names={0: "person"},
+            boxes=torch.tensor(
+                [[offset, 5, offset + 20, 25, 0.9, 0]], dtype=torch.float32
+            ),
+        )
+
+    def make_detector():
+        detector = object.__new__(YOLODetector)
+        detector.tracker_type = "native"
+        detector._tracker = None
+        detector._lock = threading.RLock()
+        detector.predict = moving_box
+        detector.predict_batch = lambda frames, **kwargs: [
+            moving_box(frame) for frame in frames
+        ]
+        return detector
+
+    frames = [np.full((64, 64, 3), i * 2, dtype=np.uint8) for i in range(7)]
+    single, batched = make_detector(), make_detector()
+
+    expected = [single.track(frame).boxes.id for frame in frames]
+    tracked = batched.track_batch(frames[:4]) + batched.track_batch(frames[4:])
+
+    assert len(tracked) == len(frames)
+    for result, ids in zip(tracked, expected):
+        assert result.boxes.id.tolist() == ids.tolist()
+    assert tracked[-1].boxes.id.tolist() == [1]
+
+
+def test_concurrent_predictions_keep_their_own_classes():
+    class SharedPredictorModel:
+        """Like ultralytics, stores each call's arguments on the shared
+        predictor before running it."""
+
+        def __init__(self):
+            self.classes = None
+
+        def predict(self, frame, classes=None, **kwargs):
+            self.classes = classes
+            time.sleep(0.05)
+            return [list(self.classes)]
+
+    detector = object.__new__(YOLODetector)
+    detector.model = SharedPredictorModel()
+    detector.input_size = 64
+    detector.device = "cpu"
+    detector._lock = threading.RLock()
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        people = pool.submit(detector.predict, frame, classes=[0])
+        cars = pool.submit(detector.predict, frame, classes=[2])
+
+    assert people.result() == [0]
+    assert cars.result() == [2]
+
+
+def test_warmup_runs_before_requests_that_arrive_during_it():
+    calls = []
+    started = threading.Event()
+
+    def predict(frame, classes=None, **kwargs):
+        started.set()
+        calls.append(classes)
+        time.sleep(0.02)
+        return [None]
+
+    detector = object.__new__(YOLODetector)
+    detector.model = Mock(predict=predict)
+    detector.input_size = 64
+    detector.device = "cpu"
+    detector._lock = threading.RLock()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pool.submit(detector.warmup, 3)
+        started.wait()
+        pool.submit(detector.predict, np.zeros((64, 64, 3)), classes=[2])
+
+    assert calls == [None, None, None, [2]]
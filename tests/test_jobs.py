@@ -0,0 +1,140 @@
+import time
+from unittest.mock import Mock
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.detection.models import YOLODetector
+from sentinel.jobs.models import JobStatus
+from sentinel.jobs.service import JobQueueFullError, JobService
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / "input.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def detector():
+    detector = Mock(spec=YOLODetector)
+    detector.predict.side_effect = lambda frame, **kwargs: Results(
+        frame,
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor([[5, 5, 20, 20, 0.9, 0]], dtype=torch.float32),
+    )
+    return detector
+
+
+def wait_for(job, timeout=10):
+    deadline = time.time() + timeout
+    while job.is_active and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_job_runs_video_pipeline(tmp_path, video_path, detector):
+    service = JobService(detector, tmp_path / "jobs", max_workers=1)
+
+    job = service.submit(video_path)
+    wait_for(job)
+    service.shutdown()
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.frames_processed == 5
+    assert job.total_frames == 5
+    assert job.fps > 0
+    assert job.output_path.exists()
+    assert job.analytics is None
+    assert job.heatmap_path("occupancy").exists()
+    with pytest.raises(ValueError, match="window"):
+        job.heatmap_path("occupancy", 7)
+
+
+def test_tracked_jobs_share_the_detector(tmp_path, video_path, detector):
+    service = JobService(detector, tmp_path / "jobs", max_workers=2)
+
+    jobs = [service.submit(video_path, enable_tracking=True) for _ in range(2)]
+    for job in jobs:
+        wait_for(job)
+    service.shutdown()
+
+    assert [job.status for job in jobs] == [JobStatus.COMPLETED] * 2
+    assert detector.predict.call_count == 10
+    detector.track.assert_not_called()
+
+
+def test_finished_jobs_are_evicted_with_their_files(tmp_path, video_path, detector):
+    service = JobService(detector, tmp_path / "jobs", max_workers=1, max_retained=1)
+
+    first = service.submit(video_path)
+    wait_for(first)
+    second = service.submit(video_path)
+    wait_for(second)
+    deadline = time.time() + 10
+    while service.get(first.id) and time.time() < deadline:
+        time.sleep(0.05)
+    service.shutdown()
+
+    assert service.get(first.id) is None
+    assert not first.output_path.exists()
+    assert not any(path.exists() for path in first.heatmaps.values())
+    assert service.get(second.id) is second
+    assert second.output_path.exists()
+
+
+def test_job_failure_is_recorded(tmp_path, detector):
+    service = JobService(detector, tmp_path / "jobs", max_workers=1)
+
+    job = service.submit(tmp_path / "missing.mp4")
+    wait_for(job)
+    service.shutdown()
+
+    assert job.status == JobStatus.FAILED
+    assert "Failed to open video source" in job.error
+
+
+def test_shutdown_stops_running_jobs(tmp_path, video_path, detector):
+    predict = detector.predict.side_effect
+
+    def slow_predict(frame, **kwargs):
+        time.sleep(0.2)
+        return predict(frame, **kwargs)
+
+    detector.predict.side_effect = slow_predict
+    service = JobService(detector, tmp_path / "jobs", max_workers=1)
+
+    job = service.submit(video_path)
+    deadline = time.time() + 10
+    while job.frames_processed == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    service.shutdown()
+    wait_for(job)
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Cancelled at shutdown"
+    assert job.frames_processed < 5
+
+
+def test_job_queue_is_bounded(tmp_path, video_path):
+    def blocking_predict(frame, **kwargs):
+        time.sleep(0.5)
+        raise RuntimeError("stop")
+
+    detector = Mock(spec=YOLODetector)
+    detector.predict.side_effect = blocking_predict
+    service = JobService(detector, tmp_path / "jobs", max_workers=1, max_pending=1)
+    service.submit(video_path)
+    service.submit(video_path)
+
+    with pytest.raises(JobQueueFullError):
+        service.submit(video_path)
+
+    service.shutdown()
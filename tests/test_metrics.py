@@ -0,0 +1,39 @@
+from sentinel.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+    )
+
+    histogram.labels("decode").observe(0.05)
+    histogram.labels("decode").observe(0.5)
+    histogram.labels("decode").observe(5.0)
+
+    text = registry.render()
+
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="decode",le="1.0"} 2' in text
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="decode"} 5.55' in text
+    assert 'stage_seconds_count{stage="decode"} 3' in text
+
+
+def test_counter_and_gauge_render_current_values():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("shed_total", "Shed", ("reason",)))
+    gauge = registry.register(Gauge("queue_depth", "Queue"))
+    callback = registry.register(Gauge("loaded_models", "Models"))
+
+    counter.labels('say "hi"').inc()
+    gauge.inc(3)
+    gauge.dec()
+    callback.set_function(lambda: 7)
+
+    text = registry.render()
+
+    assert 'shed_total{reason="say \\"hi\\""} 1.0' in text
+    assert "queue_depth 2.0" in text
+    assert "loaded_models 7.0" in text
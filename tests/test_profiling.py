@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.profiling import TraceRecorder
+
+
+def test_trace_recorder_exports_chrome_trace_events(tmp_path):
+    trace = TraceRecorder()
+    with trace.span("capture", frame=0):
+        pass
+
+    path = tmp_path / "trace.json"
+    trace.export(path)
+    events = json.loads(path.read_text())["traceEvents"]
+
+    assert events[0]["ph"] == "M"
+    assert events[1]["name"] == "capture"
+    assert events[1]["ph"] == "X"
+    assert events[1]["args"] == {"frame": 0}
+    assert events[1]["dur"] >= 0
+
+
+def test_detection_substages_are_laid_out_within_the_model_call():
+    results = Results(
+        np.zeros((4, 4, 3), dtype=np.uint8),
+        path="",
+        names={0: "person"},
+        boxes=torch.zeros((0, 6)),
+    )
+    results.speed = {"preprocess": 1.0, "inference": 5.0, "postprocess": 2.0}
+    trace = TraceRecorder()
+
+    trace.add_detection(results, start=1.0, end=1.010, tracked=True)
+
+    events = {e["name"]: e for e in trace.to_dict()["traceEvents"] if e["ph"] == "X"}
+    assert list(events) == ["preprocess", "inference", "nms", "track"]
+    assert round(events["inference"]["dur"]) == 5000
+    assert round(events["track"]["dur"]) == 2000
+    assert events["nms"]["ts"] == pytest.approx(
+        events["inference"]["ts"] + events["inference"]["dur"]
+    )
+
+
+def test_trace_recorder_drops_events_over_limit():
+    trace = TraceRecorder(max_events=1)
+    trace.add("a", 0.0, 1.0)
+    trace.add("b", 0.0, 1.0)
+
+    assert trace.dropped == 1
@@ -0,0 +1,109 @@
+import json
+from unittest.mock import Mock
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.models import ZoneConfig, ZoneType
+from sentinel.analytics.service import AnalyticsService
+from sentinel.detection.models import YOLODetector
+from sentinel.detection.service import DetectionService
+from sentinel.records import (
+    BinaryRecordWriter,
+    JsonlRecordWriter,
+    open_record_writer,
+    read_binary_records,
+)
+from sentinel.video_pipeline import VideoPipeline
+
+
+def make_results(boxes):
+    return Results(
+        np.zeros((48, 64, 3), dtype=np.uint8),
+        path="",
+        names={0: "person", 1: "car"},
+        boxes=torch.tensor(boxes, dtype=torch.float32),
+    )
+
+
+def test_jsonl_writer_emits_one_line_per_frame(tmp_path):
+    path = tmp_path / "records.jsonl"
+    with JsonlRecordWriter(path) as writer:
+        writer.write(0, 1.5, make_results([[1, 2, 3, 4, 0.9, 1]]), source="a.jpg")
+        writer.write(1, 2.0, make_results([[1, 2, 3, 4, 7, 0.8, 0]]))
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[0]["source"] == "a.jpg"
+    assert lines[0]["detections"][0]["class_name"] == "car"
+    assert lines[0]["detections"][0]["track_id"] is None
+    assert lines[1]["detections"][0]["track_id"] == 7
+    assert lines[1]["detections"][0]["confidence"] == pytest.approx(0.8)
+
+
+def test_binary_records_round_trip(tmp_path):
+    path = tmp_path / "records.bin"
+    with BinaryRecordWriter(path) as writer:
+        writer.write(3, 4.25, make_results([[1, 2, 3, 4, 7, 0.8, 0]]))
+        writer.write(4, 4.5, make_results(np.zeros((0, 6))), source="cam")
+
+    records = list(read_binary_records(path))
+
+    assert [record.frame_index for record in records] == [3, 4]
+    assert records[0].timestamp == 4.25
+    np.testing.assert_allclose(records[0].detections, [[1, 2, 3, 4, 0.8, 0, 7]])
+    assert records[1].detections.shape == (0, 7)
+    assert records[1].source == "cam"
+
+
+def test_open_record_writer_rejects_unknown_suffix(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported record format"):
+        open_record_writer(tmp_path / "records.csv")
+
+
+def test_headless_pipeline_writes_records_without_drawing(tmp_path):
+    video_path = tmp_path / "input.mp4"
+    writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48)
+    )
+    for _ in range(3):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    detector = Mock(spec=YOLODetector)
+    detector.predict.side_effect = lambda frame, **kwargs: make_results(
+        [[5, 5, 20, 20, 0.9, 0]]
+    )
+    zone = ZoneConfig(
+        id="z", name="Z", type=ZoneType.POLYGON, polygon=[[0, 0], [64, 0], [64, 48]]
+    )
+    annotators = Mock()
+    path = tmp_path / "records.jsonl"
+
+    with JsonlRecordWriter(path) as records:
+        VideoPipeline(
+            DetectionService(detector),
+            annotators,
+            analytics_service=AnalyticsService([zone]),
+            show_display=False,
+            headless=True,
+            records=records,
+        ).run(str(video_path))
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["frame_index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["metrics"][0]["zone_id"] == "z"
+    annotators.draw.assert_not_called()
+
+
+def test_headless_pipeline_rejects_output(tmp_path):
+    with pytest.raises(ValueError, match="Headless"):
+        VideoPipeline(
+            Mock(),
+            Mock(),
+            output_path=str(tmp_path / "out.mp4"),
+            show_display=False,
+            headless=True,
+        )
@@ -0,0 +1,58 @@
+from unittest.mock import Mock
+
+import pytest
+
+from sentinel.detection.registry import ModelRegistry, UnknownModelError
+
+
+def make_detector(name, device):
+    detector = Mock()
+    detector.model_name = name
+    detector.memory_bytes.return_value = 100
+    return detector
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry(
+        device="cpu",
+        memory_budget_bytes=250,
+        allowed_models=["a.pt", "b.pt", "c.pt"],
+        pinned_models=["default.pt"],
+        loader=make_detector,
+    )
+
+
+def test_registry_loads_lazily_and_caches(registry):
+    assert registry.loaded() == []
+
+    first = registry.get("a.pt")
+    second = registry.get("a.pt")
+
+    assert first is second
+    assert [model.name for model in registry.loaded()] == ["a.pt"]
+
+
+def test_registry_evicts_least_recently_used(registry):
+    registry.get("a.pt")
+    registry.get("b.pt")
+    registry.get("a.pt")
+    registry.get("c.pt")
+
+    assert [model.name for model in registry.loaded()] == ["a.pt", "c.pt"]
+    assert registry.memory_bytes == 200
+
+
+def test_registry_never_evicts_pinned_models(registry):
+    registry.get("default.pt")
+    registry.get("a.pt")
+    registry.get("b.pt")
+
+    names = [model.name for model in registry.loaded()]
+    assert "default.pt" in names
+    assert "a.pt" not in names
+
+
+def test_registry_rejects_unknown_models(registry):
+    with pytest.raises(UnknownModelError):
+        registry.get("other.pt")
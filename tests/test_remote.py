@@ -0,0 +1,87 @@
+import threading
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.detection.registry import ModelRegistry
+from sentinel.detection.remote import (
+    InferenceServer,
+    RemoteDetector,
+    RemoteInferenceError,
+)
+
+
+def make_detector(name, device):
+    def predict(frame, **kwargs):
+        # Encode the frame contents in the box so the test can check that the
+        # replica saw the pixels written to shared memory.
+        value = float(frame[0, 0, 0])
+        return Results(
+            frame,
+            path="",
+            names={0: "person"},
+            boxes=torch.tensor([[value, 0, 10, 10, 0.9, 0]], dtype=torch.float32),
+        )
+
+    detector = Mock()
+    detector.model_name = name
+    detector.device = device
+    detector.input_size = 32
+    detector.model.names = {0: "person"}
+    detector.memory_bytes.return_value = 100
+    detector.predict.side_effect = predict
+    detector.predict_batch.side_effect = lambda frames, **kwargs: [
+        predict(frame) for frame in frames
+    ]
+    return detector
+
+
+@pytest.fixture
+def address(tmp_path):
+    registry = ModelRegistry(
+        device="cpu",
+        memory_budget_bytes=1024,
+        pinned_models=["default.pt"],
+        loader=make_detector,
+    )
+    server = InferenceServer(str(tmp_path / "replica.sock"), "secret", registry)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.address
+    server.close()
+
+
+def test_remote_detector_predicts_through_shared_memory(address):
+    detector = RemoteDetector("default.pt", [address], "secret")
+    frames = [np.full((48, 64, 3), i * 10, dtype=np.uint8) for i in range(3)]
+
+    single = detector.predict(frames[1], conf=0.25)
+    batch = detector.predict_batch(frames)
+    larger = detector.predict(np.full((480, 640, 3), 7, dtype=np.uint8))
+    detector.close()
+
+    assert detector.device == "cpu"
+    assert detector.memory_bytes() == 0
+    assert single.boxes.xyxy[0, 0].item() == 10
+    assert single.orig_img is frames[1]
+    assert [result.boxes.xyxy[0, 0].item() for result in batch] == [0, 10, 20]
+    assert larger.boxes.xyxy[0, 0].item() == 7
+    assert single.names == {0: "person"}
+
+
+def test_remote_detector_tracks_locally(address):
+    detector = RemoteDetector("default.pt", [address], "secret")
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    results = detector.track(frame)
+    detector.close()
+
+    assert results.boxes.id.tolist() == [1]
+
+
+def test_remote_detector_surfaces_replica_errors(address):
+    with pytest.raises(RemoteInferenceError, match="UnknownModelError"):
+        RemoteDetector("missing.pt", [address], "secret")
@@ -0,0 +1,177 @@
+import json
+import time
+from unittest.mock import Mock
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Results
+
+from sentinel.capture import LatestFrameGrabber
+from sentinel.detection.models import YOLODetector
+from sentinel.detection.service import DetectionService
+from sentinel.records import JsonlRecordWriter
+from sentinel.video_pipeline import VideoPipeline, is_video_file
+
+
+class FakeCamera:
+    """Delivers ``count`` frames ``interval`` seconds apart, then ends."""
+
+    def __init__(self, count, interval=0.001):
+        self.count = count
+        self.interval = interval
+        self.delivered = 0
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        return 0
+
+    def read(self):
+        if self.delivered == self.count:
+            return False, None
+        time.sleep(self.interval)
+        self.delivered += 1
+        return True, np.full((48, 64, 3), self.delivered, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / "input.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def brightness_box(frame, **kwargs):
+    # Encodes the frame's brightness in the box so the output order is visible.
+    level = float(frame.mean())
+    return Results(
+        frame,
+        path="",
+        names={0: "person"},
+        boxes=torch.tensor([[level, 0, level + 10, 10, 0.9, 0]], dtype=torch.float32),
+    )
+
+
+def test_file_sources_are_detected_in_look_ahead_batches(tmp_path, video_path):
+    detector = Mock(spec=YOLODetector)
+    detector.predict.side_effect = brightness_box
+    detector.predict_batch.side_effect = lambda frames, **kwargs: [
+        brightness_box(frame) for frame in frames
+    ]
+    path = tmp_path / "records.jsonl"
+
+    with JsonlRecordWriter(path) as records:
+        VideoPipeline(
+            DetectionService(detector),
+            Mock(),
+            show_display=False,
+            headless=True,
+            records=records,
+            batch_size=2,
+        ).run(str(video_path))
+
+    batches = [len(call.args[0]) for call in detector.predict_batch.call_args_list]
+    assert batches == [2, 2, 1]
+    detector.predict.assert_not_called()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    levels = [line["detections"][0]["x1"] for line in lines]
+    assert [line["frame_index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert levels == sorted(levels)
+    assert levels[-1] - levels[0] > 100
+
+
+def test_only_video_files_are_batched(video_path):
+    assert is_video_file(str(video_path))
+    assert not is_video_file(0)
+    assert not is_video_file("rtsp://camera.local/stream")
+
+
+def test_grabber_keeps_only_the_newest_frame():
+    grabber = LatestFrameGrabber(FakeCamera(5)).start()
+    grabber._thread.join()
+
+    frame, captured_at = grabber.read()
+
+    assert frame[0, 0, 0] == 5
+    assert captured_at <= time.time()
+    assert grabber.dropped == 4
+    assert grabber.read() is None
+
+
+def test_live_sources_skip_stale_frames(tmp_path, monkeypatch):
+    camera = FakeCamera(20)
+    monkeypatch.setattr("sentinel.video_pipeline.cv2.VideoCapture", lambda _: camera)
+
+    def slow_detect(frame, **kwargs):
+        time.sleep(0.01)
+        return brightness_box(frame)
+
+    detector = Mock(spec=YOLODetector)
+    detector.predict.side_effect = slow_detect
+    path = tmp_path / "records.jsonl"
+
+    with JsonlRecordWriter(path) as records:
+        pipeline = VideoPipeline(
+            DetectionService(detector),
+            Mock(),
+            show_display=False,
+            headless=True,
+            records=records,
+        )
+        pipeline.run(0)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    levels = [line["detections"][0]["x1"] for line in lines]
+    assert len(lines) + pipeline.grabber.dropped == 20
+    assert pipeline.grabber.dropped > 0
+    assert levels == sorted(levels)
+    assert levels[-1] == 20
+
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_file_frames_are_timed_by_their_position_in_the_video(video_path, batch_size):
+    detector = Mock(spec=YOLODetector)
+    detector.predict.side_effect = brightness_box
+    detector.predict_batch.side_effect = lambda frames, **kwargs: [
+        brightness_box(frame) for frame in frames
+    ]
+    analytics = Mock(last_events=[])
+    analytics.update.return_value = {}
+
+    VideoPipeline(
+        DetectionService(detector),
+        Mock(),
+        analytics_service=analytics,
+        show_display=False,
+        headless=True,
+        batch_size=batch_size,
+    ).run(str(video_path))
+
+    timestamps = [call.args[1] for call in analytics.update.call_args_list]
+    # 10 fps: a tenth of a second apart, even when decoded in one batch.
+    assert np.diff(timestamps) == pytest.approx([0.1] * 4, abs=1e-3)
+    assert abs(timestamps[0] - time.time()) < 5
+
+
+def test_grabber_releases_the_capture_only_after_a_stalled_read():
+    camera = FakeCamera(1, interval=0.3)
+    camera.release = Mock()
+    grabber = LatestFrameGrabber(camera).start()
+    time.sleep(0.05)
+
+    grabber.close(timeout=0.01)
+    released_on_close = camera.release.called
+    grabber._thread.join()
+
+    assert not released_on_close
+    camera.release.assert_called_once()
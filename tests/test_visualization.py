@@ -0,0 +1,90 @@
+import threading
+import time
+import urllib.request
+from dataclasses import replace
+
+import numpy as np
+from ultralytics.engine.results import Results
+
+from sentinel.analytics.models import ZoneConfig, ZoneType
+from sentinel.visualization.annotators import Annotators
+from sentinel.visualization.broadcast import FrameBroadcaster, MJPEGServer
+
+
+def wait_for_viewers(broadcaster, count):
+    deadline = time.time() + 2
+    while broadcaster.viewers < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_broadcaster_skips_encoding_without_viewers():
+    broadcaster = FrameBroadcaster()
+    broadcaster.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+    assert broadcaster._jpeg is None
+
+
+def test_broadcaster_slow_viewer_gets_latest_frame():
+    broadcaster = FrameBroadcaster()
+    frames = broadcaster.frames(timeout=0.05)
+    received = []
+    first_frame_read = threading.Event()
+
+    def viewer():
+        received.append(next(frames))
+        first_frame_read.set()
+        time.sleep(0.1)
+        received.append(next(frames))
+
+    thread = threading.Thread(target=viewer)
+    thread.start()
+    wait_for_viewers(broadcaster, 1)
+
+    for value in (0, 100, 200):
+        broadcaster.publish(np.full((48, 64, 3), value, dtype=np.uint8))
+        first_frame_read.wait(1)
+
+    thread.join(2)
+    broadcaster.close()
+
+    assert len(received) == 2
+    assert received[1] == broadcaster._jpeg
+
+
+def test_mjpeg_server_streams_multipart_frames():
+    broadcaster = FrameBroadcaster()
+    server = MJPEGServer(broadcaster, "127.0.0.1", 0)
+    server.start()
+
+    try:
+        response = urllib.request.urlopen(
+            f"http://127.0.0.1:{server.port}/stream.mjpg", timeout=2
+        )
+        assert response.headers["Content-Type"].startswith("multipart/x-mixed-replace")
+
+        wait_for_viewers(broadcaster, 1)
+        broadcaster.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+
+        assert response.readline() == b"--frame\r\n"
+        assert response.readline() == b"Content-Type: image/jpeg\r\n"
+    finally:
+        server.close()
+
+
+def test_annotators_swap_reloaded_zones_on_next_draw():
+    zone = ZoneConfig(
+        id="a",
+        name="a",
+        type=ZoneType.POLYGON,
+        polygon=[[0, 0], [10, 0], [10, 10], [0, 10]],
+    )
+    annotators = Annotators(zone_configs=[zone])
+    results = Results(
+        np.zeros((48, 64, 3), dtype=np.uint8), path="", names={0: "person"}
+    )
+
+    annotators.reload([zone, replace(zone, id="b", name="b")])
+    assert list(annotators.zone_annotators) == ["a"]
+
+    annotators.draw(results.orig_img, results)
+    assert list(annotators.zone_annotators) == ["a", "b"]
+    assert [config.id for config in annotators.zone_configs] == ["a", "b"]